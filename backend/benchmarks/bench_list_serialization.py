@@ -0,0 +1,74 @@
+"""
+Microbenchmark for serializing a page of the submission list.
+
+Compares ``UserSubmissionReadSerializer`` with DRF's ``JSONRenderer`` (the
+list path before) and ``read_data`` with ``ORJSONRenderer`` (the list path
+now), on rows already in memory, so only serialization is measured.
+
+Usage (from the backend directory)::
+
+    python benchmarks/bench_list_serialization.py
+"""
+import os
+import sys
+import timeit
+import uuid
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'resume_ai', 'apps'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'resume_ai.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('ALLOWED_HOSTS', '["*"]')
+os.environ.setdefault('REPLICATE_API_TOKEN', 'benchmark')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.utils import timezone  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from user_scoring.models import UserSubmission  # noqa: E402
+from user_scoring.renderers import ORJSONRenderer  # noqa: E402
+from user_scoring.serializers import READ_COLUMNS, UserSubmissionReadSerializer, read_data  # noqa: E402
+
+
+def make_rows(count):
+    now = timezone.now()
+    return [
+        {
+            'id': uuid.uuid4(), 'job_posting': 1, 'company': 'Acme', 'first_name': 'Jane', 'last_name': f'Doe {i}',
+            'email': f'jane{i}@example.com', 'score': float(i % 100), 'score_variance': 4.5 if i % 2 else None,
+            'score_samples': 3 if i % 2 else 1, 'prescore': 0.5, 'scoring_status': 'scored',
+            'submitted_at': now - timedelta(hours=i),
+        }
+        for i in range(count)
+    ]
+
+def make_instances(rows):
+    return [
+        UserSubmission(job_posting_id=row['job_posting'], **{k: v for k, v in row.items() if k != 'job_posting'})
+        for row in rows
+    ]
+
+
+def bench(name, func, number):
+    seconds = min(timeit.repeat(func, number=number, repeat=5))
+    print(f'{name:<50} {seconds / number * 1e3:8.2f} ms/page')
+    return seconds / number
+
+
+if __name__ == '__main__':
+    for count in (50, 200, 5000):
+        rows = make_rows(count)
+        instances = make_instances(rows)
+        assert set(rows[0]) == set(READ_COLUMNS)
+        assert JSONRenderer().render(UserSubmissionReadSerializer(instances, many=True).data) == \
+            ORJSONRenderer().render(read_data(rows))
+
+        number = max(1, 20000 // count)
+        before = bench(f'{count} rows: read serializer + JSONRenderer',
+                       lambda: JSONRenderer().render(UserSubmissionReadSerializer(instances, many=True).data), number)
+        after = bench(f'{count} rows: read_data + ORJSONRenderer',
+                      lambda: ORJSONRenderer().render(read_data(rows)), number)
+        print(f'{"":<50} {before / after:8.1f}x faster')
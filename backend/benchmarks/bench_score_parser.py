@@ -0,0 +1,51 @@
+"""
+Microbenchmark for the shared score parser.
+
+Compares ``parse_score`` on full strings and on Replicate-style token lists
+with the per-service parsers it replaced.
+
+Usage (from the backend directory)::
+
+    python benchmarks/bench_score_parser.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'resume_ai', 'apps'))
+
+from user_scoring.services.scoring_service.score_parser import parse_score  # noqa: E402
+
+FEEDBACK = ("The applicant has five years of Python and Django experience, which matches "
+            "the core requirements of the role. Experience with Celery and Redis is listed. ") * 12
+TEXT = f"SCORE: 85\n\n{FEEDBACK}"
+PREAMBLE_TEXT = f"Here is my evaluation of the applicant.\n\n{FEEDBACK[:400]}\n\nSCORE: 85\n\n{FEEDBACK}"
+TOKENS = ['***', 'SCORE', ':', ' ', '85', '***', '\n\n'] + [f' {word}' for word in FEEDBACK.split()]
+
+
+def legacy_openai_get_score(content):
+    score_line = [line for line in content.split('\n') if line.startswith('SCORE:')][0]
+    return int(score_line.split(':')[1].strip())
+
+def legacy_llama_get_score(array):
+    score_index = array.index('SCORE')
+    return int(array[score_index + 3])
+
+
+def bench(name, func, number=20000):
+    seconds = min(timeit.repeat(func, number=number, repeat=5))
+    print(f'{name:<45} {seconds / number * 1e6:8.2f} us/call')
+
+
+if __name__ == '__main__':
+    assert parse_score(TEXT).score == legacy_openai_get_score(TEXT) == 85
+    assert parse_score(TOKENS).score == legacy_llama_get_score(TOKENS) == 85
+
+    bench('legacy OpenAI get_score (string)', lambda: legacy_openai_get_score(TEXT))
+    bench('parse_score (string)', lambda: parse_score(TEXT))
+    bench('legacy OpenAI get_score (score after preamble)', lambda: legacy_openai_get_score(PREAMBLE_TEXT))
+    bench('parse_score (score after preamble)', lambda: parse_score(PREAMBLE_TEXT))
+    bench('legacy Llama get_score (tokens)', lambda: legacy_llama_get_score(TOKENS))
+    bench('parse_score (tokens)', lambda: parse_score(TOKENS))
+    bench('parse_score (one character per chunk)', lambda: parse_score(iter(TEXT)), number=500)
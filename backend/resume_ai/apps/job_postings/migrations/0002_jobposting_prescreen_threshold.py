@@ -0,0 +1,18 @@
+# Generated by Django 3.2.23 on 2026-10-18 18:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_postings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobposting',
+            name='prescreen_threshold',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
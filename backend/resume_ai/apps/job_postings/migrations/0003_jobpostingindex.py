@@ -0,0 +1,86 @@
+# Generated by Django 3.2.23 on 2026-10-18 18:24
+
+import hashlib
+import math
+import re
+import unicodedata
+from collections import Counter
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# The indexing logic as of this migration, copied from resume_ai.text_processing
+# and job_postings.services.description_index so that later changes to them do
+# not alter what this migration builds.
+MAX_LENGTH = 8000
+CHARS_PER_TOKEN = 4
+TOKEN_PATTERN = re.compile(r'[a-z0-9](?:[a-z0-9.+#]*[a-z0-9+#])?')
+WHITESPACE_RUN = re.compile(r'[^\S\n]+')
+BLANK_LINES = re.compile(r'\n\s*\n\s*')
+LINE_BREAK = re.compile(r' ?\n ?')
+STOP_WORDS = frozenset('''
+a about above after again against all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just me more most
+my myself no nor not now of off on once only or other our ours ourselves out over own same she
+should so some such than that the their theirs them themselves then there these they this those
+through to too under until up very was we were what when where which while who whom why will with
+would you your yours yourself yourselves also etc e.g i.e will able must well using use used within
+'''.split())
+
+
+def normalize_text(text, max_length):
+    text = unicodedata.normalize('NFKC', text)
+    text = WHITESPACE_RUN.sub(' ', text)
+    text = BLANK_LINES.sub('\n\n', text)
+    text = LINE_BREAK.sub('\n', text).strip()
+    if len(text) > max_length:
+        cut = max(text.rfind(' ', 0, max_length + 1), text.rfind('\n', 0, max_length + 1))
+        text = text[:cut if cut > 0 else max_length].rstrip()
+    return text
+
+
+def term_weights(text):
+    tokens = [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+    return {term: 1.0 + math.log(count) for term, count in Counter(tokens).items()}
+
+
+def index_fields(description):
+    normalized = normalize_text(description, MAX_LENGTH)
+    return {
+        'description': normalized,
+        'token_count': len(normalized) // CHARS_PER_TOKEN + 1,
+        'term_weights': term_weights(normalized),
+        'prompt_prefix_hash': hashlib.sha256(normalized.encode('utf-8')).hexdigest(),
+    }
+
+
+def build_description_indexes(apps, schema_editor):
+    JobPosting = apps.get_model('job_postings', 'JobPosting')
+    JobPostingIndex = apps.get_model('job_postings', 'JobPostingIndex')
+    JobPostingIndex.objects.bulk_create(
+        JobPostingIndex(job_posting=job_posting, **index_fields(job_posting.description))
+        for job_posting in JobPosting.objects.iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_postings', '0002_jobposting_prescreen_threshold'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobPostingIndex',
+            fields=[
+                ('job_posting', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='description_index', serialize=False, to='job_postings.jobposting')),
+                ('description', models.TextField()),
+                ('token_count', models.PositiveIntegerField()),
+                ('term_weights', models.JSONField(default=dict)),
+                ('prompt_prefix_hash', models.CharField(max_length=64)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(build_description_indexes, migrations.RunPython.noop),
+    ]
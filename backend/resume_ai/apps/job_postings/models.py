@@ -4,8 +4,31 @@ class JobPosting(models.Model):
     title = models.CharField(max_length=200)
     company = models.CharField(max_length=200)
     description = models.TextField()
+    # Submissions whose prescore falls below this are not sent to the LLM
+    # while pre-screening is enabled. None disables screening for the posting.
+    prescreen_threshold = models.FloatField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+
+class JobPostingIndex(models.Model):
+    """
+    Derived data about a job posting's description, shared by all its submissions.
+
+    Built whenever the posting is saved, so that scoring, pre-screening and
+    the score cache do not re-process the description for every applicant.
+    """
+    job_posting = models.OneToOneField(
+        JobPosting, on_delete=models.CASCADE, primary_key=True, related_name='description_index')
+    # Normalized and length-capped; this is the text put into prompts.
+    description = models.TextField()
+    token_count = models.PositiveIntegerField()
+    term_weights = models.JSONField(default=dict)
+    prompt_prefix_hash = models.CharField(max_length=64)
+    built_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Index of {self.job_posting_id}"
@@ -2,6 +2,19 @@ from rest_framework import serializers
 from .models import JobPosting
 
 class JobPostingSerializer(serializers.ModelSerializer):
+    """
+    The public job posting representation.
+
+    Internal scoring settings such as ``prescreen_threshold`` are left out;
+    staff edit them in the admin.
+    """
     class Meta:
         model = JobPosting
-        fields = ['id', 'title','company', 'description', 'created_at', 'updated_at']
\ No newline at end of file
+        fields = ['id', 'title','company', 'description', 'created_at', 'updated_at']
+
+class JobPostingSummarySerializer(JobPostingSerializer):
+    """
+    The job posting list representation, without the description.
+    """
+    class Meta(JobPostingSerializer.Meta):
+        fields = ['id', 'title', 'company', 'created_at', 'updated_at']
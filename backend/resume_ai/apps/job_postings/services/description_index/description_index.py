@@ -0,0 +1,76 @@
+import hashlib
+from django.conf import settings
+from resume_ai.text_processing import compact_text, estimate_token_count, normalize_text, term_weights
+
+def index_fields(description):
+    """
+    Derive the indexed fields of a job description.
+
+    Parameters:
+    -----------
+    description : str
+        The raw job description.
+
+    Returns:
+    --------
+    dict
+        ``description`` (compacted to ``settings.JOB_DESCRIPTION_TOKEN_BUDGET``
+        tokens and capped at ``settings.JOB_DESCRIPTION_MAX_LENGTH``
+        characters, see ``compact_text``), its estimated
+        ``token_count``, its ``term_weights`` and ``prompt_prefix_hash``, the
+        SHA-256 digest of the normalized description, which identifies the
+        posting's part of every prompt.
+    """
+    compacted = compact_text(description, settings.JOB_DESCRIPTION_TOKEN_BUDGET)
+    normalized = normalize_text(compacted.text, settings.JOB_DESCRIPTION_MAX_LENGTH)
+    return {
+        'description': normalized,
+        'token_count': estimate_token_count(normalized),
+        'term_weights': term_weights(normalized),
+        'prompt_prefix_hash': hashlib.sha256(normalized.encode('utf-8')).hexdigest(),
+    }
+
+def build_description_index(job_posting):
+    """
+    Build and store the description index of a job posting.
+
+    Parameters:
+    -----------
+    job_posting : JobPosting
+        The saved job posting to index.
+
+    Returns:
+    --------
+    JobPostingIndex
+        The up-to-date index, also cached on ``job_posting``.
+    """
+    from job_postings.models import JobPostingIndex
+
+    index, _ = JobPostingIndex.objects.update_or_create(
+        job_posting=job_posting, defaults=index_fields(job_posting.description))
+    job_posting.description_index = index
+    return index
+
+def get_description_index(job_posting):
+    """
+    Return the description index of a job posting, building it if it is missing.
+
+    Load submissions with ``select_related('job_posting__description_index')``
+    to avoid a query per posting.
+
+    Parameters:
+    -----------
+    job_posting : JobPosting
+        The job posting whose index is needed.
+
+    Returns:
+    --------
+    JobPostingIndex
+        The posting's description index.
+    """
+    from job_postings.models import JobPostingIndex
+
+    try:
+        return job_posting.description_index
+    except JobPostingIndex.DoesNotExist:
+        return build_description_index(job_posting)
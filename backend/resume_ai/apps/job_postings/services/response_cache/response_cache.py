@@ -0,0 +1,221 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+from django.conf import settings
+
+class CachedResponse(NamedTuple):
+    """
+    A rendered API response and the validators sent with it.
+    """
+    body: bytes
+    etag: str
+    # Unix time of the newest ``updated_at`` in the response, None if it is empty.
+    last_modified: Optional[int]
+
+
+class ResponseCache(ABC):
+    """
+    Abstract base class for caches of rendered job posting responses.
+
+    Entries are stored under a generation number. Any change to a job
+    posting starts a new generation, which retires every entry at once: the
+    list responses contain all postings anyway, and postings change rarely.
+    A request reads the generation before querying the database, so a
+    response built while a posting changes is stored under the generation
+    it belongs to and never served after the change.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+
+    @abstractmethod
+    def generation(self):
+        """
+        Return the current generation number.
+        """
+
+    @abstractmethod
+    def get(self, name, generation):
+        """
+        Return the ``CachedResponse`` stored as ``name`` in ``generation``, or None.
+        """
+
+    @abstractmethod
+    def set(self, name, generation, response):
+        """
+        Store a ``CachedResponse`` as ``name`` in ``generation``.
+        """
+
+    @abstractmethod
+    def invalidate(self):
+        """
+        Start a new generation, retiring every stored response.
+        """
+
+
+class LocMemResponseCache(ResponseCache):
+    """
+    A per-process response cache with TTL and LRU eviction.
+
+    Changes made by other processes are only seen once entries expire, so
+    ``ttl`` bounds how stale a response can be.
+    """
+
+    def __init__(self, ttl, max_entries):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._generation = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def generation(self):
+        return self._generation
+
+    def get(self, name, generation):
+        with self._lock:
+            entry = self._entries.get((generation, name))
+            if entry is None:
+                return None
+            expires_at, response = entry
+            if expires_at <= time.monotonic():
+                del self._entries[(generation, name)]
+                return None
+            self._entries.move_to_end((generation, name))
+            return response
+
+    def set(self, name, generation, response):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[(generation, name)] = (time.monotonic() + self.ttl, response)
+            self._entries.move_to_end((generation, name))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+class RedisResponseCache(ResponseCache):
+    """
+    A response cache shared by all web processes, backed by Redis.
+
+    Retired generations are not deleted; their entries expire after ``ttl``.
+    """
+
+    key_prefix = 'job_posting_responses'
+
+    def __init__(self, ttl, url, client=None):
+        super().__init__(ttl)
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+
+    def _generation_key(self):
+        return f'{self.key_prefix}:generation'
+
+    def _entry_key(self, name, generation):
+        return f'{self.key_prefix}:{generation}:{name}'
+
+    def generation(self):
+        return int(self.client.get(self._generation_key()) or 0)
+
+    def get(self, name, generation):
+        entry = self.client.hgetall(self._entry_key(name, generation))
+        if not entry:
+            return None
+        entry = {key.decode() if isinstance(key, bytes) else key: value for key, value in entry.items()}
+        last_modified = entry['last_modified']
+        return CachedResponse(
+            body=entry['body'],
+            etag=entry['etag'].decode() if isinstance(entry['etag'], bytes) else entry['etag'],
+            last_modified=int(last_modified) if last_modified not in (b'', '') else None,
+        )
+
+    def set(self, name, generation, response):
+        key = self._entry_key(name, generation)
+        pipe = self.client.pipeline()
+        pipe.hset(key, mapping={
+            'body': response.body,
+            'etag': response.etag,
+            'last_modified': '' if response.last_modified is None else response.last_modified,
+        })
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def invalidate(self):
+        self.client.incr(self._generation_key())
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache():
+    """
+    Return the process-wide response cache configured by ``JOB_POSTING_CACHE_BACKEND``.
+
+    Returns:
+    --------
+    ResponseCache or None
+        The configured cache, or None if caching is disabled.
+
+    Raises:
+    -------
+    ValueError
+        If an invalid backend is configured.
+    """
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = _build_response_cache()
+    return _response_cache or None
+
+def reset_response_cache():
+    """
+    Forget the process-wide response cache so it is rebuilt from settings on next use.
+    """
+    global _response_cache
+    with _response_cache_lock:
+        _response_cache = None
+
+def _build_response_cache():
+    backend = settings.JOB_POSTING_CACHE_BACKEND
+    if backend == 'locmem':
+        return LocMemResponseCache(settings.JOB_POSTING_CACHE_TTL, settings.JOB_POSTING_CACHE_MAX_ENTRIES)
+    if backend == 'redis':
+        return RedisResponseCache(settings.JOB_POSTING_CACHE_TTL, settings.JOB_POSTING_CACHE_REDIS_URL)
+    if backend == 'none':
+        return False
+    raise ValueError('Invalid job posting cache backend specified.')
+
+def cached_response(name, build):
+    """
+    Return the response stored as ``name``, building and storing it on a miss.
+
+    Parameters:
+    -----------
+    name : str
+        Identifies the response, e.g. 'detail:42'.
+    build : callable
+        Returns the ``CachedResponse``; exceptions (e.g. ``Http404``) propagate
+        and nothing is stored.
+
+    Returns:
+    --------
+    CachedResponse
+    """
+    cache = get_response_cache()
+    if cache is None:
+        return build()
+    generation = cache.generation()
+    response = cache.get(name, generation)
+    if response is None:
+        response = build()
+        cache.set(name, generation, response)
+    return response
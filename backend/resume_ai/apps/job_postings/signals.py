@@ -0,0 +1,24 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import JobPosting
+from .services.description_index.description_index import build_description_index
+from .services.response_cache.response_cache import get_response_cache
+
+@receiver(post_save, sender=JobPosting)
+def build_description_index_on_save(sender, instance, raw=False, **kwargs):
+    """
+    Rebuild a job posting's description index whenever the posting is saved.
+    """
+    if raw:
+        return
+    build_description_index(instance)
+
+@receiver(post_save, sender=JobPosting)
+@receiver(post_delete, sender=JobPosting)
+def invalidate_cached_responses(sender, instance, **kwargs):
+    """
+    Drop the cached job posting API responses whenever a posting is created, updated or deleted.
+    """
+    cache = get_response_cache()
+    if cache is not None:
+        cache.invalidate()
@@ -0,0 +1,111 @@
+import unittest
+from unittest.mock import MagicMock
+from django.test import TestCase, override_settings
+from resume_ai.text_processing import compact_text, normalize_text
+from job_postings.models import JobPosting, JobPostingIndex
+from job_postings.services.description_index.description_index import get_description_index, index_fields
+from user_scoring.services.scoring_service.llama_scoring import LlamaScoringService
+
+
+class TestNormalizeText(unittest.TestCase):
+
+    def test_collapses_whitespace_and_keeps_paragraphs(self):
+        text = '  Senior Python   developer \r\n\n\n\t Django  and\nREST  '
+
+        self.assertEqual(normalize_text(text), 'Senior Python developer\n\nDjango and\nREST')
+
+    def test_caps_length_at_word_boundary(self):
+        self.assertEqual(normalize_text('Python Django PostgreSQL', max_length=16), 'Python Django')
+
+
+class TestCompactText(unittest.TestCase):
+
+    def test_strips_contact_details_and_repeated_lines(self):
+        text = ('Jane Doe\njane.doe@example.com | +1 (555) 123-4567 | https://linkedin.com/in/jane\n'
+                'Python developer, 2015 - 2019\n\nReferences available\nreferences available')
+
+        compacted = compact_text(text)
+
+        self.assertEqual(compacted.text, 'Jane Doe\n| |\nPython developer, 2015 - 2019\n\nReferences available')
+        self.assertLess(compacted.tokens_after, compacted.tokens_before)
+
+    def test_phone_formats_are_stripped_and_year_ranges_kept(self):
+        text = ('+44 20 7946 0958\n(555) 123-4567\n555.123.4567\n555 123 4567\n'
+                'Engineer 2015 - 2019 2019 - 2023; ID 123456789\nAnalyst 2010-2012, 2012-2015')
+
+        compacted = compact_text(text)
+
+        self.assertEqual(compacted.text, 'Engineer 2015 - 2019 2019 - 2023; ID 123456789\nAnalyst 2010-2012, 2012-2015')
+
+    def test_keeps_most_relevant_sections_within_budget(self):
+        sections = ['Hobbies: ' + 'sailing ' * 20, 'Django and Python ' * 5, 'Gardening ' * 20, 'Python ' * 10]
+        weights = {'python': 2.0, 'django': 1.0}
+
+        compacted = compact_text('\n\n'.join(sections), token_budget=50, weights=weights)
+
+        self.assertLessEqual(compacted.tokens_after, 50)
+        self.assertEqual(compacted.text, normalize_text('\n\n'.join([sections[1], sections[3]])))
+
+    def test_oversized_paragraph_is_trimmed_by_line(self):
+        text = '\n'.join(['Cooking'] * 1 + [f'Line {i} ' + 'filler ' * 10 for i in range(20)] + ['Kubernetes expert'])
+
+        compacted = compact_text(text, token_budget=30, weights={'kubernetes': 1.0})
+
+        self.assertLessEqual(compacted.tokens_after, 30)
+        self.assertIn('Kubernetes expert', compacted.text)
+        self.assertTrue(compacted.text.startswith('Cooking\nLine 0'))
+
+
+class TestIndexFields(unittest.TestCase):
+
+    def test_equivalent_descriptions_share_prompt_prefix_hash(self):
+        first = index_fields('Python  developer\n')
+        second = index_fields(' Python developer')
+
+        self.assertEqual(first['prompt_prefix_hash'], second['prompt_prefix_hash'])
+        self.assertNotEqual(first['prompt_prefix_hash'], index_fields('Java developer')['prompt_prefix_hash'])
+
+    @override_settings(JOB_DESCRIPTION_MAX_LENGTH=20)
+    def test_fields(self):
+        fields = index_fields('Python developer, Python and Django')
+
+        self.assertEqual(fields['description'], 'Python developer,')
+        self.assertEqual(fields['token_count'], 5)
+        self.assertEqual(set(fields['term_weights']), {'python', 'developer'})
+
+
+class TestDescriptionIndex(TestCase):
+
+    def test_index_is_built_and_rebuilt_on_save(self):
+        job_posting = JobPosting.objects.create(title='Engineer', company='Test', description='Python developer')
+        index = JobPostingIndex.objects.get(job_posting=job_posting)
+        self.assertEqual(index.description, 'Python developer')
+
+        job_posting.description = 'Django  developer'
+        job_posting.save()
+
+        index.refresh_from_db()
+        self.assertEqual(index.description, 'Django developer')
+        self.assertEqual(index.term_weights, {'django': 1.0, 'developer': 1.0})
+
+    def test_missing_index_is_built_on_demand(self):
+        job_posting = JobPosting.objects.create(title='Engineer', company='Test', description='Python developer')
+        JobPostingIndex.objects.all().delete()
+        job_posting = JobPosting.objects.get(pk=job_posting.pk)
+
+        self.assertEqual(get_description_index(job_posting).description, 'Python developer')
+        self.assertTrue(JobPostingIndex.objects.filter(job_posting=job_posting).exists())
+
+    def test_prompt_uses_indexed_description(self):
+        job_posting = JobPosting.objects.create(title='Engineer', company='Test', description=' Python\n\n\n developer ')
+        submission = MagicMock(job_posting=JobPosting.objects.select_related('description_index').get(pk=job_posting.pk),
+                               resume='Django developer')
+
+        with self.assertNumQueries(0):
+            prompt = LlamaScoringService()._create_prompt(submission)
+
+        self.assertIn('Job Description: Python\n\ndeveloper\n\n', prompt)
+        self.assertTrue(prompt.endswith('Django developer'))
+
+if __name__ == '__main__':
+    unittest.main()
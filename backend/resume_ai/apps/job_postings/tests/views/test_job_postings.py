@@ -0,0 +1,152 @@
+import unittest
+from unittest.mock import patch
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from job_postings.models import JobPosting
+from job_postings.services.response_cache.response_cache import (
+    CachedResponse, LocMemResponseCache, RedisResponseCache, reset_response_cache,
+)
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+
+@override_settings(JOB_POSTING_CACHE_BACKEND='locmem')
+class TestJobPostingViewSet(APITestCase):
+
+    def setUp(self):
+        reset_response_cache()
+        self.addCleanup(reset_response_cache)
+        self.job_posting = JobPosting.objects.create(title='Engineer', company='Acme', description='Python')
+        JobPosting.objects.create(title='Designer', company='Other', description='Figma')
+        self.list_url = reverse('jobposting-list')
+        self.detail_url = reverse('jobposting-detail', kwargs={'pk': self.job_posting.id})
+
+    def test_list_omits_description_unless_requested(self):
+        response = self.client.get(self.list_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 2)
+        self.assertNotIn('description', response.json()[0])
+        self.assertEqual(self.client.get(self.list_url, {'include': 'description'}).json()[0]['description'], 'Python')
+
+    def test_prescreen_threshold_is_not_public(self):
+        JobPosting.objects.filter(pk=self.job_posting.pk).update(prescreen_threshold=0.4)
+
+        self.assertNotIn('prescreen_threshold', self.client.get(self.detail_url).json())
+        self.assertNotIn('prescreen_threshold', self.client.get(self.list_url).json()[0])
+        self.assertNotIn('prescreen_threshold', self.client.get(self.list_url, {'include': 'description'}).json()[0])
+
+    def test_responses_are_cached_until_a_posting_changes(self):
+        self.client.get(self.list_url)
+        self.client.get(self.detail_url)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self.client.get(self.list_url).json()), 2)
+            self.assertEqual(self.client.get(self.detail_url).json()['description'], 'Python')
+
+        self.job_posting.description = 'Python and Django'
+        self.job_posting.save()
+
+        self.assertEqual(self.client.get(self.detail_url).json()['description'], 'Python and Django')
+        self.job_posting.delete()
+        self.assertEqual(len(self.client.get(self.list_url).json()), 1)
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_conditional_get(self):
+        response = self.client.get(self.detail_url)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+        self.job_posting.title = 'Senior Engineer'
+        self.job_posting.save()
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_list_etag_changes_when_a_posting_is_deleted(self):
+        etag = self.client.get(self.list_url)['ETag']
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        JobPosting.objects.exclude(pk=self.job_posting.pk).delete()
+
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    @override_settings(JOB_POSTING_CACHE_BACKEND='none')
+    def test_without_cache(self):
+        reset_response_cache()
+        etag = self.client.get(self.detail_url)['ETag']
+
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @unittest.skipUnless(fakeredis, 'fakeredis is not installed (see requirements-dev.txt)')
+    @override_settings(JOB_POSTING_CACHE_BACKEND='redis', JOB_POSTING_CACHE_REDIS_URL='redis://localhost:6379/3')
+    def test_with_redis_cache(self):
+        reset_response_cache()
+        client = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        with patch('redis.Redis.from_url', return_value=client):
+            response = self.client.get(self.detail_url)
+            with self.assertNumQueries(0):
+                cached = self.client.get(self.detail_url)
+            self.assertEqual((cached.content, cached['ETag']), (response.content, response['ETag']))
+            self.assertEqual(cached['Last-Modified'], response['Last-Modified'])
+
+            self.job_posting.description = 'Python and Django'
+            self.job_posting.save()
+
+            self.assertEqual(self.client.get(self.detail_url).json()['description'], 'Python and Django')
+
+
+class TestLocMemResponseCache(unittest.TestCase):
+
+    def test_response_built_before_invalidation_is_not_stored(self):
+        cache = LocMemResponseCache(ttl=60, max_entries=10)
+        generation = cache.generation()
+
+        cache.invalidate()
+        cache.set('list', generation, 'stale')
+
+        self.assertIsNone(cache.get('list', cache.generation()))
+
+
+@unittest.skipUnless(fakeredis, 'fakeredis is not installed (see requirements-dev.txt)')
+class TestRedisResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.client = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        self.cache = RedisResponseCache(ttl=60, url=None, client=self.client)
+
+    def test_get_and_set(self):
+        generation = self.cache.generation()
+        self.assertIsNone(self.cache.get('list', generation))
+        response = CachedResponse(body=b'[{"id": 1}]', etag='"abc"', last_modified=1700000000)
+
+        self.cache.set('list', generation, response)
+
+        self.assertEqual(self.cache.get('list', generation), response)
+        self.assertIn(self.client.ttl(f'job_posting_responses:{generation}:list'), range(1, 61))
+
+    def test_empty_list_has_no_last_modified(self):
+        response = CachedResponse(body=b'[]', etag='"empty"', last_modified=None)
+
+        self.cache.set('list', 0, response)
+
+        self.assertEqual(self.cache.get('list', 0), response)
+
+    def test_invalidate_starts_a_new_generation(self):
+        other = RedisResponseCache(ttl=60, url=None, client=self.client)
+        generation = self.cache.generation()
+        self.cache.set('list', generation, CachedResponse(body=b'[]', etag='"empty"', last_modified=None))
+
+        other.invalidate()
+
+        self.assertEqual(self.cache.generation(), generation + 1)
+        self.assertIsNone(self.cache.get('list', self.cache.generation()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from job_postings.models import JobPosting
+from user_scoring.models import UserSubmission
+
+
+class TestTopApplicants(APITestCase):
+
+    def setUp(self):
+        self.job_posting = JobPosting.objects.create(title='Engineer', company='Acme', description='Python')
+        self.url = reverse('jobposting-top-applicants', kwargs={'pk': self.job_posting.id})
+        self.submissions = [
+            UserSubmission.objects.create(
+                job_posting=self.job_posting, company='Acme', first_name='Jane', last_name='Doe',
+                email=f'jane{i}@example.com', phone_number='+15555555555', resume='Python', service='openai', score=score)
+            for i, score in enumerate((70, None, 90, 55))
+        ]
+        self.staff = User.objects.create_user('recruiter', password='secret', is_staff=True)
+        self.client.force_authenticate(self.staff)
+
+    def test_best_scored_submissions_first(self):
+        response = self.client.get(self.url, {'k': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['id'] for row in response.data], [str(self.submissions[2].id), str(self.submissions[0].id)])
+        self.assertEqual(len(self.client.get(self.url).data), 3)
+
+    def test_invalid_k(self):
+        for k in ('ten', 0, 501):
+            self.assertEqual(self.client.get(self.url, {'k': k}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requires_staff(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(User.objects.create_user('applicant', password='secret'))
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_unknown_job_posting(self):
+        url = reverse('jobposting-top-applicants', kwargs={'pk': self.job_posting.id + 1})
+
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,99 @@
+import hashlib
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework import viewsets
-from rest_framework.permissions import AllowAny
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from user_scoring.serializers import UserSubmissionReadSerializer
+from user_scoring.services.leaderboard.leaderboard import top_applicants
 from .models import JobPosting
-from .serializers import JobPostingSerializer
+from .serializers import JobPostingSerializer, JobPostingSummarySerializer
+from .services.response_cache.response_cache import CachedResponse, cached_response
 
 class JobPostingViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Read-only API of job postings.
+
+    The list leaves out descriptions unless ``include=description`` is
+    given. List and detail responses are rendered once and cached until a
+    posting changes, and carry ETag and Last-Modified headers derived from
+    ``updated_at`` so that clients can revalidate them with a 304.
+    """
     queryset = JobPosting.objects.all()
     serializer_class = JobPostingSerializer
-    permission_classes = [AllowAny]
\ No newline at end of file
+    permission_classes = [AllowAny]
+
+    default_top_applicants = 50
+    max_top_applicants = 500
+
+    def get_serializer_class(self):
+        if self.action == 'list' and not self._include_description():
+            return JobPostingSummarySerializer
+        return JobPostingSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list' and not self._include_description():
+            queryset = queryset.defer('description')
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional_response(cached_response(self._list_name(), self._render_list))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional_response(cached_response(f"detail:{kwargs['pk']}", self._render_detail))
+
+    def _include_description(self):
+        return 'description' in self.request.query_params.get('include', '').split(',')
+
+    def _list_name(self):
+        return 'list:description' if self._include_description() else 'list'
+
+    def _render_list(self):
+        job_postings = list(self.filter_queryset(self.get_queryset()))
+        versions = ','.join(f'{posting.id}:{posting.updated_at.isoformat()}' for posting in job_postings)
+        return CachedResponse(
+            body=JSONRenderer().render(self.get_serializer(job_postings, many=True).data),
+            etag=quote_etag(hashlib.sha1(f'{self._list_name()}|{versions}'.encode('utf-8')).hexdigest()),
+            last_modified=max((int(posting.updated_at.timestamp()) for posting in job_postings), default=None),
+        )
+
+    def _render_detail(self):
+        job_posting = self.get_object()
+        return CachedResponse(
+            body=JSONRenderer().render(self.get_serializer(job_posting).data),
+            etag=quote_etag(f'{job_posting.id}-{job_posting.updated_at.timestamp():.6f}'),
+            last_modified=int(job_posting.updated_at.timestamp()),
+        )
+
+    def _conditional_response(self, cached):
+        response = get_conditional_response(self.request, etag=cached.etag, last_modified=cached.last_modified)
+        if response is None:
+            response = HttpResponse(cached.body, content_type='application/json')
+        response['ETag'] = cached.etag
+        if cached.last_modified is not None:
+            response['Last-Modified'] = http_date(cached.last_modified)
+        # Clients may keep the response but must revalidate it before use.
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+    @action(detail=True, methods=['get'], url_path='top-applicants', permission_classes=[IsAdminUser])
+    def top_applicants(self, request, pk=None):
+        """
+        Return the ``k`` best scored submissions of the job posting, best first.
+
+        The submissions include applicants' contact details, so only staff users may read them.
+        """
+        try:
+            k = int(request.query_params.get('k', self.default_top_applicants))
+        except ValueError:
+            raise ValidationError({'k': 'Must be an integer.'})
+        if not 1 <= k <= self.max_top_applicants:
+            raise ValidationError({'k': f'Must be between 1 and {self.max_top_applicants}.'})
+        job_posting = self.get_object()
+        submissions = top_applicants(job_posting.id, k)
+        return Response(UserSubmissionReadSerializer(submissions, many=True).data)
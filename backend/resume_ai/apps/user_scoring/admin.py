@@ -1,10 +1,15 @@
 from django.contrib import admin
-from .models import UserSubmission
+from .models import RescoreJob, UserSubmission
 import uuid
 
 class UserSubmissionAdmin(admin.ModelAdmin):
-    list_display = ('first_name', 'last_name', 'email', 'job_posting','company', 'score',  'service', 'submitted_at')
-    list_filter = ('job_posting', 'service')
+    list_display = ('first_name', 'last_name', 'email', 'job_posting','company', 'score', 'prescore', 'scoring_status', 'scoring_attempts', 'service', 'submitted_at')
+    list_filter = ('job_posting', 'service', 'scoring_status')
     search_fields = ('first_name', 'last_name', 'email')
 
-admin.site.register(UserSubmission, UserSubmissionAdmin)
\ No newline at end of file
+class RescoreJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'service', 'job_posting', 'status', 'submission_count', 'scored_count', 'failed_count', 'created_at')
+    list_filter = ('service', 'status')
+
+admin.site.register(UserSubmission, UserSubmissionAdmin)
+admin.site.register(RescoreJob, RescoreJobAdmin)
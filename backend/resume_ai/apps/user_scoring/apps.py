@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class UserScoringConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'user_scoring'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,34 @@
+import uuid
+from django.core.management.base import BaseCommand
+from user_scoring.services.export.export import FORMATS, export_queryset, iter_export, iter_rows, parse_iso_datetime
+
+class Command(BaseCommand):
+    help = "Export scored submissions, oldest first, as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--export-format', choices=list(FORMATS), default='csv', help="Output format (default: csv).")
+        parser.add_argument('--company', help="Only export submissions for this company.")
+        parser.add_argument('--job-posting', type=int, help="Only export submissions for this job posting.")
+        parser.add_argument('--submitted-after', type=parse_iso_datetime,
+                            help="Only export submissions made at or after this ISO 8601 time.")
+        parser.add_argument('--submitted-before', type=parse_iso_datetime,
+                            help="Only export submissions made at or before this ISO 8601 time.")
+        parser.add_argument('--after', type=uuid.UUID, metavar='SUBMISSION_ID',
+                            help="Resume an export after this submission, the last one exported.")
+        parser.add_argument('--output', help="File to write to (default: standard output).")
+
+    def handle(self, *args, **options):
+        queryset = export_queryset(
+            company=options['company'],
+            job_posting_id=options['job_posting'],
+            submitted_after=options['submitted_after'],
+            submitted_before=options['submitted_before'],
+            after=options['after'],
+        )
+        chunks = iter_export(options['export_format'], iter_rows(queryset))
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                output.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk.decode('utf-8'), ending='')
@@ -0,0 +1,49 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from user_scoring.models import RescoreJob
+from user_scoring.services.batch_rescoring.batch_rescoring import advance_rescore_job
+from user_scoring.services.scoring_service.scoring_service_factory import ScoringServiceFactory
+from user_scoring.tasks import run_rescore_job
+
+class Command(BaseCommand):
+    help = "Re-score submissions in bulk through the provider's batch API."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--service', default='openai', help="The scoring service to re-score with (default: openai).")
+        parser.add_argument('--job-posting', type=int, help="Only re-score submissions for this job posting.")
+        parser.add_argument('--resume', metavar='RESCORE_JOB_ID', help="Resume an interrupted re-scoring job.")
+        parser.add_argument('--sync', action='store_true', help="Run the job in this process instead of on Celery.")
+
+    def handle(self, *args, **options):
+        if options['resume']:
+            try:
+                rescore_job = RescoreJob.objects.get(id=options['resume'])
+            except (RescoreJob.DoesNotExist, ValueError):
+                raise CommandError(f"Re-scoring job {options['resume']} not found.")
+            if rescore_job.status in (RescoreJob.STATUS_COMPLETED, RescoreJob.STATUS_FAILED):
+                raise CommandError(f"Re-scoring job {rescore_job.id} is {rescore_job.status}.")
+        else:
+            rescore_job = RescoreJob(service=options['service'], job_posting_id=options['job_posting'])
+
+        try:
+            scoring_service = ScoringServiceFactory.get_scoring_service(rescore_job.service)
+        except ValueError as e:
+            raise CommandError(str(e))
+        if not scoring_service.supports_batch:
+            raise CommandError(f"The '{rescore_job.service}' service has no batch API.")
+        rescore_job.save()
+
+        if not options['sync']:
+            run_rescore_job.delay(str(rescore_job.id))
+            self.stdout.write(f"Queued re-scoring job {rescore_job.id}.")
+            return
+
+        while True:
+            delay = advance_rescore_job(rescore_job, scoring_service)
+            self.stdout.write(f"Re-scoring job {rescore_job.id}: {rescore_job.status}")
+            if delay is None:
+                break
+            time.sleep(delay)
+        self.stdout.write(
+            f"Scored {rescore_job.scored_count} of {rescore_job.submission_count} submissions, "
+            f"{rescore_job.failed_count} failed.")
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.23 on 2026-10-18 18:12
+
+from django.db import migrations, models
+
+
+def mark_scored_submissions(apps, schema_editor):
+    UserSubmission = apps.get_model('user_scoring', 'UserSubmission')
+    UserSubmission.objects.filter(score__isnull=False).update(scoring_status='scored', scoring_attempts=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_scoring', '0005_usersubmission_company'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usersubmission',
+            name='last_scoring_error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='usersubmission',
+            name='scoring_attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='usersubmission',
+            name='scoring_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('scored', 'Scored'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.RunPython(mark_scored_submissions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.23 on 2026-10-18 18:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_scoring', '0006_usersubmission_scoring_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usersubmission',
+            name='feedback',
+            field=models.TextField(blank=True, default=''),
+        ),
+    ]
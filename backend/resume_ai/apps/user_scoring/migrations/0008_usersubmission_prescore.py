@@ -0,0 +1,23 @@
+# Generated by Django 3.2.23 on 2026-10-18 18:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_scoring', '0007_usersubmission_feedback'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usersubmission',
+            name='prescore',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='usersubmission',
+            name='scoring_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('scored', 'Scored'), ('failed', 'Failed'), ('deferred', 'Deferred'), ('screened_out', 'Screened out')], default='pending', max_length=20),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.23 on 2026-10-18 18:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid6
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_postings', '0003_jobpostingindex'),
+        ('user_scoring', '0008_usersubmission_prescore'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RescoreJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid6.uuid6, editable=False, primary_key=True, serialize=False)),
+                ('service', models.CharField(max_length=20)),
+                ('status', models.CharField(choices=[('preparing', 'Preparing'), ('running', 'Running'), ('applying', 'Applying results'), ('completed', 'Completed'), ('failed', 'Failed')], default='preparing', max_length=20)),
+                ('input_file_id', models.CharField(blank=True, default='', max_length=100)),
+                ('batch_id', models.CharField(blank=True, default='', max_length=100)),
+                ('output_file_id', models.CharField(blank=True, default='', max_length=100)),
+                ('error_file_id', models.CharField(blank=True, default='', max_length=100)),
+                ('submission_count', models.PositiveIntegerField(default=0)),
+                ('cursor', models.PositiveIntegerField(default=0)),
+                ('scored_count', models.PositiveIntegerField(default=0)),
+                ('failed_count', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job_posting', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='job_postings.jobposting')),
+            ],
+        ),
+    ]
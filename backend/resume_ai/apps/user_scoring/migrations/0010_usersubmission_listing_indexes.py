@@ -0,0 +1,29 @@
+# Generated by Django 3.2.23 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_scoring', '0009_rescorejob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usersubmission',
+            index=models.Index(fields=['job_posting', '-score', '-id'], name='submission_posting_score'),
+        ),
+        migrations.AddIndex(
+            model_name='usersubmission',
+            index=models.Index(fields=['job_posting', '-id'], name='submission_posting_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='usersubmission',
+            index=models.Index(fields=['company', '-score', '-id'], name='submission_company_score'),
+        ),
+        migrations.AddIndex(
+            model_name='usersubmission',
+            index=models.Index(fields=['company', '-id'], name='submission_company_recent'),
+        ),
+    ]
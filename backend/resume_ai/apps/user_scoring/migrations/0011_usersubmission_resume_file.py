@@ -0,0 +1,28 @@
+# Generated by Django 3.2.23 on 2026-10-18 18:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_scoring', '0010_usersubmission_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usersubmission',
+            name='resume_file',
+            field=models.FileField(blank=True, upload_to='resumes/%Y/%m/%d/'),
+        ),
+        migrations.AlterField(
+            model_name='usersubmission',
+            name='resume',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='usersubmission',
+            name='scoring_status',
+            field=models.CharField(choices=[('extracting', 'Extracting'), ('pending', 'Pending'), ('scored', 'Scored'), ('failed', 'Failed'), ('deferred', 'Deferred'), ('screened_out', 'Screened out')], default='pending', max_length=20),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.23 on 2026-10-18 18:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_scoring', '0011_usersubmission_resume_file'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usersubmission',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=255, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='usersubmission',
+            name='resume_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='usersubmission',
+            name='scoring_task_id',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='usersubmission',
+            index=models.Index(fields=['job_posting', 'resume_hash'], name='submission_posting_resume'),
+        ),
+    ]
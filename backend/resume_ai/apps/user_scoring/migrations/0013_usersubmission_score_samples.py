@@ -0,0 +1,23 @@
+# Generated by Django 3.2.23 on 2026-10-18 18:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_scoring', '0012_usersubmission_dedup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usersubmission',
+            name='score_samples',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='usersubmission',
+            name='score_variance',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
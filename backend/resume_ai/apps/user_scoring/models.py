@@ -1,8 +1,103 @@
-from django.db import models
+import operator
+from datetime import timedelta
+from functools import reduce
+from django.db import models, transaction
+from django.db.models import Q
+from django.utils import timezone
 from job_postings.models import JobPosting
 import uuid6
 
+class UserSubmissionQuerySet(models.QuerySet):
+
+    def for_scoring(self):
+        """
+        Load only the columns scoring reads, with the job posting and its description index in the same query.
+        """
+        return self.select_related('job_posting__description_index').only(
+            'id', 'job_posting', 'resume', 'score', 'service', 'scoring_status', 'scoring_attempts',
+            'job_posting__prescreen_threshold',
+            'job_posting__description_index__description',
+            'job_posting__description_index__term_weights',
+            'job_posting__description_index__prompt_prefix_hash',
+        )
+
+    def save_scoring_results(self, submissions, update_fields, loaded_attempts):
+        """
+        Write back the outcomes of several scoring attempts, skipping rows another attempt got to first.
+
+        The batch counterpart of ``UserSubmission.save_scoring_result``: only
+        rows whose ``scoring_attempts`` still has the value it had when they
+        were loaded are written, in one bulk update. The rows are locked
+        (with ``SELECT ... FOR UPDATE`` where the database supports it) from
+        the check until the update.
+
+        Parameters:
+        -----------
+        submissions : list of UserSubmission
+            The submissions to write.
+        update_fields : list of str
+            The fields to write.
+        loaded_attempts : dict
+            Maps each submission's primary key to its ``scoring_attempts`` when it was loaded.
+
+        Returns:
+        --------
+        set
+            The primary keys of the rows that were updated.
+        """
+        if not submissions:
+            return set()
+        condition = reduce(operator.or_, (
+            Q(pk=submission.pk, scoring_attempts=loaded_attempts[submission.pk]) for submission in submissions))
+        with transaction.atomic(using=self.db):
+            current = set(self.select_for_update().filter(condition).values_list('pk', flat=True))
+            self.bulk_update([submission for submission in submissions if submission.pk in current], update_fields)
+        return current
+
+    def duplicate_of(self, job_posting_id, email, resume_hash, window):
+        """
+        Return the latest submission of the same resume by the same applicant to a job posting.
+
+        Parameters:
+        -----------
+        job_posting_id : int
+            The job posting applied to.
+        email : str
+            The applicant's email address, compared case-insensitively.
+        resume_hash : str
+            The ``resume_hash`` of the new submission.
+        window : float
+            How far back to look, in seconds.
+
+        Returns:
+        --------
+        UserSubmission or None
+            The duplicate, unless its scoring failed.
+        """
+        return self.filter(
+            job_posting_id=job_posting_id, resume_hash=resume_hash, email__iexact=email,
+            submitted_at__gte=timezone.now() - timedelta(seconds=window),
+        ).exclude(scoring_status=UserSubmission.STATUS_FAILED).order_by('-id').first()
+
+# The fields ``UserSubmission.set_score`` writes.
+SCORE_FIELDS = ['score', 'score_variance', 'score_samples']
+
 class UserSubmission(models.Model):
+    STATUS_EXTRACTING = 'extracting'
+    STATUS_PENDING = 'pending'
+    STATUS_SCORED = 'scored'
+    STATUS_FAILED = 'failed'
+    STATUS_DEFERRED = 'deferred'
+    STATUS_SCREENED_OUT = 'screened_out'
+    STATUS_CHOICES = [
+        (STATUS_EXTRACTING, 'Extracting'),
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SCORED, 'Scored'),
+        (STATUS_FAILED, 'Failed'),
+        (STATUS_DEFERRED, 'Deferred'),
+        (STATUS_SCREENED_OUT, 'Screened out'),
+    ]
+
     id = models.UUIDField(primary_key=True, default=uuid6.uuid6, editable=False)
     job_posting = models.ForeignKey(JobPosting, on_delete=models.CASCADE)
     company = models.CharField(max_length=200)  # Add this line
@@ -10,10 +105,119 @@ class UserSubmission(models.Model):
     last_name = models.CharField(max_length=100)
     email = models.EmailField()
     phone_number = models.CharField(max_length=20)
-    resume = models.CharField(max_length=8000)
+    # Pasted text, or the text extracted from ``resume_file``, normalized.
+    resume = models.TextField(blank=True)
+    # The uploaded original, if the resume was submitted as a file.
+    resume_file = models.FileField(upload_to='resumes/%Y/%m/%d/', blank=True)
+    # SHA-256 of the normalized resume text, or of the uploaded file, to spot repeated submissions.
+    resume_hash = models.CharField(max_length=64, blank=True, default='')
+    # The client's Idempotency-Key header, if it sent one.
+    idempotency_key = models.CharField(max_length=255, null=True, blank=True, unique=True)
+    # The Celery task started for the submission, returned again for duplicates.
+    scoring_task_id = models.CharField(max_length=255, blank=True, default='')
     score = models.FloatField(null=True, blank=True)
+    # For scores averaged over several samples (see EnsembleScoringService), their
+    # variance (null for a single sample) and count.
+    score_variance = models.FloatField(null=True, blank=True)
+    score_samples = models.PositiveIntegerField(null=True, blank=True)
+    prescore = models.FloatField(null=True, blank=True)
+    feedback = models.TextField(blank=True, default='')
     submitted_at = models.DateTimeField(auto_now_add=True)
     service = models.CharField(max_length=20)
+    scoring_status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    scoring_attempts = models.PositiveIntegerField(default=0)
+    last_scoring_error = models.TextField(blank=True, default='')
+
+    objects = UserSubmissionQuerySet.as_manager()
+
+    class Meta:
+        # The listing orders: by score (unscored last) or by submission time,
+        # for which the time-ordered id stands in, within a posting or company.
+        indexes = [
+            models.Index(fields=['job_posting', '-score', '-id'], name='submission_posting_score'),
+            models.Index(fields=['job_posting', '-id'], name='submission_posting_recent'),
+            models.Index(fields=['company', '-score', '-id'], name='submission_company_score'),
+            models.Index(fields=['company', '-id'], name='submission_company_recent'),
+            models.Index(fields=['job_posting', 'resume_hash'], name='submission_posting_resume'),
+        ]
+
+    def __str__(self):
+        return f"{self.first_name} {self.last_name} - {self.job_posting.title}"
+
+    def set_score(self, score):
+        """
+        Set ``score`` together with its ``score_variance`` and ``score_samples``.
+
+        Parameters:
+        -----------
+        score : float
+            A score from a scoring service; an ``EnsembleScore`` carries its
+            variance and sample count, any other score counts as one sample.
+        """
+        self.score = score
+        self.score_variance = getattr(score, 'variance', None)
+        self.score_samples = getattr(score, 'samples', 1)
+
+    def save_scoring_result(self, update_fields, scoring_attempts):
+        """
+        Write back the outcome of a scoring attempt, unless another attempt got there first.
+
+        The row is only updated while its ``scoring_attempts`` still has the
+        value this attempt started from, so a duplicate delivery of the same
+        task cannot overwrite the result of the one that finished first.
+
+        Parameters:
+        -----------
+        update_fields : list of str
+            The fields to write.
+        scoring_attempts : int
+            The number of attempts when this instance was loaded.
+
+        Returns:
+        --------
+        bool
+            Whether the row was updated.
+        """
+        values = {name: getattr(self, name) for name in update_fields}
+        return type(self).objects.filter(pk=self.pk, scoring_attempts=scoring_attempts).update(**values) == 1
+
+class RescoreJob(models.Model):
+    """
+    A bulk re-scoring run through a provider's batch API.
+
+    The job moves through its statuses one step at a time and every step can
+    be repeated, so a job interrupted by a crash is resumed by running it again.
+    ``cursor`` counts the result lines already written back.
+    """
+    STATUS_PREPARING = 'preparing'
+    STATUS_RUNNING = 'running'
+    STATUS_APPLYING = 'applying'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PREPARING, 'Preparing'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_APPLYING, 'Applying results'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid6.uuid6, editable=False)
+    service = models.CharField(max_length=20)
+    # Limits the job to one posting's submissions; all postings when empty.
+    job_posting = models.ForeignKey(JobPosting, on_delete=models.CASCADE, null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PREPARING)
+    input_file_id = models.CharField(max_length=100, blank=True, default='')
+    batch_id = models.CharField(max_length=100, blank=True, default='')
+    output_file_id = models.CharField(max_length=100, blank=True, default='')
+    error_file_id = models.CharField(max_length=100, blank=True, default='')
+    submission_count = models.PositiveIntegerField(default=0)
+    cursor = models.PositiveIntegerField(default=0)
+    scored_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return f"{self.first_name} {self.last_name} - {self.job_posting.title}"
\ No newline at end of file
+        return f"{self.service} rescore {self.id} ({self.status})"
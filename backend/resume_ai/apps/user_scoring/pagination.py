@@ -0,0 +1,149 @@
+import base64
+import json
+import math
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination that seeks to the next page instead of counting rows.
+
+    Each page is fetched with a ``WHERE (sort key) < (last row's sort key)``
+    condition on an indexed ordering that ends in the primary key, so the
+    cost of a page does not grow with its position in the list. The cursor
+    is an opaque encoding of the last row's sort key.
+
+    The view provides the ordering as ``keyset_ordering``: field names, each
+    prefixed with '-' for descending order. The last field must be unique.
+    If the first field is nullable, the rows where it is null follow all
+    others, ordered by the remaining fields; they are read with a separate
+    query so that both parts can use a plain index, whatever the database's
+    null ordering.
+
+    The rows may be model instances or, for a ``values()`` queryset, dicts
+    that include the ordering fields.
+    """
+
+    page_size = 50
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = view.keyset_ordering
+        page_size = self.get_page_size(request)
+        cursor = request.query_params.get(self.cursor_query_param)
+        values = self._decode_cursor(cursor, queryset.model) if cursor else None
+
+        first = self.ordering[0].lstrip('-')
+        if not queryset.model._meta.get_field(first).null:
+            rows = list(self._page(queryset, self.ordering, values, page_size + 1))
+        else:
+            rows = []
+            if values is None or values[0] is not None:
+                rows = list(self._page(queryset.filter(**{f'{first}__isnull': False}), self.ordering, values, page_size + 1))
+            if len(rows) <= page_size:
+                rest_values = values[1:] if values is not None and values[0] is None else None
+                rows += self._page(
+                    queryset.filter(**{f'{first}__isnull': True}), self.ordering[1:], rest_values, page_size + 1 - len(rows))
+
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        values = [_to_json(_field_value(last, field.lstrip('-'))) for field in self.ordering]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self._encode_cursor(values))
+
+    def _page(self, queryset, ordering, values, limit):
+        if values is not None:
+            queryset = queryset.filter(self._after(ordering, values))
+        return list(queryset.order_by(*ordering)[:limit])
+
+    def _after(self, ordering, values):
+        """
+        Build the condition selecting the rows that sort after the given key.
+        """
+        condition = Q(pk__in=[])
+        equal = Q()
+        for field, value in zip(ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def _encode_cursor(self, values):
+        return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+    def _decode_cursor(self, cursor, model):
+        """
+        Decode a cursor into the sort key it holds, converted to the ordering fields' types.
+
+        Raises:
+        -------
+        NotFound
+            If the cursor is malformed or does not hold a valid key for the ordering.
+        """
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except ValueError:
+            raise NotFound('Invalid cursor.')
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound('Invalid cursor.')
+        fields = [model._meta.get_field(field.lstrip('-')) for field in self.ordering]
+        try:
+            return [_from_json(field, value, nullable=index == 0)
+                    for index, (field, value) in enumerate(zip(fields, values))]
+        except ValidationError:
+            raise NotFound('Invalid cursor.')
+
+def _from_json(field, value, nullable):
+    # Only the first field may be null (see KeysetPagination), and cursors
+    # only ever hold the JSON scalars written by _to_json.
+    if value is None and nullable and field.null:
+        return None
+    if value is None or isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValidationError('Invalid cursor value.')
+    if isinstance(value, float) and not math.isfinite(value):
+        raise ValidationError('Invalid cursor value.')
+    try:
+        return field.to_python(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ValidationError('Invalid cursor value.')
+
+def _field_value(row, name):
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+def _to_json(value):
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    return str(value)
@@ -0,0 +1,36 @@
+import orjson
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.renderers import JSONRenderer
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Renders JSON with orjson.
+
+    The output matches DRF's ``JSONRenderer`` with its default settings
+    (compact, UTF-8), so plain rows can be passed to a ``Response`` without a
+    serializer: UUIDs become strings and UTC datetimes are written in ISO
+    8601 with a 'Z' suffix, as ``serializers.DateTimeField`` does.
+    """
+
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=DjangoJSONEncoder().default, option=self.options)
+
+
+class FirstRendererNegotiation(BaseContentNegotiation):
+    """
+    Always use the view's first renderer, whatever the client accepts.
+
+    For views that usually answer with a file in a format chosen by a query
+    parameter, so that e.g. ``Accept: text/csv`` does not fail negotiation.
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
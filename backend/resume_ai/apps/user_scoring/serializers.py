@@ -1,7 +1,12 @@
+import hashlib
+import os
 from rest_framework import serializers
 from .models import UserSubmission
+from .services.resume_extraction.resume_extraction import SUPPORTED_EXTENSIONS
+from django.conf import settings
 from django.core.validators import EmailValidator, RegexValidator
 from django.utils import timezone
+from resume_ai.text_processing import normalize_text
 
 class UserSubmissionSerializer(serializers.ModelSerializer):
     full_name = serializers.SerializerMethodField()
@@ -9,8 +14,9 @@ class UserSubmissionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = UserSubmission
-        fields = ['id', 'job_posting', 'first_name', 'last_name', 'email', 'phone_number', 'resume', 'score', 'submitted_at', 'service', 'full_name', 'days_since_submission']
+        fields = ['id', 'job_posting', 'first_name', 'last_name', 'email', 'phone_number', 'resume', 'resume_file', 'score', 'submitted_at', 'service', 'full_name', 'days_since_submission']
         read_only_fields = ['score', 'submitted_at', 'id']
+        extra_kwargs = {'resume_file': {'write_only': True}}
 
     def validate_email(self, value):
         validator = EmailValidator(message="Enter a valid email address.")
@@ -25,13 +31,35 @@ class UserSubmissionSerializer(serializers.ModelSerializer):
         validator(value)
         return value
 
+    def validate_resume(self, value):
+        if len(value) > settings.RESUME_MAX_LENGTH:
+            raise serializers.ValidationError(
+                f"Ensure the resume has no more than {settings.RESUME_MAX_LENGTH} characters, or upload it as a file.")
+        return value
+
+    def validate_resume_file(self, value):
+        if value is None:
+            return value
+        if os.path.splitext(value.name)[1].lower() not in SUPPORTED_EXTENSIONS:
+            raise serializers.ValidationError(f"Resume files must be one of {', '.join(SUPPORTED_EXTENSIONS)}.")
+        if value.size > settings.RESUME_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f"Resume files must be at most {settings.RESUME_UPLOAD_MAX_SIZE} bytes.")
+        return value
+
     def validate(self, data):
         if len(data['first_name']) < 2 or len(data['last_name']) < 2:
             raise serializers.ValidationError("First name and last name must be at least 2 characters long.")
+        if self.instance is None and bool(data.get('resume')) == bool(data.get('resume_file')):
+            raise serializers.ValidationError("Provide either the resume text or a resume file.")
+        if self.instance is None:
+            data['resume_hash'] = resume_hash(data.get('resume'), data.get('resume_file'))
         return data
 
     def create(self, validated_data):
         validated_data['submitted_at'] = timezone.now()
+        if validated_data.get('resume_file'):
+            # The text is filled in by the extract_resume task.
+            validated_data['scoring_status'] = UserSubmission.STATUS_EXTRACTING
         return UserSubmission.objects.create(**validated_data)
 
     def update(self, instance, validated_data):
@@ -48,6 +76,72 @@ class UserSubmissionSerializer(serializers.ModelSerializer):
             return (timezone.now() - obj.submitted_at).days
         return None
 
+def resume_hash(resume=None, resume_file=None):
+    """
+    Return the SHA-256 hex digest identifying a submitted resume.
+
+    Pasted text is hashed once normalized, so that whitespace changes do
+    not make it a different resume; an uploaded file is hashed as is.
+    """
+    digest = hashlib.sha256()
+    if resume_file:
+        for chunk in resume_file.chunks():
+            digest.update(chunk)
+        resume_file.seek(0)
+    else:
+        digest.update(normalize_text(resume or '').encode('utf-8'))
+    return digest.hexdigest()
+
 class UserSubmissionReadSerializer(UserSubmissionSerializer):
     class Meta(UserSubmissionSerializer.Meta):
-        fields = ['id', 'job_posting', 'company', 'full_name', 'email', 'score', 'submitted_at', 'days_since_submission']
\ No newline at end of file
+        fields = ['id', 'job_posting', 'company', 'full_name', 'email', 'score', 'score_variance', 'score_samples', 'prescore', 'scoring_status', 'submitted_at', 'days_since_submission']
+
+# The columns read for the lean list path, and the fields it returns, in the
+# order of UserSubmissionReadSerializer.
+READ_COLUMNS = ('id', 'job_posting', 'company', 'first_name', 'last_name', 'email', 'score', 'score_variance',
+                'score_samples', 'prescore', 'scoring_status', 'submitted_at')
+
+def read_values(queryset):
+    """
+    Return ``queryset`` as dicts of the columns that ``read_data`` needs.
+    """
+    return queryset.values(*READ_COLUMNS)
+
+def read_data(rows, now=None):
+    """
+    Build the ``UserSubmissionReadSerializer`` representation of ``read_values`` rows.
+
+    This skips the serializer machinery for large lists: each row becomes one
+    dict, and the current time is taken once for all of them. Values are
+    left as Python objects (UUIDs, datetimes) for ``ORJSONRenderer``.
+
+    Parameters:
+    -----------
+    rows : iterable of dict
+        Rows from ``read_values``.
+    now : datetime, optional
+        The time ``days_since_submission`` is counted to; defaults to now.
+
+    Returns:
+    --------
+    list of dict
+    """
+    if now is None:
+        now = timezone.now()
+    return [
+        {
+            'id': row['id'],
+            'job_posting': row['job_posting'],
+            'company': row['company'],
+            'full_name': f"{row['first_name']} {row['last_name']}",
+            'email': row['email'],
+            'score': row['score'],
+            'score_variance': row['score_variance'],
+            'score_samples': row['score_samples'],
+            'prescore': row['prescore'],
+            'scoring_status': row['scoring_status'],
+            'submitted_at': row['submitted_at'],
+            'days_since_submission': (now - row['submitted_at']).days if row['submitted_at'] else None,
+        }
+        for row in rows
+    ]
@@ -0,0 +1,194 @@
+import json
+import tempfile
+from itertools import chain, islice
+from django.conf import settings
+from django.db import transaction
+from ..leaderboard.leaderboard import record_scores
+
+COMPLETION_WINDOW = '24h'
+RUNNING_BATCH_STATUSES = frozenset(['validating', 'in_progress', 'finalizing'])
+
+class BatchRequestError(Exception):
+    """
+    Raised for a request of a batch that the provider could not complete.
+    """
+
+def rescore_queryset(rescore_job):
+    """
+    Return the submissions covered by a re-scoring job, in a stable order.
+    """
+    from user_scoring.models import UserSubmission
+
+    submissions = UserSubmission.objects.for_scoring().filter(service=rescore_job.service)
+    if rescore_job.job_posting_id is not None:
+        submissions = submissions.filter(job_posting_id=rescore_job.job_posting_id)
+    return submissions.order_by('id')
+
+def advance_rescore_job(rescore_job, scoring_service):
+    """
+    Take a re-scoring job through its next step.
+
+    A job in ``preparing`` writes a JSONL batch file with one request per
+    submission, uploads it and starts the batch. A ``running`` job checks on
+    the batch and, once it has completed, continues with ``applying``: the
+    result files are streamed line by line and the scores are written back in
+    chunks of ``settings.SCORING_BATCH_SIZE``, each chunk in one transaction
+    together with the job's ``cursor``. Every step picks up where an
+    interrupted run of it stopped.
+
+    Parameters:
+    -----------
+    rescore_job : RescoreJob
+        The job to advance.
+    scoring_service : ScoringService
+        The service for ``rescore_job.service``; it must support batch scoring.
+
+    Returns:
+    --------
+    float or None
+        The seconds after which the job should be advanced again, or None
+        once it has completed or failed.
+    """
+    if rescore_job.status == rescore_job.STATUS_PREPARING:
+        _submit_batch(rescore_job, scoring_service)
+        if rescore_job.status == rescore_job.STATUS_RUNNING:
+            return settings.RESCORE_POLL_INTERVAL
+    if rescore_job.status == rescore_job.STATUS_RUNNING:
+        if not _poll_batch(rescore_job, scoring_service):
+            return settings.RESCORE_POLL_INTERVAL
+    if rescore_job.status == rescore_job.STATUS_APPLYING:
+        _apply_results(rescore_job, scoring_service)
+    return None
+
+def _submit_batch(rescore_job, scoring_service):
+    client = scoring_service.client
+    if not rescore_job.input_file_id:
+        with tempfile.TemporaryFile() as batch_file:
+            count = 0
+            for submission in rescore_queryset(rescore_job).iterator(chunk_size=settings.SCORING_BATCH_SIZE):
+                batch_file.write(json.dumps(scoring_service.batch_request(submission)).encode('utf-8'))
+                batch_file.write(b'\n')
+                count += 1
+            if count == 0:
+                rescore_job.status = rescore_job.STATUS_COMPLETED
+                rescore_job.save(update_fields=['status', 'updated_at'])
+                return
+            batch_file.seek(0)
+            uploaded = client.files.create(file=(f'rescore-{rescore_job.id}.jsonl', batch_file), purpose='batch')
+        rescore_job.input_file_id = uploaded.id
+        rescore_job.submission_count = count
+        rescore_job.save(update_fields=['input_file_id', 'submission_count', 'updated_at'])
+
+    # The batch may have been created by a run that crashed before saving its id.
+    batch = _find_batch(rescore_job, scoring_service)
+    if batch is None:
+        batch = client.batches.create(
+            input_file_id=rescore_job.input_file_id,
+            endpoint=scoring_service.batch_endpoint,
+            completion_window=COMPLETION_WINDOW,
+            metadata={'rescore_job': str(rescore_job.id)},
+        )
+    rescore_job.batch_id = batch.id
+    rescore_job.status = rescore_job.STATUS_RUNNING
+    rescore_job.save(update_fields=['batch_id', 'status', 'updated_at'])
+
+def _find_batch(rescore_job, scoring_service):
+    for batch in scoring_service.client.batches.list(limit=100).data:
+        if batch.input_file_id == rescore_job.input_file_id:
+            return batch
+    return None
+
+def _poll_batch(rescore_job, scoring_service):
+    """
+    Check on the job's batch. Returns False while the batch is still running.
+    """
+    batch = scoring_service.client.batches.retrieve(rescore_job.batch_id)
+    if batch.status in RUNNING_BATCH_STATUSES:
+        return False
+    if batch.status == 'completed':
+        rescore_job.status = rescore_job.STATUS_APPLYING
+        rescore_job.output_file_id = batch.output_file_id or ''
+        rescore_job.error_file_id = batch.error_file_id or ''
+    else:
+        rescore_job.status = rescore_job.STATUS_FAILED
+        errors = getattr(batch.errors, 'data', None) or []
+        rescore_job.last_error = '; '.join(
+            [f"Batch {batch.status}"] + [error.message for error in errors if error.message])
+    rescore_job.save(update_fields=['status', 'output_file_id', 'error_file_id', 'last_error', 'updated_at'])
+    return True
+
+def _iter_file_lines(scoring_service, file_id):
+    if not file_id:
+        return
+    with scoring_service.client.files.with_streaming_response.content(file_id) as response:
+        for line in response.iter_lines():
+            if line:
+                yield line
+
+def _apply_results(rescore_job, scoring_service):
+    # The output and error files never change, so the position in the two
+    # files read one after the other identifies the next result to apply.
+    lines = chain(
+        _iter_file_lines(scoring_service, rescore_job.output_file_id),
+        _iter_file_lines(scoring_service, rescore_job.error_file_id),
+    )
+    lines = islice(lines, rescore_job.cursor, None)
+    while True:
+        chunk = list(islice(lines, settings.SCORING_BATCH_SIZE))
+        if not chunk:
+            break
+        _apply_chunk(rescore_job, scoring_service, chunk)
+
+    rescore_job.status = rescore_job.STATUS_COMPLETED
+    rescore_job.save(update_fields=['status', 'updated_at'])
+
+def _parse_result(scoring_service, line):
+    """
+    Return the submission id of a result line and its score, or the error that prevented scoring.
+    """
+    result = json.loads(line)
+    response = result.get('response') or {}
+    if result.get('error') or response.get('status_code') != 200:
+        error = result.get('error') or response.get('body', {}).get('error') or {}
+        return result['custom_id'], BatchRequestError(error.get('message') or f"Status {response.get('status_code')}")
+    try:
+        return result['custom_id'], scoring_service._parse_score(scoring_service.batch_response(response['body']))
+    except ValueError as exc:
+        return result['custom_id'], exc
+
+def _apply_chunk(rescore_job, scoring_service, lines):
+    from user_scoring.models import SCORE_FIELDS, UserSubmission
+
+    results = {}
+    for line in lines:
+        submission_id, score = _parse_result(scoring_service, line)
+        results[UserSubmission._meta.pk.to_python(submission_id)] = score
+    submissions = rescore_queryset(rescore_job).in_bulk(list(results))
+    cache = scoring_service.get_cache()
+    scored = []
+    failed = []
+    for submission_id, score in results.items():
+        submission = submissions.get(submission_id)
+        if submission is None:
+            continue
+        if isinstance(score, Exception):
+            # The previous score stays in place; only the error is recorded.
+            submission.last_scoring_error = f"{type(score).__name__}: {score}"
+            failed.append(submission)
+        else:
+            submission.set_score(score)
+            submission.scoring_status = UserSubmission.STATUS_SCORED
+            submission.last_scoring_error = ''
+            scored.append(submission)
+
+    with transaction.atomic():
+        UserSubmission.objects.bulk_update(scored + failed, SCORE_FIELDS + ['scoring_status', 'last_scoring_error'])
+        rescore_job.cursor += len(lines)
+        rescore_job.scored_count += len(scored)
+        rescore_job.failed_count += len(failed)
+        rescore_job.save(update_fields=['cursor', 'scored_count', 'failed_count', 'updated_at'])
+    record_scores(scored)
+
+    if cache is not None:
+        for submission in scored:
+            cache.set(scoring_service.get_cache_key(submission), submission.score, job_posting_id=submission.job_posting_id)
@@ -0,0 +1,143 @@
+import csv
+from datetime import datetime
+from itertools import islice
+import orjson
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+FIELDS = ('id', 'job_posting', 'company', 'full_name', 'email', 'score', 'score_variance', 'score_samples',
+          'prescore', 'scoring_status', 'submitted_at', 'days_since_submission')
+
+def export_queryset(company=None, job_posting_id=None, submitted_after=None, submitted_before=None, after=None):
+    """
+    Return the scored submissions to export, oldest first.
+
+    Parameters:
+    -----------
+    company : str, optional
+        Only export submissions for this company.
+    job_posting_id : int, optional
+        Only export submissions for this job posting.
+    submitted_after, submitted_before : datetime, optional
+        Only export submissions made in this window (inclusive).
+    after : UUID, optional
+        Resume an export after the submission with this id, the last one
+        exported. Ids are time-ordered, so this is a keyset cursor.
+
+    Returns:
+    --------
+    QuerySet
+        ``read_values`` rows ordered by id.
+    """
+    from user_scoring.models import UserSubmission
+    from user_scoring.serializers import read_values
+
+    queryset = UserSubmission.objects.filter(score__isnull=False)
+    if company:
+        queryset = queryset.filter(company=company)
+    if job_posting_id:
+        queryset = queryset.filter(job_posting_id=job_posting_id)
+    if submitted_after:
+        queryset = queryset.filter(submitted_at__gte=submitted_after)
+    if submitted_before:
+        queryset = queryset.filter(submitted_at__lte=submitted_before)
+    if after:
+        queryset = queryset.filter(id__gt=after)
+    return read_values(queryset).order_by('id')
+
+def parse_iso_datetime(value):
+    """
+    Parse an ISO 8601 date and time, in the current time zone if it has no offset.
+
+    Raises:
+    -------
+    ValueError
+        If ``value`` is not an ISO 8601 date and time.
+    """
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(f'Invalid date and time: {value!r}')
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+def iter_rows(queryset, chunk_size=None):
+    """
+    Yield the export rows of ``queryset`` while holding one chunk in memory.
+
+    Rows are read with a server-side cursor. When those are disabled (behind
+    PgBouncer) the driver would load the whole result at once, so each chunk
+    is read with its own keyset query instead.
+    """
+    from user_scoring.serializers import read_data
+
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    if connections[queryset.db].settings_dict.get('DISABLE_SERVER_SIDE_CURSORS'):
+        chunks = _keyset_chunks(queryset, chunk_size)
+    else:
+        rows = queryset.iterator(chunk_size=chunk_size)
+        chunks = iter(lambda: list(islice(rows, chunk_size)), [])
+    now = timezone.now()
+    for chunk in chunks:
+        yield from read_data(chunk, now)
+
+def _keyset_chunks(queryset, chunk_size):
+    chunk = list(queryset[:chunk_size])
+    while chunk:
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        chunk = list(queryset.filter(id__gt=chunk[-1]['id'])[:chunk_size])
+
+def iter_ndjson(rows):
+    """
+    Yield ``rows`` as newline-delimited JSON, one line per row.
+    """
+    from user_scoring.renderers import ORJSONRenderer
+
+    option = ORJSONRenderer.options | orjson.OPT_APPEND_NEWLINE
+    for row in rows:
+        yield orjson.dumps(row, option=option)
+
+def iter_csv(rows):
+    """
+    Yield ``rows`` as UTF-8 CSV lines, after a header line.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(FIELDS).encode('utf-8')
+    for row in rows:
+        yield writer.writerow([_csv_value(row[field]) for field in FIELDS]).encode('utf-8')
+
+def iter_export(export_format, rows):
+    """
+    Yield ``rows`` encoded as ``export_format``, one of ``FORMATS``, as bytes.
+    """
+    if export_format == 'csv':
+        return iter_csv(rows)
+    if export_format == 'ndjson':
+        return iter_ndjson(rows)
+    raise ValueError('Invalid export format specified.')
+
+
+class _Echo:
+    """
+    A file-like object whose ``write`` returns what is written, to stream ``csv.writer`` output.
+    """
+
+    def write(self, value):
+        return value
+
+def _csv_value(value):
+    # The same text as in the JSON representation.
+    if isinstance(value, datetime):
+        value = value.isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return value
@@ -0,0 +1,256 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from django.conf import settings
+
+class Leaderboard(ABC):
+    """
+    Abstract base class for materialized per-posting leaderboards.
+
+    A leaderboard holds the ``size`` best (score, submission id) pairs of a
+    job posting, in the same order as ``ORDER BY score DESC, id DESC``. It is
+    built from the database on first read and then kept up to date as scores
+    are written. An update that could let a submission outside the board
+    move into it (a board member losing score or being removed) drops the
+    board instead, so it is rebuilt on the next read.
+    """
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+
+    @abstractmethod
+    def top(self, job_posting_id, k):
+        """
+        Return the ids of the ``k`` best submissions, best first, or None if the board is not built.
+        """
+
+    @abstractmethod
+    def store(self, job_posting_id, entries):
+        """
+        Replace the board with ``entries``, the (submission id, score) pairs of the posting's best submissions.
+        """
+
+    @abstractmethod
+    def record(self, job_posting_id, submission_id, score):
+        """
+        Apply a newly written score to the board, if it is built.
+        """
+
+    @abstractmethod
+    def invalidate(self, job_posting_id):
+        """
+        Drop the board so that it is rebuilt on the next read.
+        """
+
+
+class LocMemLeaderboard(Leaderboard):
+    """
+    A per-process leaderboard. Only correct when a single process writes scores,
+    so it is only built with ``CELERY_TASK_ALWAYS_EAGER`` (tests and local runs,
+    where tasks run in the web process); Celery workers would record scores into
+    their own copies and the web process would serve a stale board until the TTL.
+    """
+
+    def __init__(self, size, ttl):
+        super().__init__(size, ttl)
+        self._boards = {}
+        self._lock = threading.Lock()
+
+    def top(self, job_posting_id, k):
+        with self._lock:
+            board = self._boards.get(job_posting_id)
+            if board is None:
+                return None
+            expires_at, scores = board
+            if expires_at <= time.monotonic():
+                del self._boards[job_posting_id]
+                return None
+            return [submission_id for submission_id, _ in _ranked(scores)[:k]]
+
+    def store(self, job_posting_id, entries):
+        with self._lock:
+            self._boards[job_posting_id] = (time.monotonic() + self.ttl, {str(i): float(s) for i, s in entries})
+
+    def record(self, job_posting_id, submission_id, score):
+        submission_id = str(submission_id)
+        with self._lock:
+            board = self._boards.get(job_posting_id)
+            if board is None:
+                return
+            scores = board[1]
+            previous = scores.get(submission_id)
+            if score is None or (previous is not None and score < previous):
+                del self._boards[job_posting_id]
+                return
+            scores[submission_id] = float(score)
+            for submission_id, _ in _ranked(scores)[self.size:]:
+                del scores[submission_id]
+
+    def invalidate(self, job_posting_id):
+        with self._lock:
+            self._boards.pop(job_posting_id, None)
+
+def _ranked(scores):
+    # Submission ids are UUIDv6 strings, which sort by creation time, like the ids themselves.
+    return sorted(scores.items(), key=lambda item: (item[1], item[0]), reverse=True)
+
+
+# KEYS[1]: the board. ARGV: submission id, new score (empty to remove), board size.
+RECORD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+local previous = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if ARGV[2] == '' or (previous and tonumber(ARGV[2]) < tonumber(previous)) then
+    redis.call('DEL', KEYS[1])
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+redis.call('ZREMRANGEBYRANK', KEYS[1], 0, -tonumber(ARGV[3]) - 1)
+return 1
+"""
+
+
+class RedisLeaderboard(Leaderboard):
+    """
+    Leaderboards shared by all web and worker processes, as Redis sorted sets.
+
+    Updates are applied atomically in a Lua script. A posting without scored
+    submissions has no sorted set and is read from the database every time,
+    which is cheap since there is nothing to rank.
+    """
+
+    key_prefix = 'leaderboard'
+
+    def __init__(self, size, ttl, url, client=None):
+        super().__init__(size, ttl)
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self._record_script = client.register_script(RECORD_SCRIPT)
+
+    def _key(self, job_posting_id):
+        return f'{self.key_prefix}:{job_posting_id}'
+
+    def top(self, job_posting_id, k):
+        members = self.client.zrevrange(self._key(job_posting_id), 0, k - 1)
+        if not members:
+            return None
+        return [member.decode() if isinstance(member, bytes) else member for member in members]
+
+    def store(self, job_posting_id, entries):
+        key = self._key(job_posting_id)
+        pipe = self.client.pipeline()
+        pipe.delete(key)
+        mapping = {str(submission_id): float(score) for submission_id, score in entries}
+        if mapping:
+            pipe.zadd(key, mapping)
+            pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def record(self, job_posting_id, submission_id, score):
+        self._record_script(
+            keys=[self._key(job_posting_id)],
+            args=[str(submission_id), '' if score is None else float(score), self.size],
+        )
+
+    def invalidate(self, job_posting_id):
+        self.client.delete(self._key(job_posting_id))
+
+
+_leaderboard = None
+_leaderboard_lock = threading.Lock()
+
+def get_leaderboard():
+    """
+    Return the process-wide leaderboard configured by ``LEADERBOARD_BACKEND``.
+
+    Returns:
+    --------
+    Leaderboard or None
+        The configured leaderboard, or None if leaderboards are disabled.
+
+    Raises:
+    -------
+    ValueError
+        If an invalid backend is configured.
+    """
+    global _leaderboard
+    if _leaderboard is None:
+        with _leaderboard_lock:
+            if _leaderboard is None:
+                _leaderboard = _build_leaderboard()
+    return _leaderboard or None
+
+def reset_leaderboard():
+    """
+    Forget the process-wide leaderboard so it is rebuilt from settings on next use.
+    """
+    global _leaderboard
+    with _leaderboard_lock:
+        _leaderboard = None
+
+def _build_leaderboard():
+    backend = settings.LEADERBOARD_BACKEND
+    if backend == 'locmem':
+        if not getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', False):
+            raise ValueError(
+                "The 'locmem' leaderboard only sees scores written in its own process; "
+                "use 'redis' when Celery workers score submissions.")
+        return LocMemLeaderboard(settings.LEADERBOARD_SIZE, settings.LEADERBOARD_TTL)
+    if backend == 'redis':
+        return RedisLeaderboard(settings.LEADERBOARD_SIZE, settings.LEADERBOARD_TTL, settings.LEADERBOARD_REDIS_URL)
+    if backend == 'none':
+        return False
+    raise ValueError('Invalid leaderboard backend specified.')
+
+def record_scores(submissions):
+    """
+    Apply the scores just written for ``submissions`` to their postings' leaderboards.
+    """
+    leaderboard = get_leaderboard()
+    if leaderboard is None:
+        return
+    for submission in submissions:
+        leaderboard.record(submission.job_posting_id, submission.id, submission.score)
+
+def top_applicants(job_posting_id, k):
+    """
+    Return the ``k`` best scored submissions of a job posting, best first.
+
+    Without a leaderboard, or for ``k`` larger than it, this is a single
+    ``ORDER BY score DESC, id DESC LIMIT k`` on the posting's score index.
+    With one, the ids come from the leaderboard (built from that query on
+    first use) and the rows are fetched by primary key. The large text
+    columns are left out.
+
+    Parameters:
+    -----------
+    job_posting_id : int
+        The job posting whose applicants are ranked.
+    k : int
+        The number of submissions to return.
+
+    Returns:
+    --------
+    list of UserSubmission
+    """
+    from user_scoring.models import UserSubmission
+
+    scored = UserSubmission.objects.filter(job_posting_id=job_posting_id, score__isnull=False).defer(
+        'resume', 'feedback', 'last_scoring_error', 'phone_number')
+    ranked = scored.order_by('-score', '-id')
+    leaderboard = get_leaderboard()
+    if leaderboard is None or k > leaderboard.size:
+        return list(ranked[:k])
+
+    ids = leaderboard.top(job_posting_id, k)
+    if ids is None:
+        entries = list(ranked.values_list('id', 'score')[:leaderboard.size])
+        leaderboard.store(job_posting_id, entries)
+        ids = [str(submission_id) for submission_id, _ in entries[:k]]
+    ids = [UserSubmission._meta.pk.to_python(submission_id) for submission_id in ids]
+    submissions = scored.in_bulk(ids)
+    return [submissions[submission_id] for submission_id in ids if submission_id in submissions]
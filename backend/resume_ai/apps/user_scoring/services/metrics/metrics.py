@@ -0,0 +1,197 @@
+import os
+import socket
+import threading
+import time
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram,
+    delete_from_gateway, generate_latest, push_to_gateway,
+)
+from prometheus_client import multiprocess
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+QUEUE_WAIT_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600)
+
+STAGE_SECONDS = Histogram(
+    'resume_ai_scoring_stage_seconds', 'Time spent in each stage of scoring a submission.',
+    ['service', 'stage'], buckets=LATENCY_BUCKETS)
+CACHE_REQUESTS = Counter(
+    'resume_ai_scoring_cache_requests_total', 'Score cache lookups.', ['service', 'result'])
+PARSE_FAILURES = Counter(
+    'resume_ai_scoring_parse_failures_total', 'Model responses without a parsable score.', ['service'])
+TOKENS = Counter(
+    'resume_ai_scoring_tokens_total', 'Tokens reported by the providers.', ['service', 'kind'])
+PROMPT_TOKENS = Counter(
+    'resume_ai_prompt_compaction_tokens_total', 'Estimated resume tokens before and after prompt compaction.',
+    ['service', 'stage'])
+SUBMISSIONS = Counter(
+    'resume_ai_scoring_submissions_total', 'Scoring attempts by outcome.', ['service', 'outcome'])
+RETRIES = Counter(
+    'resume_ai_scoring_retries_total', 'Scoring attempts that were scheduled again.', ['service', 'reason'])
+TASK_SECONDS = Histogram(
+    'resume_ai_task_seconds', 'Run time of Celery tasks.', ['task', 'state'], buckets=LATENCY_BUCKETS)
+TASK_QUEUE_WAIT_SECONDS = Histogram(
+    'resume_ai_task_queue_wait_seconds', 'Time from enqueueing (or the ETA) to the start of a Celery task.',
+    ['task'], buckets=QUEUE_WAIT_BUCKETS)
+
+_task_started = {}
+_pusher = None
+
+def time_stage(service, stage):
+    """
+    Return a context manager that records the time spent in a scoring stage.
+
+    Parameters:
+    -----------
+    service : str
+        The scoring service name, e.g. 'openai'.
+    stage : str
+        The stage, e.g. 'extract', 'fetch', 'prompt', 'rate_limit', 'model', 'parse' or 'save'.
+    """
+    return STAGE_SECONDS.labels(service, stage).time()
+
+def observe_stage(service, stage, seconds):
+    """
+    Record the time spent in a scoring stage that was measured by the caller.
+    """
+    STAGE_SECONDS.labels(service, stage).observe(seconds)
+
+def record_cache_lookup(service, hit):
+    CACHE_REQUESTS.labels(service, 'hit' if hit else 'miss').inc()
+
+def record_parse_failure(service):
+    PARSE_FAILURES.labels(service).inc()
+
+def record_compaction(service, tokens_before, tokens_after):
+    """
+    Count the estimated tokens of a resume before and after prompt compaction.
+    """
+    PROMPT_TOKENS.labels(service, 'before').inc(tokens_before)
+    PROMPT_TOKENS.labels(service, 'after').inc(tokens_after)
+
+def record_outcome(service, outcome, count=1):
+    """
+    Count scoring attempts that ended as ``outcome``, e.g. 'scored', 'failed' or 'screened'.
+    """
+    if count:
+        SUBMISSIONS.labels(service, outcome).inc(count)
+
+def record_retry(service, reason, count=1):
+    """
+    Count scoring attempts re-scheduled because of ``reason``: 'rate_limited', 'transient' or 'parse'.
+    """
+    if count:
+        RETRIES.labels(service, reason).inc(count)
+
+def record_token_usage(service, prompt_tokens=0, cached_tokens=0, completion_tokens=0):
+    """
+    Count the tokens reported by a provider response.
+
+    Parameters:
+    -----------
+    service : str
+        The scoring service name, e.g. 'openai'.
+    prompt_tokens : int
+        The prompt tokens billed for the request.
+    cached_tokens : int
+        The part of ``prompt_tokens`` served from the provider's prompt cache.
+    completion_tokens : int
+        The generated tokens.
+    """
+    TOKENS.labels(service, 'prompt').inc(prompt_tokens)
+    TOKENS.labels(service, 'cached').inc(cached_tokens)
+    TOKENS.labels(service, 'completion').inc(completion_tokens)
+
+def task_started(task_id, task_name, enqueued_at=None):
+    """
+    Note the start of a Celery task, recording how long it waited in the queue.
+
+    Parameters:
+    -----------
+    task_id : str
+        The id of the task.
+    task_name : str
+        The name of the task.
+    enqueued_at : float, optional
+        The Unix time from which the task could have started: when it was
+        published, or its ETA for a delayed task.
+    """
+    if enqueued_at is not None:
+        TASK_QUEUE_WAIT_SECONDS.labels(task_name).observe(max(0.0, time.time() - enqueued_at))
+    _task_started[task_id] = time.perf_counter()
+
+def task_finished(task_id, task_name, state):
+    """
+    Record the run time of a Celery task started with ``task_started``.
+    """
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        TASK_SECONDS.labels(task_name, state or 'UNKNOWN').observe(time.perf_counter() - started)
+
+def export_metrics():
+    """
+    Return the metrics in the Prometheus text format, and its content type.
+
+    With ``PROMETHEUS_MULTIPROC_DIR`` set, the metrics of all processes
+    sharing the directory (e.g. the web server's workers) are combined.
+    """
+    registry = REGISTRY
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class MetricsPusher:
+    """
+    Pushes this process's metrics to a Prometheus Pushgateway at a fixed interval.
+
+    Celery worker processes are short-lived and not scraped, so each one
+    pushes its metrics under its own ``instance`` grouping key and deletes
+    them when it shuts down.
+    """
+
+    def __init__(self, url, interval, job='resume_ai_worker'):
+        self.url = url
+        self.interval = interval
+        self.job = job
+        self.grouping_key = {'instance': f'{socket.gethostname()}-{os.getpid()}'}
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='metrics-pusher', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def push(self):
+        try:
+            push_to_gateway(self.url, job=self.job, registry=REGISTRY, grouping_key=self.grouping_key)
+        except OSError:
+            # The gateway being unavailable must not affect scoring; the next push catches up.
+            pass
+
+    def stop(self):
+        self._stopped.set()
+        try:
+            delete_from_gateway(self.url, job=self.job, grouping_key=self.grouping_key)
+        except OSError:
+            pass
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.push()
+
+def start_metrics_push(url, interval):
+    """
+    Start pushing this process's metrics to the Pushgateway at ``url``.
+    """
+    global _pusher
+    _pusher = MetricsPusher(url, interval)
+    _pusher.start()
+
+def stop_metrics_push():
+    """
+    Stop pushing and remove this process's metrics from the Pushgateway.
+    """
+    global _pusher
+    if _pusher is not None:
+        _pusher.stop()
+        _pusher = None
@@ -0,0 +1,76 @@
+import numpy as np
+from scipy import sparse
+from django.conf import settings
+from resume_ai.text_processing import term_weights, tokenize
+
+def prescore_many(term_weights, resumes, k1=None, b=None, average_length=None):
+    """
+    Compute a BM25-style relevance of each resume to a job description.
+
+    Every description term contributes its weight, scaled by a saturating
+    function of how often the term occurs in the resume (normalized for
+    resume length, as in BM25). The term counts of all resumes are held in
+    one sparse matrix, so the scoring itself is a handful of vectorized
+    operations. No network access is involved.
+
+    Parameters:
+    -----------
+    term_weights : dict
+        The description's term weights, as stored on the job posting's
+        description index (see ``resume_ai.text_processing.term_weights``).
+    resumes : list of str
+        The resume texts to score.
+    k1 : float, optional
+        Term frequency saturation. Defaults to ``settings.PRESCREEN_K1``.
+    b : float, optional
+        Length normalization. Defaults to ``settings.PRESCREEN_B``.
+    average_length : float, optional
+        The typical resume length in terms. Defaults to
+        ``settings.PRESCREEN_AVERAGE_RESUME_LENGTH``.
+
+    Returns:
+    --------
+    numpy.ndarray
+        One score per resume, between 0 (no description term present) and 1.
+    """
+    k1 = settings.PRESCREEN_K1 if k1 is None else k1
+    b = settings.PRESCREEN_B if b is None else b
+    average_length = average_length or settings.PRESCREEN_AVERAGE_RESUME_LENGTH
+
+    if not resumes or not term_weights:
+        return np.zeros(len(resumes))
+
+    vocabulary = {term: index for index, term in enumerate(term_weights)}
+    weights = np.fromiter(term_weights.values(), dtype=np.float64, count=len(term_weights))
+
+    rows = []
+    columns = []
+    lengths = np.empty(len(resumes))
+    for row, resume in enumerate(resumes):
+        tokens = tokenize(resume)
+        lengths[row] = len(tokens)
+        for token in tokens:
+            column = vocabulary.get(token)
+            if column is not None:
+                rows.append(row)
+                columns.append(column)
+
+    # Duplicate (row, column) entries are summed, yielding term frequencies.
+    term_frequencies = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, columns)), shape=(len(resumes), len(vocabulary)))
+    term_frequencies.sum_duplicates()
+
+    length_norm = k1 * (1.0 - b + b * lengths / average_length)
+    row_of_entry = np.repeat(np.arange(len(resumes)), np.diff(term_frequencies.indptr))
+    tf = term_frequencies.data
+    term_frequencies.data = tf * (k1 + 1.0) / (tf + length_norm[row_of_entry])
+
+    return (term_frequencies @ weights) / (weights.sum() * (k1 + 1.0))
+
+def prescore(description, resume):
+    """
+    Compute the relevance of a single resume to a job description.
+
+    See ``prescore_many``; returns a float between 0 and 1.
+    """
+    return float(prescore_many(term_weights(description), [resume])[0])
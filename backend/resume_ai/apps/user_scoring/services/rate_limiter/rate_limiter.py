@@ -0,0 +1,281 @@
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+from django.conf import settings
+from resume_ai.text_processing import estimate_token_count
+
+def estimate_tokens(prompt, max_tokens=0):
+    """
+    Estimate the tokens a provider will bill for a request.
+
+    Parameters:
+    -----------
+    prompt : str
+        The formatted prompt string, as returned by ``_create_prompt``.
+    max_tokens : int
+        The completion budget requested from the provider.
+
+    Returns:
+    --------
+    int
+        The approximate prompt tokens (about four characters per token)
+        plus the full completion budget.
+    """
+    return estimate_token_count(prompt) + max_tokens
+
+
+class RateLimited(Exception):
+    """
+    Raised when a provider's quota cannot be acquired within the allowed wait.
+
+    ``retry_after`` is the number of seconds after which the request is
+    expected to fit into the quota.
+    """
+
+    def __init__(self, provider, retry_after):
+        super().__init__(f"Rate limit for '{provider}' exceeded, retry in {retry_after:.1f}s")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+class RateLimiter(ABC):
+    """
+    Abstract base class for provider rate limiters.
+
+    Each provider gets two token buckets that refill continuously: one holding
+    ``requests_per_minute`` requests and one holding ``tokens_per_minute``
+    tokens. A request is admitted only if both buckets can pay for it.
+    """
+
+    def __init__(self, limits):
+        self.limits = limits
+
+    def acquire(self, provider, tokens):
+        """
+        Try to take one request and ``tokens`` tokens from the provider's quota.
+
+        Parameters:
+        -----------
+        provider : str
+            The provider name, e.g. 'openai' or 'llama'.
+        tokens : int
+            The estimated tokens of the request.
+
+        Returns:
+        --------
+        float
+            0 if the request was admitted, otherwise the number of seconds to
+            wait before it is expected to fit. Nothing is taken from the quota
+            when the request is not admitted.
+        """
+        limits = self.limits.get(provider)
+        if not limits:
+            return 0.0
+        requests_per_minute = limits.get('requests_per_minute') or 0
+        tokens_per_minute = limits.get('tokens_per_minute') or 0
+        if tokens_per_minute:
+            # A request larger than the whole bucket would never be admitted.
+            tokens = min(tokens, tokens_per_minute)
+        return self._acquire(provider, requests_per_minute, tokens_per_minute, tokens)
+
+    def wait(self, provider, tokens, max_wait):
+        """
+        Block until the request is admitted.
+
+        Parameters:
+        -----------
+        provider : str
+            The provider name.
+        tokens : int
+            The estimated tokens of the request.
+        max_wait : float
+            The longest single wait, in seconds, that is spent in-process.
+
+        Raises:
+        -------
+        RateLimited
+            If the quota is not expected to free up within ``max_wait``.
+        """
+        while True:
+            delay = self.acquire(provider, tokens)
+            if not delay:
+                return
+            if delay > max_wait:
+                raise RateLimited(provider, delay)
+            time.sleep(delay)
+
+    async def async_wait(self, provider, tokens, max_wait):
+        """
+        Wait until the request is admitted without blocking the event loop.
+
+        ``acquire`` may make a network round trip (see ``RedisRateLimiter``),
+        so it runs in a worker thread. See ``wait`` for the parameters.
+        """
+        while True:
+            delay = await asyncio.to_thread(self.acquire, provider, tokens)
+            if not delay:
+                return
+            if delay > max_wait:
+                raise RateLimited(provider, delay)
+            await asyncio.sleep(delay)
+
+    @abstractmethod
+    def _acquire(self, provider, requests_per_minute, tokens_per_minute, tokens):
+        pass
+
+
+def _refill(level, updated_at, capacity, now):
+    if level is None:
+        return float(capacity)
+    return min(float(capacity), level + (now - updated_at) * capacity / 60.0)
+
+
+class LocMemRateLimiter(RateLimiter):
+    """
+    A rate limiter whose buckets live in the current process.
+
+    Only suitable for development and single-process deployments; use
+    ``RedisRateLimiter`` to share the quota between workers.
+    """
+
+    def __init__(self, limits):
+        super().__init__(limits)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _acquire(self, provider, requests_per_minute, tokens_per_minute, tokens):
+        with self._lock:
+            now = time.monotonic()
+            requests_level, tokens_level, updated_at = self._buckets.get(provider, (None, None, now))
+            delay = 0.0
+            if requests_per_minute:
+                requests_level = _refill(requests_level, updated_at, requests_per_minute, now)
+                if requests_level < 1:
+                    delay = max(delay, (1 - requests_level) * 60.0 / requests_per_minute)
+            if tokens_per_minute:
+                tokens_level = _refill(tokens_level, updated_at, tokens_per_minute, now)
+                if tokens_level < tokens:
+                    delay = max(delay, (tokens - tokens_level) * 60.0 / tokens_per_minute)
+            if delay:
+                return delay
+            if requests_per_minute:
+                requests_level -= 1
+            if tokens_per_minute:
+                tokens_level -= tokens
+            self._buckets[provider] = (requests_level, tokens_level, now)
+            return 0.0
+
+
+# KEYS[1]: bucket hash. ARGV: requests_per_minute, tokens_per_minute, tokens.
+# A limit of 0 disables that bucket. Returns the delay in seconds as a string.
+ACQUIRE_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local rpm = tonumber(ARGV[1])
+local tpm = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'requests', 'tokens', 'updated_at')
+local updated_at = tonumber(state[3]) or now
+
+local function refill(level, capacity)
+    level = tonumber(level)
+    if level == nil then
+        return capacity
+    end
+    return math.min(capacity, level + (now - updated_at) * capacity / 60)
+end
+
+local delay = 0
+local requests = 0
+local tokens = 0
+if rpm > 0 then
+    requests = refill(state[1], rpm)
+    if requests < 1 then
+        delay = math.max(delay, (1 - requests) * 60 / rpm)
+    end
+end
+if tpm > 0 then
+    tokens = refill(state[2], tpm)
+    if tokens < cost then
+        delay = math.max(delay, (cost - tokens) * 60 / tpm)
+    end
+end
+if delay > 0 then
+    return tostring(delay)
+end
+
+redis.call('HSET', KEYS[1], 'requests', tostring(requests - 1), 'tokens', tostring(tokens - cost), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], 120)
+return '0'
+"""
+
+
+class RedisRateLimiter(RateLimiter):
+    """
+    A rate limiter whose buckets are shared by all workers through Redis.
+
+    The buckets are read, refilled and debited in a single Lua script, using
+    the Redis server clock, so concurrent workers cannot overdraw the quota.
+    """
+
+    key_prefix = 'rate_limit'
+
+    def __init__(self, limits, url, client=None):
+        super().__init__(limits)
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self._script = client.register_script(ACQUIRE_SCRIPT)
+
+    def _acquire(self, provider, requests_per_minute, tokens_per_minute, tokens):
+        delay = self._script(
+            keys=[f'{self.key_prefix}:{provider}'],
+            args=[requests_per_minute, tokens_per_minute, tokens],
+        )
+        return float(delay)
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter():
+    """
+    Return the process-wide rate limiter configured by ``SCORING_RATE_LIMIT_BACKEND``.
+
+    Returns:
+    --------
+    RateLimiter or None
+        The configured rate limiter, or None if rate limiting is disabled.
+
+    Raises:
+    -------
+    ValueError
+        If an invalid backend is configured.
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = _build_rate_limiter()
+    return _rate_limiter or None
+
+def reset_rate_limiter():
+    """
+    Forget the process-wide rate limiter so it is rebuilt from settings on next use.
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        _rate_limiter = None
+
+def _build_rate_limiter():
+    backend = settings.SCORING_RATE_LIMIT_BACKEND
+    if backend == 'locmem':
+        return LocMemRateLimiter(settings.SCORING_RATE_LIMITS)
+    if backend == 'redis':
+        return RedisRateLimiter(settings.SCORING_RATE_LIMITS, settings.SCORING_RATE_LIMIT_REDIS_URL)
+    if backend == 'none':
+        # Cached as False so that a disabled limiter is not rebuilt on every call.
+        return False
+    raise ValueError('Invalid rate limit backend specified.')
@@ -0,0 +1,260 @@
+import codecs
+import multiprocessing
+import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from xml.etree import ElementTree
+from django.conf import settings
+from resume_ai.text_processing import normalize_text
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.txt')
+
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+# Largest uncompressed DOCX document accepted, to turn away zip bombs early.
+MAX_DOCUMENT_SIZE = 100 * 1024 * 1024
+
+# Text read from a file before normalization, as a multiple of the length
+# kept afterwards; normalization mostly drops whitespace.
+READ_AHEAD = 2
+
+class ResumeExtractionError(ValueError):
+    """
+    Raised for a resume file whose text cannot be extracted.
+    """
+
+def extract_text(path, max_length, max_pages):
+    """
+    Extract the normalized text of a resume file.
+
+    The file is read piece by piece (a page of a PDF, a paragraph of a DOCX
+    document, a block of a text file) and reading stops as soon as enough
+    text for ``max_length`` characters has been collected, so memory use
+    does not grow with the length of the text. (The PDF reader keeps the
+    file itself in memory; uploads are limited in size.)
+
+    Parameters:
+    -----------
+    path : str
+        The file, with a '.pdf', '.docx' or '.txt' extension.
+    max_length : int
+        The maximum length of the result, in characters.
+    max_pages : int
+        The number of PDF pages read at most.
+
+    Returns:
+    --------
+    str
+        The text, normalized as for a prompt.
+
+    Raises:
+    -------
+    ResumeExtractionError
+        If the file type is not supported, the file cannot be read or it contains no text.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.pdf':
+        pieces = _pdf_pages(path, max_pages)
+    elif extension == '.docx':
+        pieces = _docx_paragraphs(path)
+    elif extension == '.txt':
+        pieces = _text_blocks(path)
+    else:
+        raise ResumeExtractionError(f'Unsupported resume file type: {extension or path}')
+
+    parts = []
+    collected = 0
+    try:
+        for piece in pieces:
+            parts.append(piece)
+            collected += len(piece)
+            if collected > max_length * READ_AHEAD:
+                break
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile, ElementTree.ParseError) as exc:
+        raise ResumeExtractionError(f'Could not read resume file: {exc}') from exc
+    finally:
+        pieces.close()
+
+    text = normalize_text('\n'.join(parts), max_length)
+    if not text:
+        raise ResumeExtractionError('The resume file contains no text.')
+    return text
+
+def _pdf_pages(path, max_pages):
+    from pypdf import PdfReader
+    from pypdf.errors import PdfReadError
+
+    try:
+        reader = PdfReader(path)
+        for page in reader.pages[:max_pages]:
+            yield page.extract_text() or ''
+    except PdfReadError as exc:
+        raise ValueError(str(exc)) from exc
+
+def _docx_paragraphs(path):
+    with zipfile.ZipFile(path) as archive:
+        document = archive.getinfo('word/document.xml')
+        if document.file_size > MAX_DOCUMENT_SIZE:
+            raise ValueError('The document is too large once uncompressed.')
+        with archive.open(document) as xml:
+            runs = []
+            for event, element in ElementTree.iterparse(xml, events=('end',)):
+                if element.tag == WORD_NAMESPACE + 't':
+                    runs.append(element.text or '')
+                elif element.tag in (WORD_NAMESPACE + 'tab', WORD_NAMESPACE + 'br'):
+                    runs.append(' ')
+                elif element.tag == WORD_NAMESPACE + 'p':
+                    yield ''.join(runs)
+                    runs = []
+                    # Paragraphs already read are not needed again.
+                    element.clear()
+
+def _text_blocks(path, block_size=64 * 1024):
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    with open(path, 'rb') as file:
+        while True:
+            block = file.read(block_size)
+            if not block:
+                yield decoder.decode(b'', final=True)
+                return
+            yield decoder.decode(block)
+
+
+def _limit_resources(memory_limit):
+    """
+    Cap the address space of an extraction process, so a malicious or
+    pathological file fails with a MemoryError instead of exhausting the host.
+    """
+    import resource
+
+    if memory_limit:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+def _extract_with_cpu_limit(path, max_length, max_pages, cpu_seconds):
+    # Runs in a pool process: the process is killed if this extraction uses
+    # more than ``cpu_seconds`` of CPU time, on top of what it used before.
+    import resource
+
+    if cpu_seconds:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        used = int(usage.ru_utime + usage.ru_stime)
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        resource.setrlimit(resource.RLIMIT_CPU, (used + cpu_seconds, hard))
+    return extract_text(path, max_length, max_pages)
+
+
+_extraction_pool = None
+_extraction_pool_tasks = 0
+_extraction_pool_lock = threading.Lock()
+
+def get_extraction_pool():
+    """
+    Return the process pool that extracts resume text in this process.
+
+    Returns:
+    --------
+    ProcessPoolExecutor or None
+        The pool, or None if ``RESUME_EXTRACTION_PROCESSES`` is 0 and text is
+        extracted in the calling process.
+    """
+    global _extraction_pool
+    if _extraction_pool is None:
+        with _extraction_pool_lock:
+            if _extraction_pool is None:
+                _extraction_pool = _build_extraction_pool()
+    return _extraction_pool or None
+
+def reset_extraction_pool(after_fork=False):
+    """
+    Shut down the process pool; a new one is started on next use.
+
+    Parameters:
+    -----------
+    after_fork : bool
+        Set in a forked child process. The inherited pool belongs to the
+        parent and is dropped without shutting it down.
+    """
+    global _extraction_pool, _extraction_pool_tasks, _extraction_pool_lock
+    if after_fork:
+        _extraction_pool_lock = threading.Lock()
+        _extraction_pool = None
+        _extraction_pool_tasks = 0
+        return
+    with _extraction_pool_lock:
+        pool, _extraction_pool = _extraction_pool, None
+        _extraction_pool_tasks = 0
+    if pool:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def _build_extraction_pool():
+    if settings.RESUME_EXTRACTION_PROCESSES <= 0:
+        return False
+    # Pool processes are started fresh rather than forked from a worker that
+    # holds database and broker connections.
+    return ProcessPoolExecutor(
+        max_workers=settings.RESUME_EXTRACTION_PROCESSES,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_limit_resources,
+        initargs=(settings.RESUME_EXTRACTION_MEMORY_LIMIT,),
+    )
+
+def _submit_extraction(*args):
+    """
+    Submit an extraction to the pool, replacing the pool once it has run
+    ``RESUME_EXTRACTION_TASKS_PER_PROCESS`` tasks for each of its processes.
+
+    This recycles the processes, like ``max_tasks_per_child`` on Python 3.11
+    and later. The retired pool finishes the tasks it was given before its
+    processes exit.
+    """
+    global _extraction_pool, _extraction_pool_tasks
+    retired = None
+    with _extraction_pool_lock:
+        if _extraction_pool is None:
+            _extraction_pool = _build_extraction_pool()
+        pool = _extraction_pool
+        future = pool.submit(_extract_with_cpu_limit, *args)
+        _extraction_pool_tasks += 1
+        limit = settings.RESUME_EXTRACTION_TASKS_PER_PROCESS * settings.RESUME_EXTRACTION_PROCESSES
+        if limit > 0 and _extraction_pool_tasks >= limit:
+            retired, _extraction_pool, _extraction_pool_tasks = pool, None, 0
+    if retired is not None:
+        retired.shutdown(wait=False)
+    return future
+
+def extract_resume_text(path):
+    """
+    Extract the text of a resume file within the configured limits.
+
+    With ``RESUME_EXTRACTION_PROCESSES`` set, the work is done by a pool
+    process whose memory (``RESUME_EXTRACTION_MEMORY_LIMIT``) and CPU time
+    per file (``RESUME_EXTRACTION_CPU_SECONDS``) are capped; a process that
+    exceeds them is replaced.
+
+    Parameters:
+    -----------
+    path : str
+        The resume file.
+
+    Returns:
+    --------
+    str
+        The normalized text, at most ``RESUME_MAX_LENGTH`` characters long.
+
+    Raises:
+    -------
+    ResumeExtractionError
+        If no text could be extracted within the limits.
+    """
+    args = (path, settings.RESUME_MAX_LENGTH, settings.RESUME_EXTRACTION_MAX_PAGES)
+    if get_extraction_pool() is None:
+        return extract_text(*args)
+    try:
+        return _submit_extraction(*args, settings.RESUME_EXTRACTION_CPU_SECONDS).result()
+    except MemoryError:
+        raise ResumeExtractionError('Extraction exceeded its memory limit.')
+    except BrokenProcessPool:
+        reset_extraction_pool()
+        raise ResumeExtractionError('Extraction exceeded its CPU time limit or crashed.')
@@ -0,0 +1,242 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from django.conf import settings
+
+class ScoreCache(ABC):
+    """
+    Abstract base class for score caches.
+
+    A score cache maps a content-addressed key (see
+    ``ScoringService.get_cache_key``) to a previously computed score. Entries
+    are tagged with the job posting they belong to so that every score for a
+    posting can be dropped when the posting changes.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Look up a cached score.
+
+        Parameters:
+        -----------
+        key : str
+            The cache key of the scoring request.
+
+        Returns:
+        --------
+        float or None
+            The cached score, or None if there is no live entry for the key.
+        """
+        score = self._get(key)
+        with self._stats_lock:
+            if score is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return score
+
+    def set(self, key, score, job_posting_id):
+        """
+        Store a score.
+
+        Parameters:
+        -----------
+        key : str
+            The cache key of the scoring request.
+        score : int or float
+            The score returned by the model.
+        job_posting_id : int
+            The job posting the score belongs to, used for invalidation.
+        """
+        self._set(key, float(score), job_posting_id)
+
+    def stats(self):
+        """
+        Return the hit/miss counters of this cache instance.
+        """
+        with self._stats_lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+    @abstractmethod
+    def _get(self, key):
+        pass
+
+    @abstractmethod
+    def _set(self, key, score, job_posting_id):
+        pass
+
+    @abstractmethod
+    def invalidate_job_posting(self, job_posting_id):
+        """
+        Drop every cached score that belongs to the given job posting.
+        """
+        pass
+
+    @abstractmethod
+    def clear(self):
+        """
+        Drop every cached score.
+        """
+        pass
+
+
+class LocMemScoreCache(ScoreCache):
+    """
+    A per-process, in-memory score cache with TTL and LRU eviction.
+    """
+
+    def __init__(self, ttl, max_entries):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._by_job_posting = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, score, job_posting_id = entry
+            if expires_at <= time.monotonic():
+                self._delete(key)
+                return None
+            self._entries.move_to_end(key)
+            return score
+
+    def _set(self, key, score, job_posting_id):
+        with self._lock:
+            if key in self._entries:
+                self._delete(key)
+            self._entries[key] = (time.monotonic() + self.ttl, score, job_posting_id)
+            self._by_job_posting.setdefault(job_posting_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._delete(next(iter(self._entries)))
+
+    def invalidate_job_posting(self, job_posting_id):
+        with self._lock:
+            for key in self._by_job_posting.pop(job_posting_id, ()):
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_job_posting.clear()
+
+    def _delete(self, key):
+        # Callers must hold self._lock.
+        _, _, job_posting_id = self._entries.pop(key)
+        keys = self._by_job_posting.get(job_posting_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_job_posting[job_posting_id]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisScoreCache(ScoreCache):
+    """
+    A score cache shared by all web and worker processes, backed by Redis.
+
+    Entries expire after ``ttl`` seconds. LRU eviction is delegated to Redis,
+    so the instance should run with ``maxmemory`` and
+    ``maxmemory-policy allkeys-lru`` (or ``volatile-lru``) configured.
+    """
+
+    key_prefix = 'score_cache'
+
+    def __init__(self, ttl, url, client=None):
+        super().__init__(ttl)
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+
+    def _entry_key(self, key):
+        return f'{self.key_prefix}:entry:{key}'
+
+    def _job_posting_key(self, job_posting_id):
+        return f'{self.key_prefix}:job_posting:{job_posting_id}'
+
+    def _get(self, key):
+        value = self.client.get(self._entry_key(key))
+        if value is None:
+            return None
+        return float(value)
+
+    def _set(self, key, score, job_posting_id):
+        job_posting_key = self._job_posting_key(job_posting_id)
+        pipe = self.client.pipeline()
+        pipe.set(self._entry_key(key), score, ex=self.ttl)
+        pipe.sadd(job_posting_key, key)
+        pipe.expire(job_posting_key, self.ttl)
+        pipe.execute()
+
+    def invalidate_job_posting(self, job_posting_id):
+        job_posting_key = self._job_posting_key(job_posting_id)
+        keys = self.client.smembers(job_posting_key)
+        pipe = self.client.pipeline()
+        for key in keys:
+            if isinstance(key, bytes):
+                key = key.decode()
+            pipe.delete(self._entry_key(key))
+        pipe.delete(job_posting_key)
+        pipe.execute()
+
+    def clear(self):
+        keys = list(self.client.scan_iter(f'{self.key_prefix}:*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+_score_cache = None
+_score_cache_lock = threading.Lock()
+
+def get_score_cache():
+    """
+    Return the process-wide score cache configured by ``SCORE_CACHE_BACKEND``.
+
+    Returns:
+    --------
+    ScoreCache or None
+        The configured cache, or None if caching is disabled.
+
+    Raises:
+    -------
+    ValueError
+        If an invalid backend is configured.
+    """
+    global _score_cache
+    if _score_cache is None:
+        with _score_cache_lock:
+            if _score_cache is None:
+                _score_cache = _build_score_cache()
+    return _score_cache or None
+
+def reset_score_cache():
+    """
+    Forget the process-wide score cache so it is rebuilt from settings on next use.
+    """
+    global _score_cache
+    with _score_cache_lock:
+        _score_cache = None
+
+def _build_score_cache():
+    backend = settings.SCORE_CACHE_BACKEND
+    if backend == 'locmem':
+        return LocMemScoreCache(settings.SCORE_CACHE_TTL, settings.SCORE_CACHE_MAX_ENTRIES)
+    if backend == 'redis':
+        return RedisScoreCache(settings.SCORE_CACHE_TTL, settings.SCORE_CACHE_REDIS_URL)
+    if backend == 'none':
+        # Cached as False so that a disabled cache is not rebuilt on every call.
+        return False
+    raise ValueError('Invalid score cache backend specified.')
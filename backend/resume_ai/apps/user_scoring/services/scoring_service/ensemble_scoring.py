@@ -0,0 +1,150 @@
+import asyncio
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from ..rate_limiter.rate_limiter import RateLimited
+from .scoring_service import BaseScoringService
+
+class EnsembleScore(float):
+    """
+    The mean of several score samples, carrying their variance and count.
+
+    It is a float, so it is stored and compared like any other score;
+    ``variance`` is None when only one sample succeeded.
+    """
+
+    def __new__(cls, scores):
+        score = super().__new__(cls, statistics.fmean(scores))
+        score.samples = len(scores)
+        score.variance = statistics.variance(scores) if len(scores) > 1 else None
+        return score
+
+    def __reduce__(self):
+        # Celery results and pickles see a plain float.
+        return float, (float(self),)
+
+
+class EnsembleScoringService(BaseScoringService):
+    """
+    A scoring service that averages several samples from one or more providers.
+
+    Samples are drawn from the backends in turn, so ``['llama']`` takes every
+    sample from Llama and ``['openai', 'llama']`` alternates between them. The
+    first ``settings.SCORING_ENSEMBLE_MIN_SAMPLES`` samples run in parallel.
+    If they agree within ``settings.SCORING_ENSEMBLE_TOLERANCE`` points, their
+    mean is the score; otherwise the rest, up to
+    ``settings.SCORING_ENSEMBLE_MAX_SAMPLES``, run in parallel as a second
+    round. Latency stays near that of one or two calls, and agreeing samples
+    cost only the first round.
+
+    Failed samples are left out. Scoring fails only if every sample does, with
+    ``RateLimited`` if any was rate limited so that the task is retried later.
+
+    Ensemble scores bypass the score cache, which would keep the mean but not
+    the variance and sample count. Backends are called with ``sample_score``,
+    so their own caches are bypassed too.
+    """
+
+    service_name = 'ensemble'
+
+    def __init__(self, backends=None):
+        """
+        Parameters:
+        -----------
+        backends : dict, optional
+            Maps backend names to scoring services, in sampling order.
+            Defaults to the services named in ``settings.SCORING_ENSEMBLE_BACKENDS``.
+        """
+        super().__init__()
+        self._backends = backends
+        self.backend_names = list(backends) if backends is not None else settings.SCORING_ENSEMBLE_BACKENDS
+
+    def get_backend(self, name):
+        if self._backends is not None:
+            return self._backends[name]
+        from .scoring_service_factory import ScoringServiceFactory
+        return ScoringServiceFactory.get_scoring_service(name)
+
+    def _rounds(self):
+        """
+        Return the backend names sampled in the first and the second round.
+        """
+        max_samples = max(1, settings.SCORING_ENSEMBLE_MAX_SAMPLES)
+        min_samples = min(max(1, settings.SCORING_ENSEMBLE_MIN_SAMPLES), max_samples)
+        names = [self.backend_names[index % len(self.backend_names)] for index in range(max_samples)]
+        return names[:min_samples], names[min_samples:]
+
+    def score_submission(self, submission):
+        """
+        Score a submission with the mean of several samples.
+
+        Returns:
+        --------
+        EnsembleScore
+            The mean score, with its variance and sample count.
+
+        Raises:
+        -------
+        RateLimited
+            If no sample succeeded and at least one was rate limited.
+        Exception
+            The error of the first sample, if every sample failed otherwise.
+        """
+        first_round, second_round = self._rounds()
+        results = self._sample(first_round, submission)
+        if second_round and not self._agree(results):
+            results += self._sample(second_round, submission)
+        return self._combine(results)
+
+    async def ascore_submission(self, submission):
+        """
+        Score a submission with the mean of several samples without blocking the event loop.
+
+        See ``score_submission``.
+        """
+        first_round, second_round = self._rounds()
+        results = await self._asample(first_round, submission)
+        if second_round and not self._agree(results):
+            results += await self._asample(second_round, submission)
+        return self._combine(results)
+
+    def score_submission_streaming(self, submission, on_score=None, cutoff=None):
+        """
+        Score a submission as ``score_submission`` does; an ensemble has no single feedback to stream.
+        """
+        score = self.score_submission(submission)
+        if on_score is not None:
+            on_score(score)
+        return score, ''
+
+    def _sample(self, names, submission):
+        if len(names) == 1:
+            return [self._call(names[0], submission)]
+        with ThreadPoolExecutor(max_workers=len(names)) as executor:
+            return list(executor.map(lambda name: self._call(name, submission), names))
+
+    def _call(self, name, submission):
+        try:
+            return self.get_backend(name).sample_score(submission)
+        except Exception as exc:
+            return exc
+
+    async def _asample(self, names, submission):
+        samples = (self.get_backend(name).asample_score(submission) for name in names)
+        return list(await asyncio.gather(*samples, return_exceptions=True))
+
+    def _agree(self, results):
+        scores = [result for result in results if not isinstance(result, BaseException)]
+        return len(scores) > 1 and max(scores) - min(scores) <= settings.SCORING_ENSEMBLE_TOLERANCE
+
+    def _combine(self, results):
+        scores = [result for result in results if not isinstance(result, BaseException)]
+        if scores:
+            return EnsembleScore(scores)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        raise next((error for error in errors if isinstance(error, RateLimited)), errors[0])
+
+    def close(self):
+        if self._backends is not None:
+            for backend in self._backends.values():
+                backend.close()
@@ -0,0 +1,45 @@
+import httpx
+import openai
+from replicate.exceptions import ReplicateError
+from ..rate_limiter.rate_limiter import RateLimited
+
+TRANSIENT_STATUS_CODES = {408, 409, 429}
+
+class ScoreParseError(ValueError):
+    """
+    Raised when a score cannot be extracted from the model's response.
+    """
+
+
+def is_transient_error(exc):
+    """
+    Decide whether a scoring error is worth retrying.
+
+    Timeouts, connection failures, rate limiting (429) and server errors (5xx)
+    from either provider are transient. Anything else, e.g. authentication
+    failures, bad requests or unparsable output, is treated as permanent.
+
+    Parameters:
+    -----------
+    exc : Exception
+        The error raised while scoring a submission.
+
+    Returns:
+    --------
+    bool
+        True if the same request may succeed when retried.
+    """
+    if isinstance(exc, (RateLimited, TimeoutError, ConnectionError)):
+        return True
+    if isinstance(exc, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(exc, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)):
+        return True
+    if isinstance(exc, openai.APIStatusError):
+        return _is_transient_status(exc.status_code)
+    if isinstance(exc, ReplicateError):
+        return _is_transient_status(exc.status)
+    return False
+
+def _is_transient_status(status):
+    return status is not None and (status in TRANSIENT_STATUS_CODES or status >= 500)
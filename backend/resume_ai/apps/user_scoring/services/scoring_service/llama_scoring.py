@@ -1,12 +1,42 @@
+import httpx
 import replicate
-from .scoring_service import ScoringService
+from replicate.exceptions import ReplicateException
+from django.conf import settings
+from .prompt_builder import SYSTEM_PROMPT, build_prompt
+from .score_parser import parse_score
+from .scoring_service import ScoringService, connection_limits
 
 class LlamaScoringService(ScoringService):
     """
     A scoring service that uses the Llama model to evaluate job applicants.
     """
 
-    
+    service_name = 'llama'
+    model_name = "meta/meta-llama-3-70b-instruct"
+    sampling_params = {
+        "top_k": 0,
+        "top_p": 0.9,
+        "max_tokens": 512,
+        "min_tokens": 0,
+        "temperature": 0.6,
+        "length_penalty": 0.5,
+        "presence_penalty": 1.15,
+    }
+
+    def __init__(self):
+        """
+        Initialize the Replicate client.
+
+        The client is thread-safe and keeps a pool of keep-alive connections,
+        sized by the ``SCORING_HTTP_*`` settings.
+        """
+        super().__init__()
+        self.client = replicate.Client(
+            api_token=settings.REPLICATE_API_TOKEN,
+            base_url=settings.REPLICATE_BASE_URL,
+            transport=httpx.HTTPTransport(limits=connection_limits()),
+        )
+
     def get_score(self, array):
         """
         Extract the score from the model's response.
@@ -20,9 +50,13 @@ class LlamaScoringService(ScoringService):
         --------
         int
             The extracted score.
+
+        Raises:
+        -------
+        ScoreParseError
+            If the response does not contain a score.
         """
-        score_index = array.index('SCORE')
-        return int(array[score_index + 3])
+        return parse_score(array).score
 
     def _create_prompt(self, submission):
         """
@@ -38,7 +72,7 @@ class LlamaScoringService(ScoringService):
         str
             The formatted prompt string.
         """
-        return f"Job Description: {submission.job_posting.description}\n\n***Resume***: {submission.resume}\n\nScore the applicant's suitability for the job on a scale of 0-100. ***Resume*** denotes the start of the applicants resume. Only return one score in this format: ***SCORE: 0***. Provide feedback after the score."
+        return build_prompt(self._job_description(submission), self._resume(submission))
 
     def _run_model(self, prompt):
         """
@@ -54,19 +88,69 @@ class LlamaScoringService(ScoringService):
         list
             The response from the Llama model.
         """
-        return replicate.run(
-            "meta/meta-llama-3-70b-instruct",
-            input={
-                "top_k": 0,
-                "top_p": 0.9,
-                "prompt": prompt,
-                "max_tokens": 512,
-                "min_tokens": 0,
-                "temperature": 0.6,
-                "system_prompt": "You are a helpful assistant who scores resumes on a scale of 0-100.",
-                "length_penalty": 0.5,
-                "stop_sequences": "<|end_of_text|>,<|eot_id|>",
-                "prompt_template": "<|begin_of_text|><|start_header_id|>system<|end_header_id|>\n\nYou are a helpful assistant<|eot_id|><|start_header_id|>user<|end_header_id|>\n\n{prompt}<|eot_id|><|start_header_id|>assistant<|end_header_id|>\n\n",
-                "presence_penalty": 1.15,
-                "log_performance_metrics": False
-            })
\ No newline at end of file
+        return self.client.run(self.model_name, input=self._model_input(prompt))
+
+    def _stream_model(self, prompt):
+        """
+        Run the Llama model with the given prompt, streaming its response.
+
+        If the generator is closed before the prediction has finished, the
+        prediction is cancelled so that no further tokens are generated.
+
+        Parameters:
+        -----------
+        prompt : str
+            The formatted prompt string.
+
+        Returns:
+        --------
+        generator of str
+            The generated text, chunk by chunk.
+        """
+        prediction = self.client.models.predictions.create(model=self.model_name, input=self._model_input(prompt), stream=True)
+        finished = False
+        try:
+            for event in prediction.stream():
+                text = str(event)
+                if text:
+                    yield text
+            finished = True
+        finally:
+            if not finished:
+                try:
+                    prediction.cancel()
+                except ReplicateException:
+                    pass
+
+    async def _arun_model(self, prompt):
+        """
+        Run the Llama model with the given prompt using the async Replicate client.
+
+        Parameters:
+        -----------
+        prompt : str
+            The formatted prompt string.
+
+        Returns:
+        --------
+        list
+            The response from the Llama model.
+        """
+        return await self._get_async_client().async_run(self.model_name, input=self._model_input(prompt))
+
+    def _model_input(self, prompt):
+        return {
+            **self.sampling_params,
+            "prompt": prompt,
+            "system_prompt": SYSTEM_PROMPT,
+            "stop_sequences": "<|end_of_text|>,<|eot_id|>",
+            "prompt_template": "<|begin_of_text|><|start_header_id|>system<|end_header_id|>\n\n{system_prompt}<|eot_id|><|start_header_id|>user<|end_header_id|>\n\n{prompt}<|eot_id|><|start_header_id|>assistant<|end_header_id|>\n\n",
+            "log_performance_metrics": False
+        }
+
+    def _build_async_client(self):
+        return replicate.Client(
+            api_token=settings.REPLICATE_API_TOKEN,
+            base_url=settings.REPLICATE_BASE_URL,
+            transport=httpx.AsyncHTTPTransport(limits=connection_limits()),
+        )
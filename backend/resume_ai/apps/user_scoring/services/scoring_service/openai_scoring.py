@@ -1,18 +1,38 @@
-from openai import OpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+from openai.types.chat import ChatCompletion
 from django.conf import settings
-from .scoring_service import ScoringService
+from ..metrics.metrics import record_token_usage
+from .prompt_builder import SYSTEM_PROMPT, build_prompt
+from .score_parser import parse_score
+from .scoring_service import ScoringService, connection_limits
 
 class OpenAIScoringService(ScoringService):
     """
     A scoring service that uses OpenAI's GPT model to evaluate job applicants.
     """
 
+    service_name = 'openai'
+    model_name = "gpt-3.5-turbo"
+    sampling_params = {
+        "max_tokens": 512,
+        "temperature": 0.6,
+    }
+    supports_batch = True
+    batch_endpoint = "/v1/chat/completions"
+
     def __init__(self):
         """
         Initialize the OpenAI client.
 
+        The client is thread-safe and keeps a pool of keep-alive connections,
+        sized by the ``SCORING_HTTP_*`` settings.
         """
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        super().__init__()
+        self.client = OpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            http_client=DefaultHttpxClient(limits=connection_limits()),
+        )
 
     def get_score(self, response):
         """
@@ -28,10 +48,12 @@ class OpenAIScoringService(ScoringService):
         int
             The extracted score (0-100).
 
+        Raises:
+        -------
+        ScoreParseError
+            If the response does not contain a score.
         """
-        content = response.choices[0].message.content
-        score_line = [line for line in content.split('\n') if line.startswith('SCORE:')][0]
-        return int(score_line.split(':')[1].strip())
+        return parse_score(response.choices[0].message.content).score
 
     def _create_prompt(self, submission):
         """
@@ -47,11 +69,74 @@ class OpenAIScoringService(ScoringService):
         str
             The formatted prompt string.
         """
-        return f"""Job Description: {submission.job_posting.description}
+        return build_prompt(self._job_description(submission), self._resume(submission))
+
+    def _messages(self, prompt):
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+
+    def batch_request(self, submission):
+        """
+        Build the Batch API request for scoring a submission.
+
+        Parameters:
+        -----------
+        submission : UserSubmission
+            The submission object containing the job posting and resume.
+
+        Returns:
+        --------
+        dict
+            One line of the batch input file.
+        """
+        return {
+            "custom_id": str(submission.id),
+            "method": "POST",
+            "url": self.batch_endpoint,
+            "body": {
+                "model": self.model_name,
+                "messages": self._messages(self._create_prompt(submission)),
+                **self.sampling_params,
+            },
+        }
 
-***Resume***: {submission.resume}
+    def batch_response(self, body):
+        """
+        Parse the chat completion returned for one Batch API request.
 
-Score the applicant's suitability for the job on a scale of 0-100. ***Resume*** denotes the start of the applicant's resume. Only return one score in this format: ***SCORE: 0***. Provide feedback after the score."""
+        Parameters:
+        -----------
+        body : dict
+            The ``response.body`` of a batch output line.
+
+        Returns:
+        --------
+        openai.types.chat.chat_completion.ChatCompletion
+            The response, as ``_run_model`` would have returned it.
+        """
+        response = ChatCompletion.model_validate(body)
+        self._record_usage(response.usage)
+        return response
+
+    def _record_usage(self, usage):
+        """
+        Record the token usage of a response, including the prompt tokens served from OpenAI's prompt cache.
+        """
+        if usage is None:
+            return
+        details = getattr(usage, 'prompt_tokens_details', None)
+        if isinstance(details, dict):
+            cached_tokens = details.get('cached_tokens')
+        else:
+            cached_tokens = getattr(details, 'cached_tokens', None)
+        record_token_usage(
+            self.service_name,
+            prompt_tokens=usage.prompt_tokens or 0,
+            cached_tokens=cached_tokens or 0,
+            completion_tokens=usage.completion_tokens or 0,
+        )
 
     def _run_model(self, prompt):
         """
@@ -67,10 +152,67 @@ Score the applicant's suitability for the job on a scale of 0-100. ***Resume***
         openai.types.chat.chat_completion.ChatCompletion
             The response from the OpenAI model.
         """
-        return self.client.chat.completions.create(model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant who scores resumes on a scale of 0-100."},
-            {"role": "user", "content": prompt}
-        ],
-        max_tokens=512,
-        temperature=0.6)
\ No newline at end of file
+        response = self.client.chat.completions.create(model=self.model_name,
+        messages=self._messages(prompt),
+        **self.sampling_params)
+        self._record_usage(response.usage)
+        return response
+
+    def _stream_model(self, prompt):
+        """
+        Run the OpenAI model with the given prompt, streaming its response.
+
+        Parameters:
+        -----------
+        prompt : str
+            The formatted prompt string.
+
+        Returns:
+        --------
+        generator of str
+            The generated text, chunk by chunk.
+        """
+        stream = self.client.chat.completions.create(model=self.model_name,
+        messages=self._messages(prompt),
+        stream=True,
+        stream_options={"include_usage": True},
+        **self.sampling_params)
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                if chunk.usage is not None:
+                    # Only sent in the final chunk, so not seen when the stream is cut off.
+                    self._record_usage(chunk.usage)
+        finally:
+            stream.close()
+
+    async def _arun_model(self, prompt):
+        """
+        Run the OpenAI model with the given prompt using the async client.
+
+        Parameters:
+        -----------
+        prompt : str
+            The formatted prompt string.
+
+        Returns:
+        --------
+        openai.types.chat.chat_completion.ChatCompletion
+            The response from the OpenAI model.
+        """
+        response = await self._get_async_client().chat.completions.create(model=self.model_name,
+        messages=self._messages(prompt),
+        **self.sampling_params)
+        self._record_usage(response.usage)
+        return response
+
+    def _build_async_client(self):
+        return AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            http_client=DefaultAsyncHttpxClient(limits=connection_limits()),
+        )
+
+    def close(self):
+        self.client.close()
@@ -0,0 +1,51 @@
+# Bump whenever the wording or layout below changes, so that cached scores
+# produced by an older prompt are no longer used.
+PROMPT_VERSION = 2
+
+SYSTEM_PROMPT = "You are a helpful assistant who scores resumes on a scale of 0-100."
+
+INSTRUCTIONS = (
+    "Score the applicant's suitability for the job on a scale of 0-100. The job description comes first. "
+    "***Resume*** denotes the start of the applicant's resume, which runs to the end of this message. "
+    "Only return one score in this format: ***SCORE: 0***. Provide feedback after the score."
+)
+
+def prompt_prefix(job_description):
+    """
+    Build the part of the prompt that is shared by all applicants to a job posting.
+
+    Providers cache the longest prefix they have seen recently, so everything
+    that does not depend on the applicant comes first and is byte-for-byte
+    identical between requests: the instructions, then the job description.
+
+    Parameters:
+    -----------
+    job_description : str
+        The normalized job description, as stored on the posting's description index.
+
+    Returns:
+    --------
+    str
+        The prompt up to the start of the resume.
+    """
+    return f"{INSTRUCTIONS}\n\nJob Description: {job_description}\n\n***Resume***: "
+
+def build_prompt(job_description, resume):
+    """
+    Build the user prompt for scoring a resume against a job description.
+
+    The resume comes last, after the shared ``prompt_prefix``.
+
+    Parameters:
+    -----------
+    job_description : str
+        The normalized job description.
+    resume : str
+        The applicant's resume.
+
+    Returns:
+    --------
+    str
+        The formatted prompt string.
+    """
+    return prompt_prefix(job_description) + resume
@@ -0,0 +1,349 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+from django.conf import settings
+from .errors import ScoreParseError
+from .scoring_service import BaseScoringService
+from ..rate_limiter.rate_limiter import RateLimited
+
+# Latency percentiles are only trusted once this many requests have succeeded.
+MIN_LATENCY_SAMPLES = 20
+
+class BackendsUnavailable(ConnectionError):
+    """
+    Raised when every backend of the routing service is failing or circuit-broken.
+    """
+
+
+class BackendHealth:
+    """
+    Rolling latency and error statistics of one backend, with a circuit breaker.
+
+    The last ``window`` requests are kept. After ``failure_threshold``
+    consecutive failures the circuit opens and the backend receives no
+    requests for ``cooldown`` seconds; then a single trial request is let
+    through, which closes the circuit again if it succeeds.
+    """
+
+    def __init__(self, window, failure_threshold, cooldown):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._samples = deque(maxlen=window)
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def record(self, latency, ok):
+        """
+        Record the outcome of a request that reached the backend.
+        """
+        with self._lock:
+            self._samples.append((latency, ok))
+            self._trial_in_flight = False
+            if ok:
+                self._consecutive_failures = 0
+                self._opened_at = None
+            else:
+                self._consecutive_failures += 1
+                if self._consecutive_failures >= self.failure_threshold:
+                    self._opened_at = time.monotonic()
+
+    def release(self):
+        """
+        Give back a trial request that ended without reaching the backend.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def is_available(self):
+        """
+        Whether the circuit would let a request through, without claiming the trial request.
+        """
+        with self._lock:
+            return self._opened_at is None or (
+                not self._trial_in_flight and time.monotonic() - self._opened_at >= self.cooldown)
+
+    def allow_request(self):
+        """
+        Claim permission to send a request; a half-open circuit grants it once.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_in_flight or time.monotonic() - self._opened_at < self.cooldown:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def retry_after(self):
+        """
+        Seconds until an open circuit lets a trial request through.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self.cooldown - (time.monotonic() - self._opened_at))
+
+    def latency(self, quantile):
+        """
+        The given quantile of successful request latencies, or None without enough samples.
+        """
+        with self._lock:
+            latencies = sorted(latency for latency, ok in self._samples if ok)
+        if len(latencies) < MIN_LATENCY_SAMPLES:
+            return None
+        return latencies[min(len(latencies) - 1, int(quantile * len(latencies)))]
+
+    def error_rate(self):
+        with self._lock:
+            if not self._samples:
+                return 0.0
+            return sum(1 for _, ok in self._samples if not ok) / len(self._samples)
+
+    def stats(self):
+        """
+        Return a snapshot of the backend's health.
+        """
+        return {
+            'p50': self.latency(0.5),
+            'p95': self.latency(0.95),
+            'error_rate': self.error_rate(),
+            'available': self.is_available(),
+        }
+
+
+class RoutingScoringService(BaseScoringService):
+    """
+    A scoring service that sends each request to the best healthy provider.
+
+    Backends are ranked by their rolling p95 latency, with backends whose
+    error rate exceeds ``settings.SCORING_ROUTING_MAX_ERROR_RATE`` last and
+    circuit-broken backends skipped. A request that fails for any reason but
+    unparsable output is retried on the next backend. With
+    ``settings.SCORING_ROUTING_HEDGE``, a second request is sent to the next
+    backend once the first has taken longer than its backend's p95, and the
+    first answer wins.
+
+    Statistics are kept per process, in the instance held by
+    ``ScoringServiceFactory``. Caching and rate limiting are left to the
+    backends.
+    """
+
+    service_name = 'auto'
+
+    def __init__(self, backends=None):
+        """
+        Parameters:
+        -----------
+        backends : dict, optional
+            Maps backend names to scoring services, in order of preference.
+            Defaults to the services named in ``settings.SCORING_ROUTING_BACKENDS``.
+        """
+        super().__init__()
+        self._backends = backends
+        names = list(backends) if backends is not None else settings.SCORING_ROUTING_BACKENDS
+        self.health = {
+            name: BackendHealth(
+                settings.SCORING_ROUTING_WINDOW,
+                settings.SCORING_ROUTING_FAILURE_THRESHOLD,
+                settings.SCORING_ROUTING_COOLDOWN,
+            )
+            for name in names
+        }
+
+    def get_backend(self, name):
+        if self._backends is not None:
+            return self._backends[name]
+        from .scoring_service_factory import ScoringServiceFactory
+        return ScoringServiceFactory.get_scoring_service(name)
+
+    def rank_backends(self):
+        """
+        Return the names of the available backends, best first.
+        """
+        candidates = [name for name, health in self.health.items() if health.is_available()]
+
+        def rank(name):
+            health = self.health[name]
+            p95 = health.latency(0.95)
+            # Backends without enough samples yet are tried first, to learn their latency.
+            return (health.error_rate() > settings.SCORING_ROUTING_MAX_ERROR_RATE, p95 is not None, p95 or 0.0)
+
+        return sorted(candidates, key=rank)
+
+    def score_submission(self, submission):
+        """
+        Score a submission on the best available backend, failing over to the others.
+
+        Raises:
+        -------
+        ScoreParseError
+            If the chosen backend's response does not contain a score.
+        BackendsUnavailable
+            If no backend could score the submission.
+        """
+        candidates = self.rank_backends()
+        last_error = None
+        for index, name in enumerate(candidates):
+            if not self.health[name].allow_request():
+                continue
+            try:
+                hedge = self._hedge_backend(name, candidates[index + 1:])
+                if hedge is not None:
+                    return self._score_hedged(name, hedge, submission)
+                return self._call(name, lambda backend: backend.score_submission(submission))
+            except ScoreParseError:
+                raise
+            except Exception as exc:
+                last_error = exc
+        raise self._unavailable(last_error)
+
+    def score_submission_streaming(self, submission, on_score=None, cutoff=None):
+        """
+        Stream the score from the best available backend.
+
+        A backend that fails before reporting the score is replaced by the
+        next one; hedging does not apply to streamed requests.
+        """
+        last_error = None
+        scored = []
+
+        def report(score):
+            scored.append(score)
+            if on_score is not None:
+                on_score(score)
+
+        for name in self.rank_backends():
+            if not self.health[name].allow_request():
+                continue
+            try:
+                return self._call(
+                    name, lambda backend: backend.score_submission_streaming(submission, on_score=report, cutoff=cutoff))
+            except ScoreParseError:
+                raise
+            except Exception as exc:
+                if scored:
+                    raise
+                last_error = exc
+        raise self._unavailable(last_error)
+
+    async def ascore_submission(self, submission):
+        """
+        Score a submission on the best available backend without blocking the event loop.
+
+        See ``score_submission``; hedged requests that lose are cancelled.
+        """
+        candidates = self.rank_backends()
+        last_error = None
+        for index, name in enumerate(candidates):
+            if not self.health[name].allow_request():
+                continue
+            try:
+                hedge = self._hedge_backend(name, candidates[index + 1:])
+                if hedge is not None:
+                    return await self._ascore_hedged(name, hedge, submission)
+                return await self._acall(name, submission)
+            except ScoreParseError:
+                raise
+            except Exception as exc:
+                last_error = exc
+        raise self._unavailable(last_error)
+
+    def _call(self, name, request):
+        health = self.health[name]
+        started = time.monotonic()
+        try:
+            result = request(self.get_backend(name))
+        except RateLimited:
+            # The request never reached the provider.
+            health.release()
+            raise
+        except ScoreParseError:
+            health.record(time.monotonic() - started, ok=True)
+            raise
+        except Exception:
+            health.record(time.monotonic() - started, ok=False)
+            raise
+        health.record(time.monotonic() - started, ok=True)
+        return result
+
+    async def _acall(self, name, submission):
+        health = self.health[name]
+        started = time.monotonic()
+        try:
+            result = await self.get_backend(name).ascore_submission(submission)
+        except (RateLimited, asyncio.CancelledError):
+            health.release()
+            raise
+        except ScoreParseError:
+            health.record(time.monotonic() - started, ok=True)
+            raise
+        except Exception:
+            health.record(time.monotonic() - started, ok=False)
+            raise
+        health.record(time.monotonic() - started, ok=True)
+        return result
+
+    def _hedge_backend(self, name, alternatives):
+        if not settings.SCORING_ROUTING_HEDGE or self.health[name].latency(0.95) is None:
+            return None
+        return next(iter(alternatives), None)
+
+    def _score_hedged(self, name, hedge, submission):
+        executor = ThreadPoolExecutor(max_workers=2)
+        try:
+            first = executor.submit(self._call, name, lambda backend: backend.score_submission(submission))
+            try:
+                return first.result(timeout=self.health[name].latency(0.95))
+            except FutureTimeoutError:
+                pass
+            if not self.health[hedge].allow_request():
+                return first.result()
+            second = executor.submit(self._call, hedge, lambda backend: backend.score_submission(submission))
+            last_error = None
+            for future in as_completed([first, second]):
+                try:
+                    return future.result()
+                except Exception as exc:
+                    last_error = exc
+            raise last_error
+        finally:
+            # A losing request cannot be interrupted; it finishes in the background.
+            executor.shutdown(wait=False)
+
+    async def _ascore_hedged(self, name, hedge, submission):
+        first = asyncio.ensure_future(self._acall(name, submission))
+        done, _ = await asyncio.wait({first}, timeout=self.health[name].latency(0.95))
+        if done or not self.health[hedge].allow_request():
+            return await first
+        pending = {first, asyncio.ensure_future(self._acall(hedge, submission))}
+        last_error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _unavailable(self, last_error):
+        if isinstance(last_error, RateLimited):
+            return last_error
+        retry_after = min((health.retry_after() for health in self.health.values()), default=0.0)
+        error = BackendsUnavailable(
+            f"No scoring backend available (retry in {retry_after:.0f}s)"
+            + (f": {last_error}" if last_error is not None else ''))
+        error.__cause__ = last_error
+        return error
+
+    def close(self):
+        if self._backends is not None:
+            for backend in self._backends.values():
+                backend.close()
@@ -0,0 +1,246 @@
+import re
+from typing import NamedTuple
+from .errors import ScoreParseError
+
+MAX_SCORE = 100
+
+# The prompts ask for "***SCORE: N***". The marker is matched case-insensitively,
+# with up to MAX_SEPARATOR_LENGTH non-word characters (asterisks, colon,
+# whitespace) between it and the number, which must not be followed by another
+# digit. Matching uses ASCII character classes.
+MARKER = 'SCORE'
+MAX_SEPARATOR_LENGTH = 6
+MAX_DIGITS = 3
+SCORE_PATTERN = re.compile(r'SCORE\W{0,6}?(\d{1,3})(?!\d)', re.IGNORECASE | re.ASCII)
+# The whole marker, or the start of one that may continue in the next chunk.
+MARKER_SEARCH = re.compile(r'SCORE|S(?:C(?:O(?:R)?)?)?\Z', re.IGNORECASE | re.ASCII)
+FEEDBACK_PREFIX = re.compile(r'[*\s]*', re.ASCII)
+
+DIGITS = frozenset('0123456789')
+WHITESPACE = frozenset(' \t\n\r\f\v')
+WORD_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_')
+
+_SEEK, _SEPARATOR, _DIGITS, _FEEDBACK_PREFIX, _FEEDBACK = range(5)
+
+class ParsedScore(NamedTuple):
+    """
+    The result of parsing a model response.
+
+    ``feedback_start`` and ``feedback_end`` delimit the feedback that follows
+    the score marker, as offsets into the full response text.
+    """
+    score: int
+    feedback_start: int
+    feedback_end: int
+
+    def feedback(self, text):
+        """
+        Return the feedback span of ``text``, the response this result was parsed from.
+        """
+        return text[self.feedback_start:self.feedback_end].strip()
+
+
+def _validate(score):
+    if score > MAX_SCORE:
+        raise ScoreParseError(f"Score {score} is outside the 0-{MAX_SCORE} range.")
+    return score
+
+
+class StreamingScoreParser:
+    """
+    Incrementally extract the score from a model response delivered in chunks.
+
+    This is a small state machine equivalent to ``SCORE_PATTERN``. Every
+    character is inspected at most once and chunks are never joined or copied,
+    so marker and number may be split across chunks arbitrarily (as with
+    Replicate's token stream). The score is reported as soon as the marker and
+    the complete number have been received.
+    """
+
+    def __init__(self, collect_feedback=True):
+        self.score = None
+        self.feedback_start = None
+        self.length = 0
+        self._state = _SEEK
+        self._matched = 0
+        self._separator_length = 0
+        self._digits = ''
+        self._collect_feedback = collect_feedback
+        self._feedback = []
+
+    def feed(self, chunk):
+        """
+        Consume the next chunk of the response.
+
+        Parameters:
+        -----------
+        chunk : str
+            The next piece of text generated by the model.
+
+        Returns:
+        --------
+        int or None
+            The score, once it has been found, otherwise None.
+
+        Raises:
+        -------
+        ScoreParseError
+            If the score is outside the 0-100 range.
+        """
+        if not chunk:
+            return self.score
+        offset = self.length
+        self.length += len(chunk)
+        if self._state == _FEEDBACK:
+            if self._collect_feedback:
+                self._feedback.append(chunk)
+            return self.score
+
+        position = 0
+        end = len(chunk)
+        while position < end:
+            state = self._state
+            if state == _SEEK and self._matched == 0:
+                match = MARKER_SEARCH.search(chunk, position)
+                if match is None:
+                    break
+                position = match.end()
+                self._matched = position - match.start()
+                if self._matched == len(MARKER):
+                    self._state = _SEPARATOR
+                    self._separator_length = 0
+                continue
+
+            char = chunk[position]
+            if state == _SEEK:
+                if char.upper() == MARKER[self._matched]:
+                    self._matched += 1
+                    if self._matched == len(MARKER):
+                        self._state = _SEPARATOR
+                        self._separator_length = 0
+                    position += 1
+                else:
+                    # The marker has no repeated letters, so a mismatch can only
+                    # restart the search at the current character.
+                    self._matched = 0
+            elif state == _SEPARATOR:
+                if char in DIGITS:
+                    self._state = _DIGITS
+                    self._digits = char
+                    position += 1
+                elif char not in WORD_CHARS and self._separator_length < MAX_SEPARATOR_LENGTH:
+                    self._separator_length += 1
+                    position += 1
+                else:
+                    self._reset()
+            elif state == _DIGITS:
+                if char in DIGITS:
+                    if len(self._digits) == MAX_DIGITS:
+                        # Too many digits; this cannot be the score.
+                        self._reset()
+                    else:
+                        self._digits += char
+                    position += 1
+                else:
+                    self.score = _validate(int(self._digits))
+                    self._state = _FEEDBACK_PREFIX
+            elif state == _FEEDBACK_PREFIX:
+                if char == '*' or char in WHITESPACE:
+                    position += 1
+                else:
+                    self._state = _FEEDBACK
+                    self.feedback_start = offset + position
+                    if self._collect_feedback:
+                        self._feedback.append(chunk[position:])
+                    break
+        return self.score
+
+    def finish(self):
+        """
+        Signal the end of the response.
+
+        A number at the very end of the response cannot be confirmed by
+        ``feed``, because more digits might still follow; it is picked up here.
+
+        Returns:
+        --------
+        int or None
+            The score, or None if the response did not contain one.
+        """
+        if self.score is None and self._state == _DIGITS:
+            self.score = _validate(int(self._digits))
+            self._state = _FEEDBACK
+        if self.score is not None and self.feedback_start is None:
+            self.feedback_start = self.length
+        return self.score
+
+    def result(self):
+        """
+        Finish parsing and return the typed result.
+
+        Raises:
+        -------
+        ScoreParseError
+            If the response did not contain a score.
+        """
+        if self.finish() is None:
+            raise ScoreParseError("The model's response did not contain a score.")
+        return ParsedScore(self.score, self.feedback_start, self.length)
+
+    @property
+    def feedback(self):
+        """
+        The text received after the score marker.
+        """
+        return ''.join(self._feedback).strip()
+
+    def _reset(self):
+        self._state = _SEEK
+        self._matched = 0
+        self._separator_length = 0
+        self._digits = ''
+
+
+def parse_score(output):
+    """
+    Extract the score from a model response in a single pass.
+
+    Parameters:
+    -----------
+    output : str or iterable of str
+        The full response text, or the response as a sequence of chunks
+        (e.g. the token list returned by Replicate). A list or tuple is
+        joined and matched like a string, which is several times faster than
+        feeding its chunks one by one; other iterables are consumed lazily
+        by the streaming parser.
+
+    Returns:
+    --------
+    ParsedScore
+        The score and the span of the feedback that follows it.
+
+    Raises:
+    -------
+    ScoreParseError
+        If the response does not contain a score in the 0-100 range.
+    """
+    if output is None:
+        raise ScoreParseError("The model returned no output.")
+    if isinstance(output, (list, tuple)):
+        output = ''.join(output)
+    if isinstance(output, str):
+        match = SCORE_PATTERN.search(output)
+        if match is None:
+            raise ScoreParseError("The model's response did not contain a score.")
+        feedback_start = FEEDBACK_PREFIX.match(output, match.end()).end()
+        return ParsedScore(_validate(int(match.group(1))), feedback_start, len(output))
+
+    parser = StreamingScoreParser(collect_feedback=False)
+    chunks = iter(output)
+    for chunk in chunks:
+        parser.feed(chunk)
+        if parser.feedback_start is not None:
+            # Only the length of the remaining feedback is needed.
+            parser.length += sum(map(len, chunks))
+            break
+    return parser.result()
@@ -1,19 +1,211 @@
+import asyncio
+import hashlib
+import json
+import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import httpx
+from django.conf import settings
+from job_postings.services.description_index.description_index import get_description_index
+from resume_ai.text_processing import compact_text
+from ..metrics.metrics import record_cache_lookup, record_compaction, record_parse_failure, time_stage
+from .errors import ScoreParseError
+from .prompt_builder import PROMPT_VERSION
+from .score_parser import StreamingScoreParser
+from ..rate_limiter.rate_limiter import estimate_tokens, get_rate_limiter
+from ..score_cache.score_cache import get_score_cache
 
-class ScoringService(ABC):
+def connection_limits():
+    """
+    Return the connection pool limits for provider HTTP clients, from settings.
+    """
+    return httpx.Limits(
+        max_connections=settings.SCORING_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.SCORING_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.SCORING_HTTP_KEEPALIVE_EXPIRY,
+    )
+
+def require_loaded_description_index(submission):
+    """
+    Check that a submission was loaded with its job posting's description index.
+
+    Async scoring must not touch the database: lazy loading raises
+    ``SynchronousOnlyOperation`` on the event loop, and a missing index
+    would be built there. Load submissions with
+    ``select_related('job_posting__description_index')`` (see
+    ``UserSubmissionQuerySet.for_scoring``) and build missing indexes with
+    ``get_description_index`` before entering the event loop.
+
+    Raises:
+    -------
+    ValueError
+        If the job posting or its description index is not loaded, or the
+        posting has no index yet.
+    """
+    if not type(submission).job_posting.is_cached(submission):
+        raise ValueError(
+            "Async scoring needs the submission's job posting loaded with "
+            "select_related('job_posting__description_index').")
+    job_posting = submission.job_posting
+    if not type(job_posting).description_index.is_cached(job_posting):
+        raise ValueError(
+            "Async scoring needs the job posting's description index loaded with "
+            "select_related('job_posting__description_index').")
+    if getattr(job_posting, 'description_index', None) is None:
+        raise ValueError(
+            f"Job posting {job_posting.pk} has no description index; build it with "
+            "get_description_index before scoring asynchronously.")
+
+class BaseScoringService(ABC):
     """
     Abstract base class for scoring services.
 
-    This class defines the interface for scoring services, ensuring that all
-    concrete implementations provide the necessary methods for scoring job submissions.
+    This class defines the interface the tasks use to score submissions. It
+    is implemented by ``ScoringService`` for the services that call a model
+    provider, and directly by the services that delegate to other scoring
+    services (``RoutingScoringService`` and ``EnsembleScoringService``).
+    """
+
+    service_name = None
+    # Whether the service has a batch API, see ``ScoringService.batch_request``.
+    supports_batch = False
+
+    @abstractmethod
+    def score_submission(self, submission):
+        """
+        Score a job application submission.
+
+        Parameters:
+        -----------
+        submission : UserSubmission
+            The submission object containing the job posting and resume.
+
+        Returns:
+        --------
+        int or float
+            The calculated score for the submission.
+        """
+
+    @abstractmethod
+    def score_submission_streaming(self, submission, on_score=None, cutoff=None):
+        """
+        Score a job application submission, reporting the score through ``on_score``
+        as soon as it is known. Returns the score and the feedback text received after it.
+        """
+
+    @abstractmethod
+    async def ascore_submission(self, submission):
+        """
+        Score a job application submission without blocking the event loop.
+        """
+
+    def score_many(self, submissions, max_concurrency=None):
+        """
+        Score several submissions concurrently.
+
+        Provider calls are I/O bound, so they are fanned out over a bounded
+        thread pool and run in parallel from a single worker process.
+
+        Parameters:
+        -----------
+        submissions : list of UserSubmission
+            The submissions to score.
+        max_concurrency : int, optional
+            The maximum number of provider calls in flight at once. Defaults
+            to ``settings.SCORING_BATCH_CONCURRENCY``.
+
+        Returns:
+        --------
+        dict
+            Maps each submission id to its score, or to the exception raised
+            while scoring it. One failing submission does not abort the others.
+        """
+        if not submissions:
+            return {}
+        max_concurrency = max_concurrency or settings.SCORING_BATCH_CONCURRENCY
+        results = {}
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(submissions))) as executor:
+            futures = {executor.submit(self.score_submission, submission): submission for submission in submissions}
+            for future in as_completed(futures):
+                submission = futures[future]
+                try:
+                    results[submission.id] = future.result()
+                except Exception as exc:
+                    results[submission.id] = exc
+        return results
+
+    async def ascore_many(self, submissions, max_concurrency=None):
+        """
+        Score several submissions concurrently on the running event loop.
+
+        Parameters:
+        -----------
+        submissions : list of UserSubmission
+            The submissions to score, with their job postings already loaded.
+        max_concurrency : int, optional
+            The maximum number of provider calls in flight at once. Defaults
+            to ``settings.SCORING_BATCH_CONCURRENCY``.
+
+        Returns:
+        --------
+        dict
+            Maps each submission id to its score, or to the exception raised
+            while scoring it.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or settings.SCORING_BATCH_CONCURRENCY)
+
+        async def score(submission):
+            async with semaphore:
+                try:
+                    return await self.ascore_submission(submission)
+                except Exception as exc:
+                    return exc
+
+        scores = await asyncio.gather(*(score(submission) for submission in submissions))
+        return {submission.id: score for submission, score in zip(submissions, scores)}
+
+    def close(self):
+        """
+        Release the service's HTTP connections.
+        """
+
+class ScoringService(BaseScoringService):
+    """
+    Abstract base class for the scoring services that call a model provider.
+
+    Subclasses build the prompt, run the model and extract the score; this
+    class provides the workflow around them.
+
+    Instances are long-lived and shared by all threads of a worker process
+    (see ``ScoringServiceFactory``), so they hold no per-request state. The
+    HTTP clients they create keep their connections alive between requests.
+
+    Subclasses describe the model they call through ``service_name``,
+    ``model_name`` and ``sampling_params``. Together with ``prompt_version``,
+    the job description and resume these form the content-addressed key used
+    by the score cache.
+
+    Each stage of scoring (prompt building, rate limit wait, model call and
+    parsing) is timed, and cache hits and parse failures are counted, in the
+    Prometheus metrics of ``services.metrics``.
     """
 
+    model_name = None
+    sampling_params = {}
+    prompt_version = PROMPT_VERSION
+
+    def __init__(self):
+        self._async_local = threading.local()
+
     def score_submission(self, submission):
         """
         Score a job application submission.
 
         This method orchestrates the scoring process by creating a prompt,
-        running the model, and extracting the score.
+        running the model, and extracting the score. Scores are looked up in
+        (and written back to) the configured score cache, so identical
+        resume/job description pairs only reach the model once. Provider
+        calls wait for the provider's rate limit before they are made.
 
         Parameters:
         -----------
@@ -25,14 +217,316 @@ class ScoringService(ABC):
         int or float
             The calculated score for the submission.
 
+        Raises:
+        -------
+        ScoreParseError
+            If no score can be extracted from the model's response.
+        RateLimited
+            If the provider's quota is not expected to free up in time.
+
         Note:
         -----
         This method provides a default implementation, but subclasses
         can override it if a different workflow is needed.
         """
-        prompt = self._create_prompt(submission)
-        output = self._run_model(prompt)
-        return self.get_score(output)
+        cache, cache_key, score = self._get_cached_score(submission)
+        if score is not None:
+            return score
+
+        score = self.sample_score(submission)
+
+        self._set_cached_score(cache, cache_key, submission, score)
+        return score
+
+    def sample_score(self, submission):
+        """
+        Score a submission with one call to the model, bypassing the score cache.
+
+        Each call draws a new sample from the model, which is what
+        ``EnsembleScoringService`` averages over.
+
+        Parameters:
+        -----------
+        submission : UserSubmission
+            The submission object containing the job posting and resume.
+
+        Returns:
+        --------
+        int or float
+            The score of this sample.
+        """
+        with time_stage(self.service_name, 'prompt'):
+            prompt = self._create_prompt(submission)
+        self._wait_for_rate_limit(prompt)
+        with time_stage(self.service_name, 'model'):
+            output = self._run_model(prompt)
+        return self._parse_score(output)
+
+    def score_submission_streaming(self, submission, on_score=None, cutoff=None):
+        """
+        Score a job application submission while the model's response streams in.
+
+        The response is consumed chunk by chunk and the score is reported
+        through ``on_score`` as soon as the score marker has been generated,
+        before the feedback that follows it.
+
+        Parameters:
+        -----------
+        submission : UserSubmission
+            The submission object containing the job posting and resume.
+        on_score : callable, optional
+            Called with the score as soon as it is known.
+        cutoff : bool, optional
+            Whether to stop generation once the score is known instead of
+            streaming the feedback. Defaults to
+            ``settings.SCORING_STREAM_FEEDBACK == 'cutoff'``.
+
+        Returns:
+        --------
+        tuple
+            The score and the feedback text received after it. Scores served
+            from the cache come without feedback.
+
+        Raises:
+        -------
+        ScoreParseError
+            If the response does not contain a score.
+        RateLimited
+            If the provider's quota is not expected to free up in time.
+        """
+        if cutoff is None:
+            cutoff = settings.SCORING_STREAM_FEEDBACK == 'cutoff'
+
+        cache, cache_key, score = self._get_cached_score(submission)
+        if score is not None:
+            if on_score is not None:
+                on_score(score)
+            return score, ''
+
+        with time_stage(self.service_name, 'prompt'):
+            prompt = self._create_prompt(submission)
+        self._wait_for_rate_limit(prompt)
+
+        parser = StreamingScoreParser()
+        stream = self._stream_model(prompt)
+        try:
+            with time_stage(self.service_name, 'model'):
+                for chunk in stream:
+                    if parser.score is not None:
+                        parser.feed(chunk)
+                    elif parser.feed(chunk) is not None:
+                        self._set_cached_score(cache, cache_key, submission, parser.score)
+                        if on_score is not None:
+                            on_score(parser.score)
+                        if cutoff:
+                            break
+        finally:
+            # Closing the stream disconnects from the provider, which stops generation.
+            stream.close()
+
+        if parser.score is None:
+            if parser.finish() is None:
+                record_parse_failure(self.service_name)
+                raise ScoreParseError("The model's response did not contain a score.")
+            self._set_cached_score(cache, cache_key, submission, parser.score)
+            if on_score is not None:
+                on_score(parser.score)
+        return parser.score, parser.feedback
+
+    async def ascore_submission(self, submission):
+        """
+        Score a job application submission without blocking the event loop.
+
+        This is the asynchronous counterpart of ``score_submission``; the model
+        is run through ``_arun_model``, and the score cache is read and written
+        in a worker thread. The submission's job posting and its description
+        index must already be loaded (see ``require_loaded_description_index``),
+        since database access is not allowed from async code.
+
+        Parameters:
+        -----------
+        submission : UserSubmission
+            The submission object containing the job posting and resume.
+
+        Returns:
+        --------
+        int or float
+            The calculated score for the submission.
+
+        Raises:
+        -------
+        ValueError
+            If the description index is not loaded.
+        """
+        require_loaded_description_index(submission)
+        cache, cache_key, score = await asyncio.to_thread(self._get_cached_score, submission)
+        if score is not None:
+            return score
+
+        score = await self.asample_score(submission)
+
+        await asyncio.to_thread(self._set_cached_score, cache, cache_key, submission, score)
+        return score
+
+    async def asample_score(self, submission):
+        """
+        Score a submission with one call to the model without blocking the event loop.
+
+        This is the asynchronous counterpart of ``sample_score``, with the same
+        requirements as ``ascore_submission``.
+        """
+        require_loaded_description_index(submission)
+        with time_stage(self.service_name, 'prompt'):
+            prompt = self._create_prompt(submission)
+        rate_limiter = self.get_rate_limiter()
+        if rate_limiter is not None:
+            with time_stage(self.service_name, 'rate_limit'):
+                await rate_limiter.async_wait(self.service_name, self._estimate_tokens(prompt), settings.SCORING_RATE_LIMIT_MAX_WAIT)
+        with time_stage(self.service_name, 'model'):
+            output = await self._arun_model(prompt)
+        return self._parse_score(output)
+
+    def batch_request(self, submission):
+        """
+        Build the request for scoring a submission through the provider's batch API.
+
+        Parameters:
+        -----------
+        submission : UserSubmission
+            The submission object containing the job posting and resume.
+
+        Returns:
+        --------
+        dict
+            One line of the batch input file, with the submission id as ``custom_id``.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support batch scoring.")
+
+    def batch_response(self, body):
+        """
+        Turn the response body of one batch request into the output ``get_score`` accepts.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support batch scoring.")
+
+    def _parse_score(self, output):
+        """
+        Extract the score with ``get_score``, reporting any failure as ScoreParseError.
+        """
+        try:
+            with time_stage(self.service_name, 'parse'):
+                return self.get_score(output)
+        except ScoreParseError:
+            record_parse_failure(self.service_name)
+            raise
+        except (ValueError, IndexError, KeyError, TypeError, AttributeError) as e:
+            record_parse_failure(self.service_name)
+            raise ScoreParseError(f"Could not extract a score from the model's response: {e}") from e
+
+    def _wait_for_rate_limit(self, prompt):
+        rate_limiter = self.get_rate_limiter()
+        if rate_limiter is not None:
+            with time_stage(self.service_name, 'rate_limit'):
+                rate_limiter.wait(self.service_name, self._estimate_tokens(prompt), settings.SCORING_RATE_LIMIT_MAX_WAIT)
+
+    def _get_cached_score(self, submission):
+        cache = self.get_cache()
+        if cache is None:
+            return None, None, None
+        cache_key = self.get_cache_key(submission)
+        score = cache.get(cache_key)
+        record_cache_lookup(self.service_name, score is not None)
+        return cache, cache_key, score
+
+    def _set_cached_score(self, cache, cache_key, submission, score):
+        if cache is not None:
+            cache.set(cache_key, score, job_posting_id=submission.job_posting_id)
+
+    def get_cache(self):
+        """
+        Return the score cache used by this service, or None to disable caching.
+        """
+        return get_score_cache()
+
+    def get_rate_limiter(self):
+        """
+        Return the rate limiter used by this service, or None to disable rate limiting.
+        """
+        return get_rate_limiter()
+
+    def _get_async_client(self):
+        """
+        Return the async client for the running event loop.
+
+        An async connection pool cannot be shared between event loops, so each
+        thread keeps the client for its current loop and builds a new one with
+        ``_build_async_client`` whenever the loop changes (e.g. between two
+        ``asyncio.run`` calls in a Celery task).
+        """
+        loop = asyncio.get_running_loop()
+        local = self._async_local
+        if getattr(local, 'loop', None) is not loop:
+            local.client = self._build_async_client()
+            local.loop = loop
+        return local.client
+
+    def _build_async_client(self):
+        """
+        Create the provider's async client; used by ``_get_async_client``.
+        """
+        raise NotImplementedError
+
+    def _job_description(self, submission):
+        """
+        Return the normalized job description to put into the prompt.
+        """
+        return get_description_index(submission.job_posting).description
+
+    def _resume(self, submission):
+        """
+        Return the compacted resume to put into the prompt.
+
+        Contact details and repeated lines are dropped and the resume is
+        trimmed to ``settings.RESUME_TOKEN_BUDGET`` tokens, keeping the
+        sections most relevant to the job posting (see ``compact_text``).
+        The estimated tokens before and after are recorded in the metrics.
+        """
+        index = get_description_index(submission.job_posting)
+        compacted = compact_text(submission.resume, settings.RESUME_TOKEN_BUDGET, index.term_weights)
+        record_compaction(self.service_name, compacted.tokens_before, compacted.tokens_after)
+        return compacted.text
+
+    def _estimate_tokens(self, prompt):
+        return estimate_tokens(prompt, self.sampling_params.get('max_tokens', 0))
+
+    def get_cache_key(self, submission):
+        """
+        Build the content-addressed cache key for a submission.
+
+        The key is a SHA-256 digest over the service, model name, sampling
+        parameters, prompt version, job description (through its indexed
+        prompt prefix hash), resume and resume token budget, so any change
+        to one of them results in a different key.
+
+        Parameters:
+        -----------
+        submission : UserSubmission
+            The submission object containing the job posting and resume.
+
+        Returns:
+        --------
+        str
+            The hex digest identifying this scoring request.
+        """
+        payload = json.dumps([
+            self.service_name or type(self).__name__,
+            self.model_name,
+            self.sampling_params,
+            self.prompt_version,
+            get_description_index(submission.job_posting).prompt_prefix_hash,
+            submission.resume,
+            settings.RESUME_TOKEN_BUDGET,
+        ], sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
 
     @abstractmethod
     def get_score(self, response):
@@ -97,4 +591,46 @@ class ScoringService(ABC):
         This method must be implemented by subclasses to handle the specific
         API calls or procedures for running their model.
         """
-        pass
\ No newline at end of file
+        pass
+
+    async def _arun_model(self, prompt):
+        """
+        Run the model with the given prompt asynchronously.
+
+        Parameters:
+        -----------
+        prompt : str
+            The formatted prompt string.
+
+        Returns:
+        --------
+        Any
+            The response from the model, in the same format as ``_run_model``.
+
+        Note:
+        -----
+        The default implementation runs ``_run_model`` in a worker thread.
+        Subclasses should override it with a native async client call.
+        """
+        return await asyncio.to_thread(self._run_model, prompt)
+
+    def _stream_model(self, prompt):
+        """
+        Run the model with the given prompt, streaming its response.
+
+        Parameters:
+        -----------
+        prompt : str
+            The formatted prompt string.
+
+        Returns:
+        --------
+        generator of str
+            The generated text, chunk by chunk. Closing the generator must
+            release the provider connection and stop generation.
+
+        Note:
+        -----
+        Subclasses that support streaming must override this method.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming.")
@@ -1,25 +1,45 @@
-from django.conf import settings
+import threading
+from .ensemble_scoring import EnsembleScoringService
 from .llama_scoring import LlamaScoringService
 from .openai_scoring import OpenAIScoringService
+from .routing_scoring import RoutingScoringService
 
 class ScoringServiceFactory:
     """
     A factory class for creating scoring service instances.
+
+    Each worker process keeps one instance per service type, so the provider
+    clients and their keep-alive connections are reused across tasks.
     """
 
-    @staticmethod
-    def get_scoring_service(service_type):
+    services = {
+        'openai': OpenAIScoringService,
+        'llama': LlamaScoringService,
+        'auto': RoutingScoringService,
+        'ensemble': EnsembleScoringService,
+    }
+
+    _instances = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_scoring_service(cls, service_type):
         """
-        Creates and returns an instance of the specified scoring service.
+        Returns the process-wide instance of the specified scoring service.
+
+        The instance is created on first use. Scoring services are
+        thread-safe, so it may be shared by all threads of the process.
 
         Parameters:
         -----------
         service_type : str
-            The type of scoring service to create. Valid options are 'openai' and 'llama'.
+            The type of scoring service to create. Valid options are 'openai', 'llama',
+            'auto', which routes between the others, and 'ensemble', which averages
+            samples from them.
 
         Returns:
         --------
-        ScoringService
+        BaseScoringService
             An instance of the specified scoring service.
 
         Raises:
@@ -29,15 +49,40 @@ class ScoringServiceFactory:
 
         Note:
         -----
-        - The OpenAI service requires an API key, which is retrieved from Django settings.
-        - The Llama service doesn't require additional parameters for instantiation.
+        - The OpenAI service reads its API key from Django settings.
+        - The Llama service reads its API token from Django settings.
+        """
+        instance = cls._instances.get(service_type)
+        if instance is None:
+            with cls._lock:
+                instance = cls._instances.get(service_type)
+                if instance is None:
+                    service_class = cls.services.get(service_type)
+                    if service_class is None:
+                        raise ValueError('Invalid service type specified.')
+                    instance = cls._instances[service_type] = service_class()
+        return instance
+
+    @classmethod
+    def reset(cls, after_fork=False):
+        """
+        Forget the process-wide instances so they are rebuilt on next use.
+
+        Parameters:
+        -----------
+        after_fork : bool
+            Set in a forked child process. The inherited instances are dropped
+            without closing them, since their connections are still in use by
+            the parent.
         """
-        services = {
-            'openai': lambda: OpenAIScoringService(settings.OPENAI_API_KEY),
-            'llama': LlamaScoringService
-        }
-        
-        service_class = services.get(service_type)
-        if service_class:
-            return service_class()
-        raise ValueError('Invalid service type specified.')
\ No newline at end of file
+        if after_fork:
+            # Only the forking thread survives a fork, so a lock held by any
+            # other thread of the parent would never be released.
+            cls._lock = threading.Lock()
+            cls._instances = {}
+            return
+        with cls._lock:
+            instances = list(cls._instances.values())
+            cls._instances.clear()
+        for instance in instances:
+            instance.close()
@@ -0,0 +1,98 @@
+import time
+from datetime import datetime
+from celery.signals import before_task_publish, task_postrun, task_prerun, worker_process_init, worker_process_shutdown
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from job_postings.models import JobPosting
+from .models import UserSubmission
+from .services.leaderboard.leaderboard import get_leaderboard, reset_leaderboard
+from .services.metrics.metrics import start_metrics_push, stop_metrics_push, task_finished, task_started
+from .services.rate_limiter.rate_limiter import reset_rate_limiter
+from .services.resume_extraction.resume_extraction import reset_extraction_pool
+from .services.score_cache.score_cache import get_score_cache, reset_score_cache
+from .services.scoring_service.scoring_service_factory import ScoringServiceFactory
+
+@receiver(post_save, sender=JobPosting)
+def invalidate_cached_scores_on_save(sender, instance, created, **kwargs):
+    """
+    Drop cached scores for a job posting whenever it is updated.
+    """
+    if created:
+        return
+    cache = get_score_cache()
+    if cache is not None:
+        cache.invalidate_job_posting(instance.id)
+
+@receiver(post_delete, sender=JobPosting)
+def invalidate_cached_scores_on_delete(sender, instance, **kwargs):
+    """
+    Drop cached scores for a job posting when it is deleted.
+    """
+    cache = get_score_cache()
+    if cache is not None:
+        cache.invalidate_job_posting(instance.id)
+
+@receiver(post_delete, sender=JobPosting)
+def invalidate_leaderboard_on_posting_delete(sender, instance, **kwargs):
+    leaderboard = get_leaderboard()
+    if leaderboard is not None:
+        leaderboard.invalidate(instance.id)
+
+@receiver(post_delete, sender=UserSubmission)
+def invalidate_leaderboard_on_submission_delete(sender, instance, **kwargs):
+    """
+    Drop the leaderboard of a deleted submission's job posting, which may have listed it.
+    """
+    if instance.score is None:
+        return
+    leaderboard = get_leaderboard()
+    if leaderboard is not None:
+        leaderboard.invalidate(instance.job_posting_id)
+
+
+@worker_process_init.connect
+def set_up_worker_process(**kwargs):
+    """
+    Give each forked Celery worker process its own provider clients and connections.
+
+    Anything created in the parent before the fork is dropped; the scoring
+    services, score cache, leaderboard, rate limiter and resume extraction pool
+    are rebuilt on first use in the child and then kept for the lifetime of the
+    process.
+    """
+    ScoringServiceFactory.reset(after_fork=True)
+    reset_score_cache()
+    reset_leaderboard()
+    reset_rate_limiter()
+    reset_extraction_pool(after_fork=True)
+    if settings.METRICS_PUSHGATEWAY_URL:
+        start_metrics_push(settings.METRICS_PUSHGATEWAY_URL, settings.METRICS_PUSH_INTERVAL)
+
+@worker_process_shutdown.connect
+def tear_down_worker_process(**kwargs):
+    stop_metrics_push()
+    reset_extraction_pool()
+
+@before_task_publish.connect
+def stamp_enqueued_at(headers=None, **kwargs):
+    """
+    Put the time from which a task may run into its message, to measure its queue wait.
+
+    That is the publishing time, or the ETA of a task with a countdown.
+    """
+    if headers is None:
+        return
+    enqueued_at = time.time()
+    eta = headers.get('eta')
+    if eta:
+        enqueued_at = max(enqueued_at, datetime.fromisoformat(eta).timestamp())
+    headers['enqueued_at'] = enqueued_at
+
+@task_prerun.connect
+def record_task_start(task_id=None, task=None, **kwargs):
+    task_started(task_id, task.name, task.request.get('enqueued_at'))
+
+@task_postrun.connect
+def record_task_end(task_id=None, task=None, state=None, **kwargs):
+    task_finished(task_id, task.name, state)
@@ -1,38 +1,489 @@
+import asyncio
+import random
+import time
+from collections import defaultdict
 from celery import shared_task
+from django.conf import settings
+from job_postings.services.description_index.description_index import get_description_index
+from .services.batch_rescoring.batch_rescoring import advance_rescore_job
+from .services.leaderboard.leaderboard import get_leaderboard, record_scores
+from .services.metrics.metrics import observe_stage, record_outcome, record_retry, time_stage
+from .services.prescreen.prescreen import prescore_many
+from .services.rate_limiter.rate_limiter import RateLimited
+from .services.resume_extraction.resume_extraction import extract_resume_text
+from .services.scoring_service.errors import ScoreParseError, is_transient_error
 from .services.scoring_service.scoring_service_factory import ScoringServiceFactory
 
+def _is_valid_score(score):
+    return isinstance(score, (int, float)) and score >= 0
+
+def _rate_limit_countdown(retry_after):
+    # Spread re-scheduled tasks out so they do not all wake up at once.
+    return retry_after + random.uniform(0, retry_after)
+
+def _retry_countdown(attempt):
+    """
+    Capped exponential backoff with full jitter for the given (1-based) attempt.
+    """
+    ceiling = min(settings.SCORING_RETRY_BACKOFF_MAX, settings.SCORING_RETRY_BACKOFF_BASE * 2 ** (attempt - 1))
+    return random.uniform(0, ceiling)
+
+def _should_retry(exc, attempts):
+    """
+    Decide whether a failed scoring attempt is retried.
+
+    Transient provider errors are retried up to ``SCORING_RETRY_MAX_ATTEMPTS``
+    attempts. Unparsable output is retried up to ``SCORING_PARSE_MAX_ATTEMPTS``
+    attempts, since sampling may produce a well-formed answer next time.
+    Everything else fails immediately.
+    """
+    if isinstance(exc, ScoreParseError):
+        return attempts < settings.SCORING_PARSE_MAX_ATTEMPTS
+    return is_transient_error(exc) and attempts < settings.SCORING_RETRY_MAX_ATTEMPTS
+
+def _retry_reason(exc):
+    return 'parse' if isinstance(exc, ScoreParseError) else 'transient'
+
+def _describe_error(exc):
+    return f"{type(exc).__name__}: {exc}"
+
+def _build_missing_description_indexes(submissions):
+    """
+    Make sure every submission's job posting has its description index loaded.
+
+    Async scoring cannot query the database, so postings without an index are
+    indexed here, once per posting, before the event loop starts.
+    """
+    indexes = {}
+    for submission in submissions:
+        job_posting = submission.job_posting
+        if job_posting.pk not in indexes:
+            indexes[job_posting.pk] = get_description_index(job_posting)
+        job_posting.description_index = indexes[job_posting.pk]
+
+def _prescreen(submissions):
+    """
+    Compute the prescore of each submission and hold back clear non-matches.
+
+    Submissions are scored against the term weights of their job posting's
+    description index, one vectorized pass per posting. Those below the posting's
+    ``prescreen_threshold`` get the status given by ``settings.PRESCREEN_ACTION``.
+    The changes are made on the instances only; the caller saves them.
+
+    Returns:
+    --------
+    list
+        The submissions that must not be sent to the LLM.
+    """
+    from .models import UserSubmission
+
+    held_status = {
+        'defer': UserSubmission.STATUS_DEFERRED,
+        'skip': UserSubmission.STATUS_SCREENED_OUT,
+    }.get(settings.PRESCREEN_ACTION)
+    if held_status is None:
+        raise ValueError('Invalid prescreen action specified.')
+
+    by_posting = defaultdict(list)
+    for submission in submissions:
+        by_posting[submission.job_posting_id].append(submission)
+
+    held = []
+    for group in by_posting.values():
+        job_posting = group[0].job_posting
+        prescores = prescore_many(
+            get_description_index(job_posting).term_weights, [submission.resume for submission in group])
+        for submission, prescore in zip(group, prescores):
+            submission.prescore = float(prescore)
+            threshold = job_posting.prescreen_threshold
+            if threshold is not None and submission.prescore < threshold:
+                submission.scoring_status = held_status
+                held.append(submission)
+    return held
+
+def _score_streaming(scoring_service, submission, loaded_attempts):
+    """
+    Score a submission in streaming mode, storing the score as soon as it is generated.
+
+    The early write is guarded like ``save_scoring_result``: it is skipped if
+    another attempt has finished since ``loaded_attempts`` was read. The
+    feedback that follows the score is put on ``submission.feedback``
+    (unsaved); the caller writes it back together with the rest of the result.
+    """
+    from .models import SCORE_FIELDS, UserSubmission
+
+    def store_score(score):
+        if _is_valid_score(score):
+            submission.set_score(score)
+            submission.scoring_status = UserSubmission.STATUS_SCORED
+            if not submission.save_scoring_result(SCORE_FIELDS + ['scoring_status'], loaded_attempts):
+                return
+            leaderboard = get_leaderboard()
+            if leaderboard is not None:
+                leaderboard.record(submission.job_posting_id, submission.id, score)
+
+    score, feedback = scoring_service.score_submission_streaming(submission, on_score=store_score)
+    submission.feedback = feedback
+    return score
+
 @shared_task
-def score_submission(submission_id):
+def extract_resume(submission_id):
+    """
+    Extract the text of a resume uploaded as a file, to be scored next.
+
+    The text is extracted in the resume extraction process pool (see
+    ``extract_resume_text``) and stored, normalized, as the submission's
+    ``resume``. When extraction fails the submission is marked failed and
+    the error is raised, which stops the scoring task chained after this one;
+    this includes unexpected errors, so that no submission is left extracting.
+
+    Parameters
+    ----------
+    submission_id : UUID
+        The unique identifier of the UserSubmission whose file is extracted.
+
+    Raises
+    ------
+    ResumeExtractionError
+        If no text could be extracted from the file.
+    """
+    from .models import UserSubmission
+
+    submission = UserSubmission.objects.only('id', 'service', 'resume_file').get(id=submission_id)
+    submissions = UserSubmission.objects.filter(pk=submission.pk)
+    try:
+        with time_stage(submission.service, 'extract'):
+            text = extract_resume_text(submission.resume_file.path)
+    except Exception as exc:
+        submissions.update(scoring_status=UserSubmission.STATUS_FAILED, last_scoring_error=_describe_error(exc))
+        record_outcome(submission.service, 'failed')
+        raise
+    submissions.update(resume=text, scoring_status=UserSubmission.STATUS_PENDING)
+
+@shared_task(bind=True)
+def score_submission(self, submission_id, prescreen=True):
     """
     Score a user submission using the appropriate scoring service.
 
     This function retrieves a UserSubmission object, determines the correct
     scoring service, calculates the score, and updates the submission record.
+    If the provider's rate limit is exhausted, the task re-schedules itself
+    for when the quota is expected to have refilled. Transient provider errors
+    and unparsable output are retried with capped exponential backoff and
+    jitter; the attempt count and last error are kept on the submission.
+    With ``settings.SCORING_STREAMING`` enabled, the score is written as soon
+    as the model generates it, before any feedback.
+    With ``settings.PRESCREEN_ENABLED``, the submission's prescore is stored
+    first, and a submission below its posting's threshold is deferred or
+    screened out without calling the model. Retries of the task skip this.
+
+    The submission is loaded together with its job posting in one query, and
+    only the scoring fields are written back, conditionally on the attempt
+    count it was loaded with: when the task is delivered twice, the delivery
+    that finishes second leaves the first one's result in place.
 
     Parameters
     ----------
     submission_id : int
         The unique identifier of the UserSubmission to be scored.
+    prescreen : bool
+        Whether the submission may be held back by pre-screening.
 
     Returns
     -------
-    float
-        The calculated score for the submission.
+    float or None
+        The calculated score for the submission, or None if it was held back
+        or another delivery of the task already recorded its result.
 
     Raises
     ------
     UserSubmission.DoesNotExist
         If no UserSubmission with the given id exists.
+    ScoreParseError
+        If no valid score could be extracted after the allowed attempts.
     """
-    from .models import UserSubmission  
-    
-    submission = UserSubmission.objects.get(id=submission_id)
+    from .models import SCORE_FIELDS, UserSubmission
+
+    started = time.perf_counter()
+    submission = UserSubmission.objects.for_scoring().get(id=submission_id)
+    loaded_attempts = submission.scoring_attempts
+    observe_stage(submission.service, 'fetch', time.perf_counter() - started)
+    # A retry of this task already passed pre-screening.
+    if settings.PRESCREEN_ENABLED and prescreen and not self.request.retries:
+        with time_stage(submission.service, 'prescreen'):
+            held = _prescreen([submission])
+        if not submission.save_scoring_result(['prescore', 'scoring_status'], loaded_attempts):
+            record_outcome(submission.service, 'duplicate')
+            return None
+        if held:
+            record_outcome(submission.service, 'screened')
+            return None
+
     scoring_service = ScoringServiceFactory.get_scoring_service(submission.service)
-    score = scoring_service.score_submission(submission)
-    if not isinstance(score, (int, float)) or score < 0:
-        raise ValueError(f"Invalid score received: {score}")
-    
-    submission.score = score
-    submission.save()
-    
-    return score
\ No newline at end of file
+    try:
+        if settings.SCORING_STREAMING:
+            score = _score_streaming(scoring_service, submission, loaded_attempts)
+        else:
+            score = scoring_service.score_submission(submission)
+        if not _is_valid_score(score):
+            raise ScoreParseError(f"Invalid score received: {score}")
+    except RateLimited as exc:
+        # The request was never sent, so it does not count as an attempt.
+        record_retry(submission.service, 'rate_limited')
+        raise self.retry(exc=exc, countdown=_rate_limit_countdown(exc.retry_after), max_retries=None)
+    except Exception as exc:
+        submission.scoring_attempts += 1
+        submission.last_scoring_error = _describe_error(exc)
+        retry = _should_retry(exc, submission.scoring_attempts)
+        if not retry:
+            submission.scoring_status = UserSubmission.STATUS_FAILED
+        if not submission.save_scoring_result(
+                ['scoring_attempts', 'last_scoring_error', 'scoring_status'], loaded_attempts):
+            record_outcome(submission.service, 'duplicate')
+            return None
+        if retry:
+            record_retry(submission.service, _retry_reason(exc))
+            raise self.retry(exc=exc, countdown=_retry_countdown(submission.scoring_attempts), max_retries=None)
+        record_outcome(submission.service, 'failed')
+        raise
+
+    submission.set_score(score)
+    submission.scoring_attempts += 1
+    submission.scoring_status = UserSubmission.STATUS_SCORED
+    submission.last_scoring_error = ''
+    update_fields = SCORE_FIELDS + ['scoring_attempts', 'scoring_status', 'last_scoring_error']
+    if settings.SCORING_STREAMING:
+        update_fields.append('feedback')
+    with time_stage(submission.service, 'save'):
+        saved = submission.save_scoring_result(update_fields, loaded_attempts)
+    if not saved:
+        record_outcome(submission.service, 'duplicate')
+        return None
+    record_outcome(submission.service, 'scored')
+    record_scores([submission])
+
+    return score
+
+@shared_task
+def score_submissions_batch(submission_ids, prescreen=True):
+    """
+    Score many user submissions from a single task.
+
+    Submissions are grouped by scoring service and each group is scored with
+    ``BaseScoringService.score_many`` (or ``ascore_many`` when
+    ``settings.SCORING_BATCH_MODE`` is 'asyncio'), which keeps several
+    provider calls in flight at once. All scores are written back with a
+    single bulk update. Submissions that hit the provider's rate limit, or
+    failed in a way ``score_submission`` would retry, are re-queued as a new
+    batch after a backoff.
+
+    Parameters
+    ----------
+    submission_ids : list
+        The unique identifiers of the UserSubmissions to be scored.
+
+    Returns
+    -------
+    dict
+        ``scored`` maps submission ids to their new score and ``failed`` maps
+        submission ids to the error that prevented scoring. ``deferred``
+        lists submission ids re-queued because of rate limiting or a
+        retryable error. ``screened`` lists submission ids held back by
+    pre-screening. Ids that do not exist are ignored.
+    """
+    from .models import SCORE_FIELDS, UserSubmission
+
+    submissions = list(UserSubmission.objects.for_scoring().filter(id__in=submission_ids))
+    loaded_attempts = {submission.pk: submission.scoring_attempts for submission in submissions}
+    screened = []
+    if settings.PRESCREEN_ENABLED and prescreen:
+        held = _prescreen(submissions)
+        prescreened = UserSubmission.objects.save_scoring_results(submissions, ['prescore', 'scoring_status'], loaded_attempts)
+        for submission in submissions:
+            if submission.pk not in prescreened:
+                record_outcome(submission.service, 'duplicate')
+            elif submission in held:
+                record_outcome(submission.service, 'screened')
+        screened = [str(submission.id) for submission in held if submission.pk in prescreened]
+        submissions = [submission for submission in submissions if submission.pk in prescreened and submission not in held]
+
+    by_service = defaultdict(list)
+    for submission in submissions:
+        by_service[submission.service].append(submission)
+
+    scored = []
+    failed = {}
+    deferred = []
+    retry_after = 0
+    attempted = []
+    for service_type, group in by_service.items():
+        try:
+            scoring_service = ScoringServiceFactory.get_scoring_service(service_type)
+        except ValueError as e:
+            failed.update({str(submission.id): str(e) for submission in group})
+            continue
+
+        if settings.SCORING_BATCH_MODE == 'asyncio':
+            _build_missing_description_indexes(group)
+            results = asyncio.run(scoring_service.ascore_many(group))
+        else:
+            results = scoring_service.score_many(group)
+        for submission in group:
+            score = results[submission.id]
+            if isinstance(score, RateLimited):
+                record_retry(service_type, 'rate_limited')
+                deferred.append(str(submission.id))
+                retry_after = max(retry_after, score.retry_after)
+                continue
+
+            submission.scoring_attempts += 1
+            attempted.append(submission)
+            if not isinstance(score, Exception) and not _is_valid_score(score):
+                score = ScoreParseError(f"Invalid score received: {score}")
+            if isinstance(score, Exception):
+                submission.last_scoring_error = _describe_error(score)
+                if _should_retry(score, submission.scoring_attempts):
+                    record_retry(service_type, _retry_reason(score))
+                    deferred.append(str(submission.id))
+                    retry_after = max(retry_after, _retry_countdown(submission.scoring_attempts))
+                else:
+                    submission.scoring_status = UserSubmission.STATUS_FAILED
+                    failed[str(submission.id)] = str(score)
+            else:
+                submission.set_score(score)
+                submission.scoring_status = UserSubmission.STATUS_SCORED
+                submission.last_scoring_error = ''
+                scored.append(submission)
+
+    # Results of attempts that another task finished first are dropped.
+    written = UserSubmission.objects.save_scoring_results(
+        attempted, SCORE_FIELDS + ['scoring_status', 'scoring_attempts', 'last_scoring_error'], loaded_attempts)
+    scored_ids = {submission.pk for submission in scored}
+    for submission in attempted:
+        submission_id = str(submission.id)
+        if submission.pk not in written:
+            record_outcome(submission.service, 'duplicate')
+            failed.pop(submission_id, None)
+            if submission_id in deferred:
+                deferred.remove(submission_id)
+        elif submission.pk in scored_ids:
+            record_outcome(submission.service, 'scored')
+        elif submission_id in failed:
+            record_outcome(submission.service, 'failed')
+    scored = [submission for submission in scored if submission.pk in written]
+    record_scores(scored)
+    if deferred:
+        # These submissions already passed pre-screening.
+        score_submissions_batch.apply_async(
+            (deferred,), {'prescreen': False}, countdown=_rate_limit_countdown(retry_after))
+
+    return {
+        'scored': {str(submission.id): submission.score for submission in scored},
+        'failed': failed,
+        'deferred': deferred,
+        'screened': screened,
+    }
+
+@shared_task
+def rescore_job_posting(job_posting_id):
+    """
+    Re-score every submission for a job posting.
+
+    The applicant pool is split into chunks of ``settings.SCORING_BATCH_SIZE``
+    and each chunk is queued as a ``score_submissions_batch`` task.
+
+    Parameters
+    ----------
+    job_posting_id : int
+        The unique identifier of the JobPosting whose applicants are re-scored.
+
+    Returns
+    -------
+    list
+        The ids of the queued batch tasks.
+    """
+    from .models import UserSubmission
+
+    submission_ids = list(
+        UserSubmission.objects.filter(job_posting_id=job_posting_id)
+        .order_by('id')
+        .values_list('id', flat=True)
+    )
+    batch_size = settings.SCORING_BATCH_SIZE
+    task_ids = []
+    for start in range(0, len(submission_ids), batch_size):
+        chunk = [str(submission_id) for submission_id in submission_ids[start:start + batch_size]]
+        task_ids.append(score_submissions_batch.delay(chunk).id)
+    return task_ids
+
+@shared_task
+def score_deferred_submissions(job_posting_id):
+    """
+    Send the submissions that pre-screening deferred for a job posting to the LLM.
+
+    Use this when a posting's applicant pool turns out thinner than expected,
+    or after lowering its ``prescreen_threshold``. The submissions are queued
+    in chunks of ``settings.SCORING_BATCH_SIZE`` with pre-screening bypassed.
+
+    Parameters
+    ----------
+    job_posting_id : int
+        The unique identifier of the JobPosting whose deferred applicants are scored.
+
+    Returns
+    -------
+    list
+        The ids of the queued batch tasks.
+    """
+    from .models import UserSubmission
+
+    submission_ids = list(
+        UserSubmission.objects.filter(job_posting_id=job_posting_id, scoring_status=UserSubmission.STATUS_DEFERRED)
+        .order_by('id')
+        .values_list('id', flat=True)
+    )
+    batch_size = settings.SCORING_BATCH_SIZE
+    task_ids = []
+    for start in range(0, len(submission_ids), batch_size):
+        chunk = [str(submission_id) for submission_id in submission_ids[start:start + batch_size]]
+        task_ids.append(score_submissions_batch.delay(chunk, prescreen=False).id)
+    return task_ids
+
+@shared_task(bind=True)
+def run_rescore_job(self, rescore_job_id):
+    """
+    Advance a bulk re-scoring job by one step and schedule the next one.
+
+    The job's submissions are scored through the provider's batch API (see
+    ``advance_rescore_job``), so the re-score neither uses the live rate limit
+    nor pays the synchronous price. While the batch is running the task
+    re-schedules itself every ``settings.RESCORE_POLL_INTERVAL`` seconds.
+    Running the task again for a job that was interrupted resumes it.
+
+    Parameters
+    ----------
+    rescore_job_id : str
+        The unique identifier of the RescoreJob to advance.
+
+    Returns
+    -------
+    str
+        The status of the job after this step.
+    """
+    from .models import RescoreJob
+
+    rescore_job = RescoreJob.objects.get(id=rescore_job_id)
+    try:
+        scoring_service = ScoringServiceFactory.get_scoring_service(rescore_job.service)
+        delay = advance_rescore_job(rescore_job, scoring_service)
+    except Exception as exc:
+        if is_transient_error(exc) and self.request.retries + 1 < settings.SCORING_RETRY_MAX_ATTEMPTS:
+            raise self.retry(exc=exc, countdown=_retry_countdown(self.request.retries + 1), max_retries=None)
+        rescore_job.status = RescoreJob.STATUS_FAILED
+        rescore_job.last_error = _describe_error(exc)
+        rescore_job.save(update_fields=['status', 'last_error', 'updated_at'])
+        raise
+
+    if delay is not None:
+        run_rescore_job.apply_async((str(rescore_job.id),), countdown=delay)
+    return rescore_job.status
@@ -0,0 +1,192 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from django.test import SimpleTestCase, override_settings
+from prometheus_client import REGISTRY
+from job_postings.models import JobPosting, JobPostingIndex
+from job_postings.services.description_index.description_index import index_fields
+from user_scoring.models import UserSubmission
+from user_scoring.services.scoring_service.llama_scoring import LlamaScoringService
+from user_scoring.services.scoring_service.openai_scoring import OpenAIScoringService
+from user_scoring.services.scoring_service.scoring_service import ScoringService
+
+RESPONSE_DELAY = 0.2
+
+
+class StubProviderHandler(BaseHTTPRequestHandler):
+    """
+    Answers OpenAI chat completion and Replicate prediction requests.
+    """
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        time.sleep(RESPONSE_DELAY)
+        if self.path == '/v1/chat/completions':
+            self._send({
+                'id': 'chatcmpl-1',
+                'object': 'chat.completion',
+                'created': 0,
+                'model': body['model'],
+                'choices': [{
+                    'index': 0,
+                    'finish_reason': 'stop',
+                    'message': {'role': 'assistant', 'content': 'SCORE: 80\nStrong Python background.'},
+                }],
+                'usage': {
+                    'prompt_tokens': 1200, 'completion_tokens': 10, 'total_tokens': 1210,
+                    'prompt_tokens_details': {'cached_tokens': 1024},
+                },
+            })
+        elif self.path == '/v1/models/meta/meta-llama-3-70b-instruct/predictions':
+            self._send({
+                'id': 'prediction-1',
+                'model': 'meta/meta-llama-3-70b-instruct',
+                'version': 'v1',
+                'status': 'succeeded',
+                'input': body['input'],
+                'output': ['***', 'SCORE', ':', ' ', '72', '***', ' Good fit.'],
+                'logs': None,
+                'error': None,
+                'metrics': None,
+                'created_at': None,
+                'started_at': None,
+                'completed_at': None,
+                'urls': {},
+            }, status=201)
+        else:
+            self._send({'error': 'not found'}, status=404)
+
+    def _send(self, payload, status=200):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubProviderServer(ThreadingHTTPServer):
+    # The default backlog of 5 makes concurrent clients wait for SYN retransmits.
+    request_queue_size = 64
+
+
+def make_submission(submission_id):
+    # As loaded by UserSubmission.objects.for_scoring(), without touching the database.
+    job_posting = JobPosting(id=1, title='Engineer', company='Acme', description='Python developer')
+    job_posting.description_index = JobPostingIndex(**index_fields(job_posting.description))
+    return UserSubmission(id=submission_id, job_posting=job_posting, resume=f'Resume {submission_id}', service='openai')
+
+
+@patch.object(ScoringService, 'get_cache', return_value=None)
+class TestAsyncScoring(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = StubProviderServer(('127.0.0.1', 0), StubProviderHandler)
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+        base_url = f'http://127.0.0.1:{cls.server.server_port}'
+        cls.settings_override = override_settings(
+            OPENAI_API_KEY='test', OPENAI_BASE_URL=f'{base_url}/v1',
+            REPLICATE_API_TOKEN='test', REPLICATE_BASE_URL=base_url)
+        cls.settings_override.enable()
+        # Like the other scoring tests, run without a rate limiter, so that a REDIS_URL
+        # in the environment does not connect them to a real Redis.
+        cls.rate_limiter_patch = patch.object(ScoringService, 'get_rate_limiter', return_value=None)
+        cls.rate_limiter_patch.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.rate_limiter_patch.stop()
+        cls.settings_override.disable()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def test_openai_ascore_submission(self, mock_get_cache):
+        score = asyncio.run(OpenAIScoringService().ascore_submission(make_submission(1)))
+
+        self.assertEqual(score, 80)
+
+    def test_openai_records_cached_tokens(self, mock_get_cache):
+        def tokens():
+            return {kind: REGISTRY.get_sample_value('resume_ai_scoring_tokens_total', {'service': 'openai', 'kind': kind}) or 0
+                    for kind in ('prompt', 'cached', 'completion')}
+        before = tokens()
+
+        asyncio.run(OpenAIScoringService().ascore_submission(make_submission(1)))
+
+        after = tokens()
+        self.assertEqual({kind: after[kind] - before[kind] for kind in after},
+                         {'prompt': 1200, 'cached': 1024, 'completion': 10})
+
+    def test_llama_ascore_submission(self, mock_get_cache):
+        score = asyncio.run(LlamaScoringService().ascore_submission(make_submission(1)))
+
+        self.assertEqual(score, 72)
+
+    def test_ascore_many_runs_calls_concurrently(self, mock_get_cache):
+        service = OpenAIScoringService()
+        submissions = [make_submission(i) for i in range(10)]
+
+        started = time.monotonic()
+        results = asyncio.run(service.ascore_many(submissions, max_concurrency=10))
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(results, {i: 80 for i in range(10)})
+        self.assertLess(elapsed, RESPONSE_DELAY * 5)
+
+    def test_description_index_must_be_loaded(self, mock_get_cache):
+        submission = make_submission(1)
+        submission.job_posting = JobPosting(id=2, title='Engineer', company='Acme', description='Python')
+        with self.assertRaisesMessage(ValueError, "select_related('job_posting__description_index')"):
+            asyncio.run(OpenAIScoringService().ascore_submission(submission))
+
+        # What select_related leaves for a posting without an index.
+        JobPosting.description_index.related.set_cached_value(submission.job_posting, None)
+        with self.assertRaisesMessage(ValueError, 'has no description index'):
+            asyncio.run(OpenAIScoringService().asample_score(submission))
+
+    def test_score_cache_is_used_off_the_event_loop(self, mock_get_cache):
+        threads = []
+
+        class RecordingCache:
+            def get(self, key):
+                threads.append(threading.get_ident())
+
+            def set(self, key, score, job_posting_id=None):
+                threads.append(threading.get_ident())
+
+        mock_get_cache.return_value = RecordingCache()
+
+        async def score():
+            return threading.get_ident(), await OpenAIScoringService().ascore_submission(make_submission(1))
+
+        loop_thread, score = asyncio.run(score())
+
+        self.assertEqual(score, 80)
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(loop_thread, threads)
+
+    def test_async_client_is_rebuilt_for_each_event_loop(self, mock_get_cache):
+        service = OpenAIScoringService()
+
+        async def clients():
+            return service._get_async_client(), service._get_async_client()
+
+        first, same_loop = asyncio.run(clients())
+        second, _ = asyncio.run(clients())
+
+        self.assertIs(first, same_loop)
+        self.assertIsNot(second, first)
+
+if __name__ == '__main__':
+    unittest.main()
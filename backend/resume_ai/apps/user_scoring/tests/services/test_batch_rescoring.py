@@ -0,0 +1,248 @@
+import json
+import threading
+import unittest
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from job_postings.models import JobPosting
+from user_scoring.models import RescoreJob, UserSubmission
+from user_scoring.services.batch_rescoring import batch_rescoring
+from user_scoring.services.batch_rescoring.batch_rescoring import advance_rescore_job
+from user_scoring.services.scoring_service.openai_scoring import OpenAIScoringService
+from user_scoring.services.scoring_service.scoring_service import ScoringService
+from user_scoring.tasks import run_rescore_job
+
+
+class FakeBatchServer(ThreadingHTTPServer):
+    """
+    An in-memory stand-in for the OpenAI Files and Batch APIs.
+
+    Batches report 'in_progress' on their first retrieval and 'completed'
+    afterwards. A resume ending in a number is scored with that number, a
+    resume starting with 'error' fails in the provider and any other resume
+    yields an answer without a score.
+    """
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FakeBatchHandler)
+        self.files = {}
+        self.batches = {}
+        self.retrievals = {}
+
+    def add_file(self, content, purpose):
+        file_id = f'file-{len(self.files) + 1}'
+        self.files[file_id] = content
+        return {
+            'id': file_id, 'object': 'file', 'bytes': len(content), 'created_at': 0,
+            'filename': f'{file_id}.jsonl', 'purpose': purpose, 'status': 'processed',
+        }
+
+    def create_batch(self, request):
+        output, errors = [], []
+        for line in self.files[request['input_file_id']].decode().splitlines():
+            batch_request = json.loads(line)
+            resume = batch_request['body']['messages'][-1]['content'].split('***Resume***: ', 1)[1]
+            result = {'id': f"batch_req_{len(output) + len(errors)}", 'custom_id': batch_request['custom_id']}
+            if resume.startswith('error'):
+                errors.append({**result, 'response': None, 'error': {'code': 'server_error', 'message': 'Internal error'}})
+                continue
+            last_word = resume.split()[-1]
+            content = f'***SCORE: {last_word}***\nFeedback.' if last_word.isdigit() else 'I cannot score this.'
+            output.append({**result, 'error': None, 'response': {'status_code': 200, 'request_id': 'req', 'body': {
+                'id': 'chatcmpl-1', 'object': 'chat.completion', 'created': 0, 'model': batch_request['body']['model'],
+                'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': content}}],
+            }}})
+
+        batch_id = f'batch_{len(self.batches) + 1}'
+        self.batches[batch_id] = {
+            'id': batch_id, 'object': 'batch', 'endpoint': request['endpoint'], 'created_at': 0,
+            'completion_window': request['completion_window'], 'input_file_id': request['input_file_id'],
+            'metadata': request.get('metadata'), 'status': 'in_progress',
+            'output_file_id': self.add_file(''.join(json.dumps(line) + '\n' for line in output).encode(), 'batch_output')['id'],
+            'error_file_id': self.add_file(''.join(json.dumps(line) + '\n' for line in errors).encode(), 'batch_output')['id'] if errors else None,
+        }
+        return self.batches[batch_id]
+
+    def retrieve_batch(self, batch_id):
+        batch = self.batches[batch_id]
+        self.retrievals[batch_id] = self.retrievals.get(batch_id, 0) + 1
+        status = 'in_progress' if self.retrievals[batch_id] == 1 else 'completed'
+        output = {**batch, 'status': status}
+        if status == 'in_progress':
+            output.update(output_file_id=None, error_file_id=None)
+        return output
+
+
+class FakeBatchHandler(BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        if self.path == '/v1/files':
+            message = BytesParser(policy=HTTP).parsebytes(
+                f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body)
+            parts = {part.get_param('name', header='content-disposition'): part.get_payload(decode=True)
+                     for part in message.iter_parts()}
+            self._send(self.server.add_file(parts['file'], parts['purpose'].decode()))
+        elif self.path == '/v1/batches':
+            self._send(self.server.create_batch(json.loads(body)))
+        else:
+            self._send({'error': 'not found'}, status=404)
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path == '/v1/batches':
+            batches = list(self.server.batches.values())
+            self._send({'object': 'list', 'data': batches, 'has_more': False})
+        elif path.startswith('/v1/batches/'):
+            self._send(self.server.retrieve_batch(path.rsplit('/', 1)[1]))
+        elif path.startswith('/v1/files/') and path.endswith('/content'):
+            self._send_bytes(self.server.files[path.split('/')[3]], 'application/octet-stream')
+        else:
+            self._send({'error': 'not found'}, status=404)
+
+    def _send(self, payload, status=200):
+        self._send_bytes(json.dumps(payload).encode(), 'application/json', status)
+
+    def _send_bytes(self, data, content_type, status=200):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@patch.object(ScoringService, 'get_cache', return_value=None)
+class TestBatchRescoring(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeBatchServer()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.settings_override = override_settings(
+            OPENAI_API_KEY='test', OPENAI_BASE_URL=f'http://127.0.0.1:{cls.server.server_port}/v1',
+            RESCORE_POLL_INTERVAL=0)
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.files.clear()
+        self.server.batches.clear()
+        self.server.retrievals.clear()
+        self.job_posting = JobPosting.objects.create(title='Engineer', company='Test', description='Python')
+        self.submissions = [
+            UserSubmission.objects.create(
+                job_posting=self.job_posting, company='Test', first_name='Jane', last_name='Doe',
+                email=f'jane{i}@example.com', phone_number='+15555555555', resume=resume, service='openai', score=50)
+            for i, resume in enumerate(['Python 70', 'Django 85', 'error', 'Nothing relevant'])
+        ]
+        self.llama_submission = UserSubmission.objects.create(
+            job_posting=self.job_posting, company='Test', first_name='Jane', last_name='Doe',
+            email='llama@example.com', phone_number='+15555555555', resume='Python 10', service='llama')
+        self.service = OpenAIScoringService()
+
+    def advance_until_done(self, rescore_job):
+        while advance_rescore_job(rescore_job, self.service) is not None:
+            pass
+
+    def test_scores_are_applied(self, mock_get_cache):
+        rescore_job = RescoreJob.objects.create(service='openai')
+
+        self.assertEqual(advance_rescore_job(rescore_job, self.service), 0)
+        self.assertEqual(rescore_job.status, RescoreJob.STATUS_RUNNING)
+        self.assertEqual(rescore_job.submission_count, 4)
+        self.assertEqual(advance_rescore_job(rescore_job, self.service), 0)
+        self.assertIsNone(advance_rescore_job(rescore_job, self.service))
+
+        rescore_job.refresh_from_db()
+        self.assertEqual(rescore_job.status, RescoreJob.STATUS_COMPLETED)
+        self.assertEqual((rescore_job.cursor, rescore_job.scored_count, rescore_job.failed_count), (4, 2, 2))
+        scores = {s.resume: (s.score, s.last_scoring_error) for s in UserSubmission.objects.all()}
+        self.assertEqual(scores['Python 70'], (70, ''))
+        self.assertEqual(scores['Django 85'], (85, ''))
+        self.assertEqual(scores['error'], (50, 'BatchRequestError: Internal error'))
+        self.assertEqual(scores['Nothing relevant'][0], 50)
+        self.assertTrue(scores['Nothing relevant'][1].startswith('ScoreParseError'))
+        self.assertEqual(scores['Python 10'], (None, ''))
+
+    @override_settings(SCORING_BATCH_SIZE=1)
+    def test_resumes_from_cursor_after_crash(self, mock_get_cache):
+        rescore_job = RescoreJob.objects.create(service='openai', job_posting=self.job_posting)
+        apply_chunk = batch_rescoring._apply_chunk
+        calls = []
+
+        def crash_on_second_chunk(*args):
+            calls.append(args)
+            if len(calls) == 2:
+                raise RuntimeError('Worker lost')
+            apply_chunk(*args)
+
+        with patch.object(batch_rescoring, '_apply_chunk', side_effect=crash_on_second_chunk):
+            with self.assertRaises(RuntimeError):
+                self.advance_until_done(rescore_job)
+
+        rescore_job = RescoreJob.objects.get(pk=rescore_job.pk)
+        self.assertEqual((rescore_job.status, rescore_job.cursor), (RescoreJob.STATUS_APPLYING, 1))
+        # A result that was already applied is not written again.
+        UserSubmission.objects.filter(pk=self.submissions[0].pk).update(score=1)
+
+        self.advance_until_done(rescore_job)
+
+        self.assertEqual(rescore_job.status, RescoreJob.STATUS_COMPLETED)
+        self.assertEqual(rescore_job.cursor, 4)
+        self.assertEqual(UserSubmission.objects.get(pk=self.submissions[0].pk).score, 1)
+        self.assertEqual(UserSubmission.objects.get(pk=self.submissions[1].pk).score, 85)
+
+    def test_batch_is_not_created_twice(self, mock_get_cache):
+        rescore_job = RescoreJob.objects.create(service='openai')
+        advance_rescore_job(rescore_job, self.service)
+        # Simulate a crash between creating the batch and saving its id.
+        RescoreJob.objects.filter(pk=rescore_job.pk).update(status=RescoreJob.STATUS_PREPARING, batch_id='')
+
+        rescore_job = RescoreJob.objects.get(pk=rescore_job.pk)
+        advance_rescore_job(rescore_job, self.service)
+
+        self.assertEqual(len(self.server.batches), 1)
+        self.assertEqual(rescore_job.batch_id, 'batch_1')
+
+    @patch('user_scoring.tasks.run_rescore_job.apply_async')
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_task_reschedules_itself_while_running(self, mock_get_scoring_service, mock_apply_async, mock_get_cache):
+        mock_get_scoring_service.return_value = self.service
+        rescore_job = RescoreJob.objects.create(service='openai')
+
+        self.assertEqual(run_rescore_job(str(rescore_job.id)), RescoreJob.STATUS_RUNNING)
+
+        mock_apply_async.assert_called_once_with((str(rescore_job.id),), countdown=0)
+
+    @patch('user_scoring.management.commands.rescore_submissions.ScoringServiceFactory.get_scoring_service')
+    def test_command_runs_synchronously(self, mock_get_scoring_service, mock_get_cache):
+        mock_get_scoring_service.return_value = self.service
+        out = StringIO()
+
+        call_command('rescore_submissions', '--sync', stdout=out)
+
+        self.assertIn('Scored 2 of 4 submissions, 2 failed.', out.getvalue())
+        self.assertEqual(RescoreJob.objects.get().status, RescoreJob.STATUS_COMPLETED)
+
+    def test_command_rejects_service_without_batch_api(self, mock_get_cache):
+        with self.assertRaises(CommandError):
+            call_command('rescore_submissions', '--service', 'llama')
+
+        self.assertFalse(RescoreJob.objects.exists())
+
+if __name__ == '__main__':
+    unittest.main()
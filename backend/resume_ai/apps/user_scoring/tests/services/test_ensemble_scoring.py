@@ -0,0 +1,139 @@
+import asyncio
+import pickle
+import threading
+import time
+import unittest
+from django.test import SimpleTestCase, TestCase, override_settings
+from job_postings.models import JobPosting
+from user_scoring.models import UserSubmission
+from user_scoring.services.rate_limiter.rate_limiter import RateLimited
+from user_scoring.services.scoring_service.ensemble_scoring import EnsembleScore, EnsembleScoringService
+from user_scoring.services.scoring_service.errors import ScoreParseError
+from user_scoring.services.scoring_service.scoring_service import BaseScoringService, ScoringService
+
+
+class FakeBackend:
+    """
+    A scoring service whose samples are taken from ``scores`` in turn, after ``delay`` seconds.
+
+    A sample that is an exception is raised.
+    """
+
+    def __init__(self, scores, delay=0):
+        self.scores = list(scores)
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _next(self):
+        with self._lock:
+            sample = self.scores[self.calls % len(self.scores)]
+            self.calls += 1
+        return sample
+
+    def sample_score(self, submission):
+        sample = self._next()
+        time.sleep(self.delay)
+        if isinstance(sample, Exception):
+            raise sample
+        return sample
+
+    async def asample_score(self, submission):
+        sample = self._next()
+        await asyncio.sleep(self.delay)
+        if isinstance(sample, Exception):
+            raise sample
+        return sample
+
+    def close(self):
+        pass
+
+
+@override_settings(SCORING_ENSEMBLE_MIN_SAMPLES=2, SCORING_ENSEMBLE_MAX_SAMPLES=5, SCORING_ENSEMBLE_TOLERANCE=10)
+class TestEnsembleScoringService(SimpleTestCase):
+
+    def test_has_no_provider_hooks(self):
+        service = EnsembleScoringService({'llama': FakeBackend([70])})
+
+        self.assertIsInstance(service, BaseScoringService)
+        self.assertNotIsInstance(service, ScoringService)
+        self.assertFalse(hasattr(service, '_run_model'))
+
+    def test_stops_early_when_samples_agree(self):
+        backend = FakeBackend([70, 76])
+        score = EnsembleScoringService({'llama': backend}).score_submission(None)
+
+        self.assertEqual(score, 73)
+        self.assertEqual((score.samples, score.variance), (2, 18))
+        self.assertEqual(backend.calls, 2)
+
+    def test_takes_more_samples_when_they_disagree(self):
+        backend = FakeBackend([40, 80, 60])
+        score = EnsembleScoringService({'llama': backend}).score_submission(None)
+
+        self.assertEqual(score.samples, 5)
+        self.assertEqual(backend.calls, 5)
+        self.assertAlmostEqual(score, (40 + 80 + 60 + 40 + 80) / 5)
+
+    def test_samples_run_in_parallel(self):
+        service = EnsembleScoringService({'llama': FakeBackend([40, 80], delay=0.2)})
+
+        started = time.monotonic()
+        service.score_submission(None)
+
+        # Two rounds (two samples, then three more) of 0.2s each.
+        self.assertLess(time.monotonic() - started, 0.6)
+
+    def test_alternates_between_backends(self):
+        openai, llama = FakeBackend([60]), FakeBackend([64])
+        score = EnsembleScoringService({'openai': openai, 'llama': llama}).score_submission(None)
+
+        self.assertEqual(score, 62)
+        self.assertEqual((openai.calls, llama.calls), (1, 1))
+
+    def test_failed_samples_are_left_out(self):
+        backend = FakeBackend([ScoreParseError('no score'), 70, 72, 74, 76])
+        score = EnsembleScoringService({'llama': backend}).score_submission(None)
+
+        self.assertEqual(score.samples, 4)
+        self.assertEqual(score, 73)
+
+    def test_fails_when_every_sample_fails(self):
+        service = EnsembleScoringService({'llama': FakeBackend([ScoreParseError('no score'), RateLimited('llama', 5)])})
+        with self.assertRaises(RateLimited):
+            service.score_submission(None)
+
+        service = EnsembleScoringService({'llama': FakeBackend([ConnectionError('down')])})
+        with self.assertRaises(ConnectionError):
+            service.score_submission(None)
+
+    def test_async_matches_sync(self):
+        score = asyncio.run(EnsembleScoringService({'llama': FakeBackend([70, 76])}).ascore_submission(None))
+
+        self.assertEqual((score, score.samples, score.variance), (73, 2, 18))
+
+    def test_single_sample_has_no_variance(self):
+        score = EnsembleScore([55])
+
+        self.assertEqual((score, score.samples, score.variance), (55, 1, None))
+        self.assertEqual(pickle.loads(pickle.dumps(score)), 55)
+
+
+class TestSetScore(TestCase):
+
+    def test_stores_mean_variance_and_sample_count(self):
+        job_posting = JobPosting.objects.create(title='Engineer', company='Acme', description='Python')
+        submission = UserSubmission.objects.create(
+            job_posting=job_posting, company='Acme', first_name='Jane', last_name='Doe',
+            email='jane@example.com', phone_number='+15555555555', resume='Python', service='ensemble')
+
+        submission.set_score(EnsembleScore([70, 76]))
+        submission.save()
+        submission.refresh_from_db()
+        self.assertEqual((submission.score, submission.score_variance, submission.score_samples), (73, 18, 2))
+
+        submission.set_score(80)
+        self.assertEqual((submission.score_variance, submission.score_samples), (None, 1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+import httpx
+import openai
+from replicate.exceptions import ReplicateError
+from user_scoring.services.rate_limiter.rate_limiter import RateLimited
+from user_scoring.services.scoring_service.errors import ScoreParseError, is_transient_error
+
+
+def openai_status_error(status_code):
+    request = httpx.Request('POST', 'https://api.openai.com/v1/chat/completions')
+    response = httpx.Response(status_code, request=request)
+    return openai.APIStatusError('error', response=response, body=None)
+
+
+class TestIsTransientError(unittest.TestCase):
+
+    def test_transient_errors(self):
+        request = httpx.Request('POST', 'https://api.openai.com/v1/chat/completions')
+        for exc in [
+            RateLimited('openai', 10),
+            TimeoutError(),
+            openai.APITimeoutError(request=request),
+            openai_status_error(429),
+            openai_status_error(503),
+            ReplicateError(status=500),
+            httpx.ReadTimeout('timed out'),
+        ]:
+            with self.subTest(exc=exc):
+                self.assertTrue(is_transient_error(exc))
+
+    def test_permanent_errors(self):
+        for exc in [
+            ScoreParseError('No score'),
+            openai_status_error(400),
+            openai_status_error(401),
+            ReplicateError(status=422),
+            ValueError('Invalid service type specified.'),
+        ]:
+            with self.subTest(exc=exc):
+                self.assertFalse(is_transient_error(exc))
+
+if __name__ == '__main__':
+    unittest.main()
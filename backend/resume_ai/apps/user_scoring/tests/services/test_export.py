@@ -0,0 +1,117 @@
+import csv
+import io
+import json
+import unittest
+from datetime import timedelta
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from job_postings.models import JobPosting
+from user_scoring.models import UserSubmission
+from user_scoring.serializers import UserSubmissionReadSerializer
+from user_scoring.services.export.export import export_queryset, iter_rows
+
+
+class ExportFixtures:
+
+    def setUp(self):
+        self.job_posting = JobPosting.objects.create(title='Engineer', company='Acme', description='Python')
+        other_posting = JobPosting.objects.create(title='Designer', company='Other', description='Figma')
+        self.submissions = [
+            self.create_submission(self.job_posting, score) for score in (70, None, 90, 55, 80)
+        ] + [self.create_submission(other_posting, 99)]
+        self.old = self.submissions[0]
+        UserSubmission.objects.filter(pk=self.old.pk).update(submitted_at=timezone.now() - timedelta(days=30))
+
+    def create_submission(self, job_posting, score):
+        return UserSubmission.objects.create(
+            job_posting=job_posting, company=job_posting.company, first_name='Jane', last_name='Doe, Jr.',
+            email='jane@example.com', phone_number='+15555555555', resume='Python', service='openai', score=score)
+
+    def scored_ids(self, company=None):
+        return [str(s.id) for s in self.submissions if s.score is not None and company in (None, s.company)]
+
+
+class TestExportRows(ExportFixtures, TestCase):
+
+    def test_rows_in_id_order_in_chunks(self):
+        queryset = export_queryset()
+        with self.assertNumQueries(1):
+            ids = [str(row['id']) for row in iter_rows(queryset, chunk_size=2)]
+
+        self.assertEqual(ids, self.scored_ids())
+
+    def test_keyset_chunks_without_server_side_cursors(self):
+        with patch.dict(connection.settings_dict, {'DISABLE_SERVER_SIDE_CURSORS': True}):
+            with self.assertNumQueries(3):
+                ids = [str(row['id']) for row in iter_rows(export_queryset(), chunk_size=2)]
+
+        self.assertEqual(ids, self.scored_ids())
+
+    def test_filters_and_resume(self):
+        ids = self.scored_ids('Acme')
+
+        self.assertEqual([str(row['id']) for row in iter_rows(export_queryset(company='Acme'))], ids)
+        self.assertEqual([str(row['id']) for row in iter_rows(export_queryset(company='Acme', after=ids[1]))], ids[2:])
+        recent = export_queryset(job_posting_id=self.job_posting.id, submitted_after=timezone.now() - timedelta(days=1))
+        self.assertEqual([str(row['id']) for row in iter_rows(recent)], ids[1:])
+
+
+class TestExportEndpoint(ExportFixtures, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('user-submission-export')
+        self.client.force_authenticate(User.objects.create_user('recruiter', password='secret', is_staff=True))
+
+    def read(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_ndjson_rows_match_read_serializer(self):
+        response = self.client.get(self.url, {'export_format': 'ndjson', 'company': 'Acme'}, HTTP_ACCEPT='application/x-ndjson')
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = self.read(response).splitlines()
+        expected = UserSubmissionReadSerializer(
+            UserSubmission.objects.filter(company='Acme', score__isnull=False).order_by('id'), many=True).data
+        self.assertEqual(lines, [JSONRenderer().render(row).decode('utf-8') for row in expected])
+
+    def test_csv(self):
+        response = self.client.get(self.url, {'after': self.scored_ids()[0]}, HTTP_ACCEPT='text/csv')
+
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+        self.assertEqual([row['id'] for row in rows], self.scored_ids()[1:])
+        self.assertEqual(rows[0]['full_name'], 'Jane Doe, Jr.')
+        self.assertTrue(rows[0]['submitted_at'].endswith('Z'))
+
+    def test_invalid_parameters(self):
+        for params in ({'export_format': 'xml'}, {'after': 'last'}, {'submitted_after': 'yesterday'}, {'job_posting': 'x'}):
+            self.assertEqual(self.client.get(self.url, params).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requires_staff(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(User.objects.create_user('applicant', password='secret'))
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TestExportCommand(ExportFixtures, TestCase):
+
+    def test_ndjson_to_stdout(self):
+        out = io.StringIO()
+        call_command('export_submissions', '--export-format', 'ndjson', '--company', 'Other', stdout=out)
+
+        self.assertEqual([json.loads(line)['id'] for line in out.getvalue().splitlines()], self.scored_ids('Other'))
+
+if __name__ == '__main__':
+    unittest.main()
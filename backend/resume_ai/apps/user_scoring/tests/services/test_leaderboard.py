@@ -0,0 +1,178 @@
+import unittest
+from unittest.mock import patch
+from django.test import TestCase, override_settings
+from job_postings.models import JobPosting
+from user_scoring.models import UserSubmission
+from user_scoring.services.leaderboard.leaderboard import (
+    LocMemLeaderboard, RedisLeaderboard, get_leaderboard, record_scores, reset_leaderboard, top_applicants,
+)
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+
+class TestLocMemLeaderboard(unittest.TestCase):
+
+    def setUp(self):
+        self.leaderboard = LocMemLeaderboard(size=3, ttl=60)
+
+    def test_unbuilt_board_ignores_updates(self):
+        self.leaderboard.record(1, 'a', 50)
+
+        self.assertIsNone(self.leaderboard.top(1, 3))
+
+    def test_new_scores_are_ranked_and_trimmed(self):
+        self.leaderboard.store(1, [('c', 90), ('b', 70), ('a', 70)])
+
+        self.leaderboard.record(1, 'd', 80)
+        self.leaderboard.record(1, 'e', 10)
+
+        self.assertEqual(self.leaderboard.top(1, 3), ['c', 'd', 'b'])
+        self.assertEqual(self.leaderboard.top(1, 1), ['c'])
+
+    def test_lowered_score_drops_the_board(self):
+        self.leaderboard.store(1, [('c', 90), ('b', 70)])
+
+        self.leaderboard.record(1, 'c', 20)
+
+        self.assertIsNone(self.leaderboard.top(1, 3))
+
+
+@unittest.skipUnless(fakeredis, 'fakeredis[lua] is not installed (see requirements-dev.txt)')
+class TestRedisLeaderboard(unittest.TestCase):
+
+    def setUp(self):
+        self.client = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        self.leaderboard = RedisLeaderboard(size=3, ttl=60, url=None, client=self.client)
+
+    def test_store_and_top(self):
+        self.leaderboard.store(1, [('c', 90), ('b', 70), ('a', 70)])
+
+        self.assertEqual(self.leaderboard.top(1, 3), ['c', 'b', 'a'])
+        self.assertEqual(self.leaderboard.top(1, 1), ['c'])
+        self.assertIn(self.client.ttl('leaderboard:1'), range(1, 61))
+
+    def test_store_replaces_the_board(self):
+        self.leaderboard.store(1, [('c', 90), ('b', 70)])
+        self.leaderboard.store(1, [('d', 60)])
+        self.assertEqual(self.leaderboard.top(1, 3), ['d'])
+
+        self.leaderboard.store(1, [])
+        self.assertIsNone(self.leaderboard.top(1, 3))
+
+    def test_unbuilt_board_ignores_updates(self):
+        self.leaderboard.record(1, 'a', 50)
+
+        self.assertIsNone(self.leaderboard.top(1, 3))
+        self.assertFalse(self.client.exists('leaderboard:1'))
+
+    def test_new_scores_are_ranked_and_trimmed(self):
+        self.leaderboard.store(1, [('c', 90), ('b', 70), ('a', 70)])
+
+        self.leaderboard.record(1, 'd', 80)
+        self.leaderboard.record(1, 'e', 10)
+        self.leaderboard.record(1, 'b', 75)
+
+        self.assertEqual(self.leaderboard.top(1, 3), ['c', 'd', 'b'])
+        self.assertEqual(self.client.zcard('leaderboard:1'), 3)
+
+    def test_lowered_or_removed_score_drops_the_board(self):
+        self.leaderboard.store(1, [('c', 90), ('b', 70)])
+        self.leaderboard.record(1, 'c', 20)
+        self.assertIsNone(self.leaderboard.top(1, 3))
+
+        self.leaderboard.store(1, [('c', 90), ('b', 70)])
+        self.leaderboard.record(1, 'b', None)
+        self.assertIsNone(self.leaderboard.top(1, 3))
+
+    def test_boards_are_shared_between_instances(self):
+        other = RedisLeaderboard(size=3, ttl=60, url=None, client=self.client)
+        self.leaderboard.store(1, [('c', 90)])
+
+        other.record(1, 'd', 95)
+
+        self.assertEqual(self.leaderboard.top(1, 3), ['d', 'c'])
+        other.invalidate(1)
+        self.assertIsNone(self.leaderboard.top(1, 3))
+
+
+@override_settings(LEADERBOARD_BACKEND='locmem', LEADERBOARD_SIZE=3, CELERY_TASK_ALWAYS_EAGER=True)
+class TestTopApplicants(TestCase):
+
+    def setUp(self):
+        reset_leaderboard()
+        self.addCleanup(reset_leaderboard)
+        self.job_posting = JobPosting.objects.create(title='Engineer', company='Acme', description='Python')
+        self.submissions = [self.create_submission(score) for score in (70, None, 90, 70, 55)]
+
+    def create_submission(self, score):
+        return UserSubmission.objects.create(
+            job_posting=self.job_posting, company='Acme', first_name='Jane', last_name='Doe',
+            email='jane@example.com', phone_number='+15555555555', resume='Python', service='openai', score=score)
+
+    def expected(self, k):
+        scored = [s for s in self.submissions if s.score is not None]
+        return [s.id for s in sorted(scored, key=lambda s: (-s.score, -s.id.int))][:k]
+
+    def test_board_is_built_then_read(self):
+        self.assertEqual([s.id for s in top_applicants(self.job_posting.id, 2)], self.expected(2))
+
+        with self.assertNumQueries(1):
+            self.assertEqual([s.id for s in top_applicants(self.job_posting.id, 3)], self.expected(3))
+
+    def test_board_follows_new_scores(self):
+        top_applicants(self.job_posting.id, 3)
+        submission = self.create_submission(None)
+        self.submissions.append(submission)
+        UserSubmission.objects.filter(pk=submission.pk).update(score=80)
+        submission.score = 80
+
+        record_scores([submission])
+
+        self.assertEqual(get_leaderboard().top(self.job_posting.id, 3), [str(i) for i in self.expected(3)])
+        self.assertEqual([s.id for s in top_applicants(self.job_posting.id, 3)], self.expected(3))
+
+    def test_deleting_a_listed_submission_drops_the_board(self):
+        top_applicants(self.job_posting.id, 3)
+
+        self.submissions.pop(2).delete()
+
+        self.assertIsNone(get_leaderboard().top(self.job_posting.id, 3))
+        self.assertEqual([s.id for s in top_applicants(self.job_posting.id, 3)], self.expected(3))
+
+    def test_larger_k_reads_the_database(self):
+        self.assertEqual([s.id for s in top_applicants(self.job_posting.id, 10)], self.expected(10))
+        self.assertIsNone(get_leaderboard().top(self.job_posting.id, 3))
+
+    @override_settings(LEADERBOARD_BACKEND='none')
+    def test_without_leaderboard(self):
+        reset_leaderboard()
+
+        with self.assertNumQueries(1):
+            self.assertEqual([s.id for s in top_applicants(self.job_posting.id, 3)], self.expected(3))
+
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=False)
+    def test_locmem_leaderboard_requires_eager_tasks(self):
+        reset_leaderboard()
+
+        with self.assertRaisesRegex(ValueError, "use 'redis'"):
+            get_leaderboard()
+
+    @unittest.skipUnless(fakeredis, 'fakeredis[lua] is not installed (see requirements-dev.txt)')
+    def test_with_redis_leaderboard(self):
+        leaderboard = RedisLeaderboard(size=3, ttl=60, url=None, client=fakeredis.FakeRedis(server=fakeredis.FakeServer()))
+        with patch('user_scoring.services.leaderboard.leaderboard.get_leaderboard', return_value=leaderboard):
+            self.assertEqual([s.id for s in top_applicants(self.job_posting.id, 2)], self.expected(2))
+            submission = self.create_submission(None)
+            self.submissions.append(submission)
+            UserSubmission.objects.filter(pk=submission.pk).update(score=95)
+            submission.score = 95
+            record_scores([submission])
+
+            with self.assertNumQueries(1):
+                self.assertEqual([s.id for s in top_applicants(self.job_posting.id, 3)], self.expected(3))
+
+if __name__ == '__main__':
+    unittest.main()
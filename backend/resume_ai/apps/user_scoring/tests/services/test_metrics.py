@@ -0,0 +1,101 @@
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from django.test import SimpleTestCase
+from prometheus_client import REGISTRY
+from user_scoring.services.metrics.metrics import task_finished, task_started
+from user_scoring.services.scoring_service.errors import ScoreParseError
+from user_scoring.services.scoring_service.scoring_service import ScoringService
+from user_scoring.signals import stamp_enqueued_at
+
+
+class EchoScoringService(ScoringService):
+    service_name = 'metrics-test'
+
+    def __init__(self, cache=None):
+        super().__init__()
+        self.cache = cache
+
+    def get_cache(self):
+        return self.cache
+
+    def get_rate_limiter(self):
+        return None
+
+    def get_cache_key(self, submission):
+        return submission.resume
+
+    def get_score(self, response):
+        return int(response)
+
+    def _create_prompt(self, submission):
+        return submission.resume
+
+    def _run_model(self, prompt):
+        return prompt
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestScoringMetrics(SimpleTestCase):
+
+    def test_stages_are_timed(self):
+        before = {stage: sample('resume_ai_scoring_stage_seconds_count', service='metrics-test', stage=stage)
+                  for stage in ('prompt', 'model', 'parse')}
+
+        EchoScoringService().score_submission(SimpleNamespace(resume='42', job_posting_id=1))
+
+        for stage, count in before.items():
+            self.assertEqual(sample('resume_ai_scoring_stage_seconds_count', service='metrics-test', stage=stage), count + 1)
+
+    def test_cache_lookups_and_parse_failures_are_counted(self):
+        cache = MagicMock()
+        cache.get.side_effect = lambda key: 7 if key == '7' else None
+        service = EchoScoringService(cache)
+        hits = sample('resume_ai_scoring_cache_requests_total', service='metrics-test', result='hit')
+        misses = sample('resume_ai_scoring_cache_requests_total', service='metrics-test', result='miss')
+        failures = sample('resume_ai_scoring_parse_failures_total', service='metrics-test')
+
+        service.score_submission(SimpleNamespace(resume='7', job_posting_id=1))
+        with self.assertRaises(ScoreParseError):
+            service.score_submission(SimpleNamespace(resume='no score', job_posting_id=1))
+
+        self.assertEqual(sample('resume_ai_scoring_cache_requests_total', service='metrics-test', result='hit'), hits + 1)
+        self.assertEqual(sample('resume_ai_scoring_cache_requests_total', service='metrics-test', result='miss'), misses + 1)
+        self.assertEqual(sample('resume_ai_scoring_parse_failures_total', service='metrics-test'), failures + 1)
+
+
+class TestTaskMetrics(SimpleTestCase):
+
+    def test_queue_wait_starts_at_eta(self):
+        headers = {'eta': '2000-01-01T00:00:00+00:00'}
+        stamp_enqueued_at(headers=headers)
+        self.assertAlmostEqual(headers['enqueued_at'], time.time(), delta=5)
+
+        headers = {'eta': '2999-01-01T00:00:00+00:00'}
+        stamp_enqueued_at(headers=headers)
+        self.assertGreater(headers['enqueued_at'], time.time() + 3600)
+
+    def test_queue_wait_and_run_time_are_recorded(self):
+        waits = sample('resume_ai_task_queue_wait_seconds_count', task='metrics.test')
+        wait_sum = sample('resume_ai_task_queue_wait_seconds_sum', task='metrics.test')
+        runs = sample('resume_ai_task_seconds_count', task='metrics.test', state='SUCCESS')
+
+        task_started('task-1', 'metrics.test', enqueued_at=time.time() - 2)
+        task_finished('task-1', 'metrics.test', 'SUCCESS')
+
+        self.assertEqual(sample('resume_ai_task_queue_wait_seconds_count', task='metrics.test'), waits + 1)
+        self.assertGreaterEqual(sample('resume_ai_task_queue_wait_seconds_sum', task='metrics.test') - wait_sum, 2)
+        self.assertEqual(sample('resume_ai_task_seconds_count', task='metrics.test', state='SUCCESS'), runs + 1)
+
+    def test_metrics_endpoint(self):
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'resume_ai_scoring_stage_seconds', response.content)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from django.test import TestCase, override_settings
+from resume_ai.text_processing import term_weights, tokenize
+from user_scoring.services.prescreen.prescreen import prescore, prescore_many
+from user_scoring.tasks import score_deferred_submissions, score_submission, score_submissions_batch
+from user_scoring.models import UserSubmission
+from job_postings.models import JobPosting
+
+DESCRIPTION = 'Senior Python developer. Python, Django and PostgreSQL experience required.'
+MATCHING_RESUME = 'Python developer, 6 years of Django and PostgreSQL; built Python APIs.'
+PARTIAL_RESUME = 'Java developer with some PostgreSQL experience.'
+UNRELATED_RESUME = 'Pastry chef, wedding cakes and bread.'
+
+
+class TestTokenize(unittest.TestCase):
+
+    def test_keeps_technical_terms(self):
+        self.assertEqual(tokenize('Node.js, C++ and C# (5+ years).'), ['node.js', 'c++', 'c#', '5+', 'years'])
+
+
+class TestPrescore(unittest.TestCase):
+
+    def test_ranks_resumes_by_match(self):
+        scores = prescore_many(
+            term_weights(DESCRIPTION), [UNRELATED_RESUME, MATCHING_RESUME, PARTIAL_RESUME])
+
+        self.assertEqual(list(scores.argsort()), [0, 2, 1])
+        self.assertEqual(scores[0], 0)
+        self.assertTrue(all(0 <= score <= 1 for score in scores))
+
+    def test_matches_single_prescore(self):
+        scores = prescore_many(term_weights(DESCRIPTION), [MATCHING_RESUME, PARTIAL_RESUME])
+
+        self.assertAlmostEqual(scores[0], prescore(DESCRIPTION, MATCHING_RESUME))
+        self.assertAlmostEqual(scores[1], prescore(DESCRIPTION, PARTIAL_RESUME))
+
+    def test_repeating_terms_saturates(self):
+        once = prescore(DESCRIPTION, 'Python')
+        often = prescore(DESCRIPTION, 'Python ' * 50)
+
+        self.assertGreater(often, once)
+        self.assertLess(often, prescore(DESCRIPTION, MATCHING_RESUME))
+
+    def test_empty_inputs(self):
+        self.assertEqual(len(prescore_many(term_weights(DESCRIPTION), [])), 0)
+        self.assertEqual(prescore('', MATCHING_RESUME), 0)
+        self.assertEqual(prescore(DESCRIPTION, ''), 0)
+
+
+@override_settings(PRESCREEN_ENABLED=True)
+class TestPrescreenBatch(TestCase):
+
+    def setUp(self):
+        self.job_posting = JobPosting.objects.create(
+            title='Engineer', company='Test', description=DESCRIPTION, prescreen_threshold=0.1)
+        self.matching, self.unrelated = [
+            UserSubmission.objects.create(
+                job_posting=self.job_posting, company='Test', first_name='Jane', last_name='Doe',
+                email=f'jane{i}@example.com', phone_number='+15555555555', resume=resume, service='llama')
+            for i, resume in enumerate([MATCHING_RESUME, UNRELATED_RESUME])
+        ]
+
+    def score(self, mock_get_scoring_service, **kwargs):
+        mock_scoring_service = MagicMock()
+        mock_scoring_service.score_many.side_effect = lambda group: {submission.id: 80 for submission in group}
+        mock_get_scoring_service.return_value = mock_scoring_service
+        result = score_submissions_batch([str(self.matching.id), str(self.unrelated.id)], **kwargs)
+        self.matching.refresh_from_db()
+        self.unrelated.refresh_from_db()
+        return result, mock_scoring_service
+
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_non_matching_submissions_are_deferred(self, mock_get_scoring_service):
+        result, mock_scoring_service = self.score(mock_get_scoring_service)
+
+        self.assertEqual(result['screened'], [str(self.unrelated.id)])
+        self.assertEqual(list(result['scored']), [str(self.matching.id)])
+        self.assertEqual(mock_scoring_service.score_many.call_args.args[0], [self.matching])
+        self.assertGreater(self.matching.prescore, 0.1)
+        self.assertEqual(self.unrelated.prescore, 0)
+        self.assertEqual(self.unrelated.scoring_status, UserSubmission.STATUS_DEFERRED)
+        self.assertIsNone(self.unrelated.score)
+
+    @override_settings(PRESCREEN_ACTION='skip')
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_skip_screens_out(self, mock_get_scoring_service):
+        self.score(mock_get_scoring_service)
+
+        self.assertEqual(self.unrelated.scoring_status, UserSubmission.STATUS_SCREENED_OUT)
+
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_no_threshold_only_stores_prescore(self, mock_get_scoring_service):
+        JobPosting.objects.filter(pk=self.job_posting.pk).update(prescreen_threshold=None)
+
+        result, _ = self.score(mock_get_scoring_service)
+
+        self.assertEqual(result['screened'], [])
+        self.assertEqual(len(result['scored']), 2)
+        self.assertIsNotNone(self.unrelated.prescore)
+
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_prescreen_can_be_bypassed(self, mock_get_scoring_service):
+        result, _ = self.score(mock_get_scoring_service, prescreen=False)
+
+        self.assertEqual(len(result['scored']), 2)
+        self.assertIsNone(self.unrelated.prescore)
+
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_single_task_holds_back_without_calling_model(self, mock_get_scoring_service):
+        self.assertIsNone(score_submission(self.unrelated.id))
+        self.unrelated.refresh_from_db()
+
+        mock_get_scoring_service.assert_not_called()
+        self.assertEqual(self.unrelated.scoring_status, UserSubmission.STATUS_DEFERRED)
+
+    def finish_elsewhere(self, submission):
+        # Another delivery scores ``submission`` while pre-screening runs.
+        def prescore_and_finish(weights, resumes):
+            UserSubmission.objects.filter(pk=submission.pk).update(
+                score=90, scoring_status=UserSubmission.STATUS_SCORED, scoring_attempts=1)
+            return prescore_many(weights, resumes)
+        return patch('user_scoring.tasks.prescore_many', side_effect=prescore_and_finish)
+
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_single_task_does_not_overwrite_a_finished_attempt(self, mock_get_scoring_service):
+        with self.finish_elsewhere(self.unrelated):
+            self.assertIsNone(score_submission(self.unrelated.id))
+
+        self.unrelated.refresh_from_db()
+        mock_get_scoring_service.assert_not_called()
+        self.assertEqual((self.unrelated.scoring_status, self.unrelated.score), (UserSubmission.STATUS_SCORED, 90))
+
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_batch_does_not_overwrite_a_finished_attempt(self, mock_get_scoring_service):
+        with self.finish_elsewhere(self.unrelated):
+            result, mock_scoring_service = self.score(mock_get_scoring_service)
+
+        self.assertEqual(result['screened'], [])
+        self.assertEqual(list(result['scored']), [str(self.matching.id)])
+        self.assertEqual((self.unrelated.scoring_status, self.unrelated.score), (UserSubmission.STATUS_SCORED, 90))
+
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_retries_skip_prescreening(self, mock_get_scoring_service):
+        mock_get_scoring_service.return_value.score_submission.return_value = 80
+
+        self.assertEqual(score_submission.apply(args=(self.unrelated.id,), retries=1).get(), 80)
+
+        self.unrelated.refresh_from_db()
+        self.assertIsNone(self.unrelated.prescore)
+        self.assertEqual(self.unrelated.scoring_status, UserSubmission.STATUS_SCORED)
+
+    @patch('user_scoring.tasks.score_submissions_batch.delay')
+    def test_score_deferred_submissions(self, mock_delay):
+        UserSubmission.objects.filter(pk=self.unrelated.pk).update(scoring_status=UserSubmission.STATUS_DEFERRED)
+
+        score_deferred_submissions(self.job_posting.id)
+
+        mock_delay.assert_called_once_with([str(self.unrelated.id)], prescreen=False)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from django.test import override_settings
+from unittest.mock import MagicMock
+from job_postings.models import JobPostingIndex
+from job_postings.services.description_index.description_index import index_fields
+from user_scoring.services.scoring_service.llama_scoring import LlamaScoringService
+from user_scoring.services.scoring_service.prompt_builder import SYSTEM_PROMPT, build_prompt, prompt_prefix
+
+
+def make_submission(resume, description='Senior Python developer'):
+    submission = MagicMock()
+    submission.job_posting.description_index = JobPostingIndex(**index_fields(description))
+    submission.resume = resume
+    return submission
+
+
+class TestPromptBuilder(unittest.TestCase):
+
+    def test_resume_comes_last(self):
+        prompt = build_prompt('Python developer', 'Jane Doe, Django')
+
+        self.assertTrue(prompt.endswith('***Resume***: Jane Doe, Django'))
+        self.assertLess(prompt.index('SCORE'), prompt.index('Python developer'))
+
+    def test_applicants_share_prefix(self):
+        service = LlamaScoringService()
+        first = service._create_prompt(make_submission('Jane Doe, Django'))
+        second = service._create_prompt(make_submission('John Roe, Flask'))
+        prefix = prompt_prefix('Senior Python developer')
+
+        self.assertTrue(first.startswith(prefix))
+        self.assertTrue(second.startswith(prefix))
+
+    @override_settings(RESUME_TOKEN_BUDGET=20)
+    def test_resume_is_compacted_towards_the_posting(self):
+        resume = 'jane@example.com\n\nHobbies: ' + 'chess ' * 10 + '\n\nSenior Python developer\n\nSenior Python developer'
+
+        prompt = LlamaScoringService()._create_prompt(make_submission(resume))
+
+        self.assertTrue(prompt.endswith('***Resume***: Senior Python developer'))
+
+    def test_llama_template_uses_system_prompt(self):
+        model_input = LlamaScoringService()._model_input('prompt')
+
+        self.assertEqual(model_input['system_prompt'], SYSTEM_PROMPT)
+        self.assertIn('{system_prompt}', model_input['prompt_template'])
+
+    def test_cache_key_depends_on_prompt_version(self):
+        service = LlamaScoringService()
+        submission = make_submission('Jane Doe, Django')
+        key = service.get_cache_key(submission)
+
+        service.prompt_version += 1
+
+        self.assertNotEqual(service.get_cache_key(submission), key)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+from user_scoring.services.rate_limiter.rate_limiter import (
+    LocMemRateLimiter, RateLimited, RedisRateLimiter, estimate_tokens,
+)
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+LIMITS = {'openai': {'requests_per_minute': 2, 'tokens_per_minute': 1200}}
+
+
+@patch('user_scoring.services.rate_limiter.rate_limiter.time.monotonic', return_value=1000.0)
+class TestLocMemRateLimiter(unittest.TestCase):
+
+    def test_requests_per_minute(self, mock_monotonic):
+        limiter = LocMemRateLimiter(LIMITS)
+
+        self.assertEqual(limiter.acquire('openai', 10), 0)
+        self.assertEqual(limiter.acquire('openai', 10), 0)
+        self.assertAlmostEqual(limiter.acquire('openai', 10), 30.0)
+
+        mock_monotonic.return_value = 1030.0
+        self.assertEqual(limiter.acquire('openai', 10), 0)
+
+    def test_tokens_per_minute(self, mock_monotonic):
+        limiter = LocMemRateLimiter(LIMITS)
+
+        self.assertEqual(limiter.acquire('openai', 1000), 0)
+        # 800 more tokens are needed; the bucket refills 20 tokens per second.
+        self.assertAlmostEqual(limiter.acquire('openai', 1000), 40.0)
+
+    def test_rejected_request_does_not_consume_quota(self, mock_monotonic):
+        limiter = LocMemRateLimiter(LIMITS)
+        limiter.acquire('openai', 1000)
+
+        limiter.acquire('openai', 1000)
+
+        self.assertEqual(limiter.acquire('openai', 200), 0)
+
+    def test_unconfigured_provider_is_unlimited(self, mock_monotonic):
+        limiter = LocMemRateLimiter(LIMITS)
+
+        for _ in range(10):
+            self.assertEqual(limiter.acquire('llama', 10000), 0)
+
+    def test_wait_raises_when_delay_exceeds_max_wait(self, mock_monotonic):
+        limiter = LocMemRateLimiter(LIMITS)
+        limiter.acquire('openai', 1200)
+
+        with self.assertRaises(RateLimited) as context:
+            limiter.wait('openai', 1200, max_wait=10)
+
+        self.assertAlmostEqual(context.exception.retry_after, 60.0)
+
+    @patch('user_scoring.services.rate_limiter.rate_limiter.time.sleep')
+    def test_wait_sleeps_for_short_delays(self, mock_sleep, mock_monotonic):
+        limiter = LocMemRateLimiter(LIMITS)
+        limiter.acquire('openai', 1200)
+
+        def advance(seconds):
+            mock_monotonic.return_value += seconds
+        mock_sleep.side_effect = advance
+
+        limiter.wait('openai', 100, max_wait=10)
+
+        mock_sleep.assert_called_once()
+        self.assertAlmostEqual(mock_sleep.call_args[0][0], 5.0)
+
+    def test_async_wait_acquires_off_the_event_loop(self, mock_monotonic):
+        limiter = LocMemRateLimiter(LIMITS)
+        threads = []
+        acquire = limiter.acquire
+
+        def record(*args):
+            threads.append(threading.get_ident())
+            return acquire(*args)
+
+        async def wait():
+            await limiter.async_wait('openai', 100, max_wait=10)
+            return threading.get_ident()
+
+        with patch.object(limiter, 'acquire', side_effect=record):
+            loop_thread = asyncio.run(wait())
+
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], loop_thread)
+        limiter.acquire('openai', 1100)
+        with self.assertRaises(RateLimited):
+            asyncio.run(limiter.async_wait('openai', 100, max_wait=10))
+
+
+@unittest.skipUnless(fakeredis, 'fakeredis[lua] is not installed (see requirements-dev.txt)')
+class TestRedisRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.client = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        self.limiter = RedisRateLimiter(LIMITS, url=None, client=self.client)
+
+    def rewind(self, seconds):
+        # Move the bucket's last update back, as if ``seconds`` had passed on the Redis clock.
+        updated_at = float(self.client.hget('rate_limit:openai', 'updated_at'))
+        self.client.hset('rate_limit:openai', 'updated_at', updated_at - seconds)
+
+    def test_requests_per_minute(self):
+        self.assertEqual(self.limiter.acquire('openai', 10), 0)
+        self.assertEqual(self.limiter.acquire('openai', 10), 0)
+        self.assertAlmostEqual(self.limiter.acquire('openai', 10), 30.0, delta=0.5)
+
+        self.rewind(30)
+        self.assertEqual(self.limiter.acquire('openai', 10), 0)
+
+    def test_tokens_per_minute(self):
+        self.assertEqual(self.limiter.acquire('openai', 1000), 0)
+        self.assertAlmostEqual(self.limiter.acquire('openai', 1000), 40.0, delta=0.5)
+
+    def test_rejected_request_does_not_consume_quota(self):
+        self.limiter.acquire('openai', 1000)
+
+        self.limiter.acquire('openai', 1000)
+
+        self.assertEqual(self.limiter.acquire('openai', 200), 0)
+
+    def test_quota_is_shared_between_limiters(self):
+        other = RedisRateLimiter(LIMITS, url=None, client=self.client)
+        self.limiter.acquire('openai', 1200)
+
+        with self.assertRaises(RateLimited):
+            other.wait('openai', 1200, max_wait=10)
+        self.assertEqual(other.acquire('llama', 10000), 0)
+
+    def test_bucket_expires(self):
+        self.limiter.acquire('openai', 10)
+
+        self.assertGreater(self.client.ttl('rate_limit:openai'), 0)
+
+
+class TestEstimateTokens(unittest.TestCase):
+
+    def test_includes_completion_budget(self):
+        self.assertEqual(estimate_tokens('x' * 400, max_tokens=512), 613)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from django.test import SimpleTestCase, override_settings
+from user_scoring.services.resume_extraction.resume_extraction import (
+    ResumeExtractionError, extract_resume_text, extract_text, get_extraction_pool, reset_extraction_pool,
+)
+
+DOCUMENT = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>{}</w:body></w:document>'
+)
+
+def write_docx(path, paragraphs):
+    body = ''.join(
+        f'<w:p><w:r><w:t>{first}</w:t></w:r><w:r><w:tab/><w:t xml:space="preserve">{rest}</w:t></w:r></w:p>'
+        for first, rest in (paragraph.split(' ', 1) for paragraph in paragraphs)
+    )
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('word/document.xml', DOCUMENT.format(body))
+
+def write_pdf(path, pages):
+    """
+    Write a minimal PDF with one line of Helvetica text per page.
+    """
+    objects = ['<< /Type /Catalog /Pages 2 0 R >>', None, '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    kids = []
+    for text in pages:
+        content = f'BT /F1 12 Tf 72 720 Td ({text}) Tj ET'.encode('latin-1')
+        objects.append(f'<< /Length {len(content)} >>\nstream\n{content.decode("latin-1")}\nendstream')
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {len(objects)} 0 R '
+                       f'/Resources << /Font << /F1 3 0 R >> >> >>')
+        kids.append(f'{len(objects)} 0 R')
+    objects[1] = f'<< /Type /Pages /Kids [{" ".join(kids)}] /Count {len(kids)} >>'
+
+    output = b'%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f'{number} 0 obj\n{body}\nendobj\n'.encode('latin-1')
+    xref = len(output)
+    output += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode('latin-1')
+    output += ''.join(f'{offset:010d} 00000 n \n' for offset in offsets).encode('latin-1')
+    output += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode('latin-1')
+    with open(path, 'wb') as file:
+        file.write(output)
+
+
+class TestExtractText(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_plain_text_is_normalized(self):
+        with open(self.path('resume.txt'), 'wb') as file:
+            file.write('Senior   Python developer\r\n\n\n\nDjango'.encode('utf-8'))
+
+        self.assertEqual(extract_text(self.path('resume.txt'), 1000, 10), 'Senior Python developer\n\nDjango')
+
+    def test_docx_paragraphs(self):
+        write_docx(self.path('resume.docx'), ['Senior Python developer', 'Django and Celery'])
+
+        self.assertEqual(extract_text(self.path('resume.docx'), 1000, 10), 'Senior Python developer\nDjango and Celery')
+
+    def test_pdf_pages_up_to_the_page_limit(self):
+        write_pdf(self.path('resume.pdf'), ['Senior Python developer', 'Django and Celery', 'Hobbies'])
+
+        text = extract_text(self.path('resume.pdf'), 1000, 2)
+
+        self.assertIn('Senior Python developer', text)
+        self.assertIn('Django and Celery', text)
+        self.assertNotIn('Hobbies', text)
+
+    def test_reading_stops_at_the_length_limit(self):
+        write_docx(self.path('resume.docx'), [f'Paragraph {i} ' + 'word ' * 50 for i in range(1000)])
+
+        text = extract_text(self.path('resume.docx'), 500, 10)
+
+        self.assertLessEqual(len(text), 500)
+        self.assertTrue(text.startswith('Paragraph 0 word'))
+
+    def test_unreadable_files(self):
+        with open(self.path('resume.docx'), 'wb') as file:
+            file.write(b'not a zip file')
+        with open(self.path('blank.txt'), 'wb') as file:
+            file.write(b'  \n ')
+
+        for name in ('resume.docx', 'blank.txt', 'resume.odt'):
+            with self.assertRaises(ResumeExtractionError):
+                extract_text(self.path(name), 1000, 10)
+
+
+@override_settings(RESUME_EXTRACTION_PROCESSES=1, RESUME_MAX_LENGTH=1000)
+class TestExtractionPool(SimpleTestCase):
+
+    def setUp(self):
+        reset_extraction_pool()
+        self.addCleanup(reset_extraction_pool)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_extracts_in_pool_process(self):
+        path = os.path.join(self.directory, 'resume.docx')
+        write_docx(path, ['Senior Python developer'])
+
+        self.assertEqual(extract_resume_text(path), 'Senior Python developer')
+        with self.assertRaises(ResumeExtractionError):
+            extract_resume_text(os.path.join(self.directory, 'missing.txt'))
+
+    def test_pool_is_built_from_settings(self):
+        pool = get_extraction_pool()
+
+        self.assertIsInstance(pool, ProcessPoolExecutor)
+        self.assertIs(get_extraction_pool(), pool)
+        self.assertEqual(pool.submit(os.getcwd).result(), os.getcwd())
+
+    @override_settings(RESUME_EXTRACTION_TASKS_PER_PROCESS=2)
+    def test_pool_is_replaced_after_its_tasks(self):
+        path = os.path.join(self.directory, 'resume.txt')
+        with open(path, 'w') as file:
+            file.write('Senior Python developer')
+
+        pool = get_extraction_pool()
+        self.assertEqual(extract_resume_text(path), 'Senior Python developer')
+        self.assertIs(get_extraction_pool(), pool)
+        self.assertEqual(extract_resume_text(path), 'Senior Python developer')
+
+        self.assertIsNot(get_extraction_pool(), pool)
+        self.assertEqual(extract_resume_text(path), 'Senior Python developer')
+
+    @override_settings(RESUME_EXTRACTION_PROCESSES=0)
+    def test_without_pool(self):
+        reset_extraction_pool()
+
+        self.assertIsNone(get_extraction_pool())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import patch
+from django.test import SimpleTestCase, override_settings
+from user_scoring.services.rate_limiter.rate_limiter import RateLimited
+from user_scoring.services.scoring_service import routing_scoring
+from user_scoring.services.scoring_service.errors import ScoreParseError, is_transient_error
+from user_scoring.services.scoring_service.routing_scoring import BackendHealth, BackendsUnavailable, RoutingScoringService
+from user_scoring.services.scoring_service.scoring_service import BaseScoringService, ScoringService
+from user_scoring.services.scoring_service.scoring_service_factory import ScoringServiceFactory
+
+
+class FakeBackend:
+    """
+    A scoring service that answers with ``score`` after ``delay`` seconds, or raises ``error``.
+    """
+
+    def __init__(self, score=50, delay=0, error=None):
+        self.score = score
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def score_submission(self, submission):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.score
+
+    def score_submission_streaming(self, submission, on_score=None, cutoff=None):
+        score = self.score_submission(submission)
+        if on_score is not None:
+            on_score(score)
+        return score, ''
+
+    async def ascore_submission(self, submission):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.score
+
+    def close(self):
+        pass
+
+
+@override_settings(
+    SCORING_ROUTING_WINDOW=50, SCORING_ROUTING_FAILURE_THRESHOLD=2, SCORING_ROUTING_COOLDOWN=30,
+    SCORING_ROUTING_MAX_ERROR_RATE=0.5, SCORING_ROUTING_HEDGE=False)
+class TestRoutingScoringService(SimpleTestCase):
+
+    def warm_up(self, service, name, latency, count=routing_scoring.MIN_LATENCY_SAMPLES):
+        for _ in range(count):
+            service.health[name].record(latency, ok=True)
+
+    def test_has_no_provider_hooks(self):
+        service = RoutingScoringService({'openai': FakeBackend(score=10)})
+
+        self.assertIsInstance(service, BaseScoringService)
+        self.assertNotIsInstance(service, ScoringService)
+        self.assertFalse(hasattr(service, '_run_model'))
+
+    def test_routes_to_lowest_p95_latency(self):
+        service = RoutingScoringService({'openai': FakeBackend(score=10), 'llama': FakeBackend(score=20)})
+        self.warm_up(service, 'openai', 2.0)
+        self.warm_up(service, 'llama', 0.5)
+
+        self.assertEqual(service.rank_backends(), ['llama', 'openai'])
+        self.assertEqual(service.score_submission(None), 20)
+
+    def test_fails_over_to_next_backend(self):
+        backends = {'openai': FakeBackend(error=ConnectionError('down')), 'llama': FakeBackend(score=20)}
+        service = RoutingScoringService(backends)
+
+        self.assertEqual(service.score_submission(None), 20)
+        self.assertEqual(service.health['openai'].error_rate(), 1.0)
+
+    @override_settings(SCORING_ROUTING_MAX_ERROR_RATE=1.0)
+    def test_circuit_opens_and_half_opens_after_cooldown(self):
+        backends = {'openai': FakeBackend(error=ConnectionError('down')), 'llama': FakeBackend(score=20)}
+        service = RoutingScoringService(backends)
+        service.score_submission(None)
+        service.score_submission(None)
+
+        service.score_submission(None)
+        self.assertEqual(backends['openai'].calls, 2)
+        self.assertEqual(service.rank_backends(), ['llama'])
+
+        backends['openai'].error = None
+        with patch.object(routing_scoring.time, 'monotonic', return_value=time.monotonic() + 31):
+            self.assertTrue(service.health['openai'].allow_request())
+            # Only one trial request is let through while the circuit is half-open.
+            self.assertFalse(service.health['openai'].allow_request())
+            service.health['openai'].record(0.1, ok=True)
+        self.assertIn('openai', service.rank_backends())
+
+    def test_all_backends_down_raises_transient_error(self):
+        service = RoutingScoringService({'openai': FakeBackend(error=ConnectionError('down'))})
+
+        with self.assertRaises(BackendsUnavailable) as context:
+            service.score_submission(None)
+        self.assertTrue(is_transient_error(context.exception))
+
+    def test_parse_error_is_not_failed_over(self):
+        backends = {'openai': FakeBackend(error=ScoreParseError('no score')), 'llama': FakeBackend(score=20)}
+        service = RoutingScoringService(backends)
+
+        with self.assertRaises(ScoreParseError):
+            service.score_submission(None)
+        self.assertEqual(backends['llama'].calls, 0)
+        self.assertEqual(service.health['openai'].error_rate(), 0.0)
+
+    def test_rate_limited_backend_is_skipped_without_penalty(self):
+        backends = {'openai': FakeBackend(error=RateLimited('openai', 5)), 'llama': FakeBackend(score=20)}
+        service = RoutingScoringService(backends)
+
+        self.assertEqual(service.score_submission(None), 20)
+        self.assertEqual(service.health['openai'].error_rate(), 0.0)
+
+    def test_streaming_fails_over(self):
+        backends = {'openai': FakeBackend(error=ConnectionError('down')), 'llama': FakeBackend(score=20)}
+        service = RoutingScoringService(backends)
+        scores = []
+
+        self.assertEqual(service.score_submission_streaming(None, on_score=scores.append), (20, ''))
+        self.assertEqual(scores, [20])
+
+    def test_async_fails_over(self):
+        backends = {'openai': FakeBackend(error=ConnectionError('down')), 'llama': FakeBackend(score=20)}
+        service = RoutingScoringService(backends)
+
+        self.assertEqual(asyncio.run(service.ascore_submission(None)), 20)
+
+    @override_settings(SCORING_ROUTING_HEDGE=True)
+    def test_hedged_request_wins_over_slow_primary(self):
+        backends = {'openai': FakeBackend(score=10, delay=0.5), 'llama': FakeBackend(score=20)}
+        service = RoutingScoringService(backends)
+        self.warm_up(service, 'openai', 0.01)
+        self.warm_up(service, 'llama', 0.02)
+
+        self.assertEqual(service.score_submission(None), 20)
+        self.assertEqual(asyncio.run(service.ascore_submission(None)), 20)
+        self.assertEqual(backends['llama'].calls, 2)
+
+    def test_factory_registers_auto(self):
+        with patch.object(ScoringServiceFactory, '_instances', {}):
+            self.assertIsInstance(ScoringServiceFactory.get_scoring_service('auto'), RoutingScoringService)
+
+
+class TestBackendHealth(SimpleTestCase):
+
+    def test_latency_needs_enough_samples(self):
+        health = BackendHealth(window=100, failure_threshold=5, cooldown=30)
+        for latency in range(routing_scoring.MIN_LATENCY_SAMPLES - 1):
+            health.record(latency, ok=True)
+        self.assertIsNone(health.latency(0.95))
+
+        health.record(100, ok=True)
+        self.assertEqual(health.latency(0.95), 100)
+        self.assertEqual(health.latency(0.5), 10)
+
+    def test_window_is_bounded(self):
+        health = BackendHealth(window=4, failure_threshold=5, cooldown=30)
+        for ok in (False, False, True, True, True, True):
+            health.record(1, ok=ok)
+
+        self.assertEqual(health.error_rate(), 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
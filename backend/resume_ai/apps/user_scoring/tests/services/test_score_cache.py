@@ -0,0 +1,171 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from django.test import TestCase
+from job_postings.models import JobPosting, JobPostingIndex
+from job_postings.services.description_index.description_index import index_fields
+from user_scoring.services.score_cache.score_cache import LocMemScoreCache, RedisScoreCache
+from user_scoring.services.scoring_service.scoring_service import ScoringService
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+
+class FakeScoringService(ScoringService):
+    service_name = 'fake'
+    model_name = 'fake-model'
+    sampling_params = {'temperature': 0.6}
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.calls = 0
+
+    def get_cache(self):
+        return self.cache
+
+    def get_score(self, response):
+        return response
+
+    def _create_prompt(self, submission):
+        return submission.resume
+
+    def _run_model(self, prompt):
+        self.calls += 1
+        return 85
+
+
+def make_submission(description='Python developer', resume='Python, Django', job_posting_id=1):
+    submission = MagicMock()
+    submission.job_posting.description_index = JobPostingIndex(**index_fields(description))
+    submission.job_posting_id = job_posting_id
+    submission.resume = resume
+    return submission
+
+
+class TestLocMemScoreCache(unittest.TestCase):
+
+    def test_get_and_set(self):
+        cache = LocMemScoreCache(ttl=60, max_entries=10)
+
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', 90, job_posting_id=1)
+
+        self.assertEqual(cache.get('a'), 90.0)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1})
+
+    @patch('user_scoring.services.score_cache.score_cache.time.monotonic')
+    def test_expired_entries_are_misses(self, mock_monotonic):
+        cache = LocMemScoreCache(ttl=60, max_entries=10)
+        mock_monotonic.return_value = 1000
+        cache.set('a', 90, job_posting_id=1)
+
+        mock_monotonic.return_value = 1061
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LocMemScoreCache(ttl=60, max_entries=2)
+        cache.set('a', 1, job_posting_id=1)
+        cache.set('b', 2, job_posting_id=1)
+        cache.get('a')
+
+        cache.set('c', 3, job_posting_id=1)
+
+        self.assertEqual(cache.get('a'), 1.0)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3.0)
+
+    def test_invalidate_job_posting(self):
+        cache = LocMemScoreCache(ttl=60, max_entries=10)
+        cache.set('a', 1, job_posting_id=1)
+        cache.set('b', 2, job_posting_id=2)
+
+        cache.invalidate_job_posting(1)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('b'), 2.0)
+
+
+@unittest.skipUnless(fakeredis, 'fakeredis is not installed (see requirements-dev.txt)')
+class TestRedisScoreCache(unittest.TestCase):
+
+    def setUp(self):
+        self.client = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        self.cache = RedisScoreCache(ttl=60, url=None, client=self.client)
+
+    def test_get_and_set(self):
+        self.assertIsNone(self.cache.get('a'))
+        self.cache.set('a', 90, job_posting_id=1)
+
+        self.assertEqual(self.cache.get('a'), 90.0)
+        self.assertEqual(self.cache.stats(), {'hits': 1, 'misses': 1})
+        self.assertIn(self.client.ttl('score_cache:entry:a'), range(1, 61))
+
+    def test_entries_are_shared_between_instances(self):
+        self.cache.set('a', 90, job_posting_id=1)
+
+        self.assertEqual(RedisScoreCache(ttl=60, url=None, client=self.client).get('a'), 90.0)
+
+    def test_invalidate_job_posting(self):
+        self.cache.set('a', 90, job_posting_id=1)
+        self.cache.set('b', 80, job_posting_id=2)
+
+        self.cache.invalidate_job_posting(1)
+
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.get('b'), 80.0)
+        self.assertFalse(self.client.exists('score_cache:job_posting:1'))
+
+    def test_clear(self):
+        self.cache.set('a', 90, job_posting_id=1)
+        self.client.set('unrelated', 1)
+
+        self.cache.clear()
+
+        self.assertIsNone(self.cache.get('a'))
+        self.assertTrue(self.client.exists('unrelated'))
+
+
+class TestScoringServiceCache(unittest.TestCase):
+
+    def test_repeat_submission_is_served_from_cache(self):
+        service = FakeScoringService(LocMemScoreCache(ttl=60, max_entries=10))
+
+        self.assertEqual(service.score_submission(make_submission()), 85)
+        self.assertEqual(service.score_submission(make_submission()), 85)
+
+        self.assertEqual(service.calls, 1)
+
+    def test_different_resume_misses_cache(self):
+        service = FakeScoringService(LocMemScoreCache(ttl=60, max_entries=10))
+
+        service.score_submission(make_submission(resume='Python'))
+        service.score_submission(make_submission(resume='Java'))
+
+        self.assertEqual(service.calls, 2)
+
+    def test_cache_key_depends_on_sampling_params(self):
+        service = FakeScoringService(None)
+        key = service.get_cache_key(make_submission())
+
+        service.sampling_params = {'temperature': 0.2}
+
+        self.assertNotEqual(service.get_cache_key(make_submission()), key)
+
+
+class TestScoreCacheInvalidationSignal(TestCase):
+
+    @patch('user_scoring.signals.get_score_cache')
+    def test_updating_job_posting_invalidates_scores(self, mock_get_score_cache):
+        job_posting = JobPosting.objects.create(title='Engineer', company='Test', description='Python')
+        mock_get_score_cache.return_value.invalidate_job_posting.assert_not_called()
+
+        job_posting.description = 'Python and Django'
+        job_posting.save()
+
+        mock_get_score_cache.return_value.invalidate_job_posting.assert_called_once_with(job_posting.id)
+
+if __name__ == '__main__':
+    unittest.main()
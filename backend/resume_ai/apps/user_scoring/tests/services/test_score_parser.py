@@ -0,0 +1,84 @@
+import json
+import random
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+from user_scoring.services.scoring_service.errors import ScoreParseError
+from user_scoring.services.scoring_service.llama_scoring import LlamaScoringService
+from user_scoring.services.scoring_service.openai_scoring import OpenAIScoringService
+from user_scoring.services.scoring_service.score_parser import ParsedScore, parse_score
+
+CORPUS = json.loads((Path(__file__).parent / 'fixtures' / 'score_outputs.json').read_text())
+
+
+def chunkings(text, seed):
+    """
+    Yield the same text split in several ways, including one character per chunk.
+    """
+    yield [text]
+    yield list(text)
+    rng = random.Random(seed)
+    for _ in range(20):
+        chunks = []
+        position = 0
+        while position < len(text):
+            size = rng.randint(1, 8)
+            chunks.append(text[position:position + size])
+            position += size
+        # Streams may contain empty chunks too.
+        chunks.insert(rng.randint(0, len(chunks)), '')
+        yield chunks
+
+
+def parse_or_error(output):
+    try:
+        return parse_score(output)
+    except ScoreParseError as e:
+        return type(e)
+
+
+class TestParseScore(unittest.TestCase):
+
+    def test_corpus(self):
+        for seed, case in enumerate(CORPUS):
+            output = case['output']
+            with self.subTest(output=output):
+                result = parse_or_error(output)
+                if case['score'] is None or case['score'] == 'error':
+                    self.assertIs(result, ScoreParseError)
+                else:
+                    self.assertEqual(result.score, case['score'])
+                    self.assertEqual(result.feedback(output), case['feedback'])
+
+                for chunks in chunkings(output, seed):
+                    self.assertEqual(parse_or_error(iter(chunks)), result, chunks)
+
+    def test_returns_typed_result(self):
+        output = '***SCORE: 64***\nGood fit.'
+
+        self.assertEqual(parse_score(output), ParsedScore(64, 16, 25))
+
+    def test_none_output(self):
+        with self.assertRaises(ScoreParseError):
+            parse_score(None)
+
+
+class TestServiceGetScore(unittest.TestCase):
+
+    def test_openai_get_score_accepts_prompt_format(self):
+        response = MagicMock()
+        response.choices[0].message.content = 'Here is my evaluation.\n***SCORE: 81***\nStrong match.'
+
+        self.assertEqual(OpenAIScoringService.get_score(None, response), 81)
+
+    def test_llama_get_score_does_not_depend_on_token_boundaries(self):
+        tokens = ['***', 'SC', 'ORE', ':', ' 8', '2', '***', '\n\n', 'The', ' candidate']
+
+        self.assertEqual(LlamaScoringService().get_score(tokens), 82)
+
+    def test_llama_get_score_without_score(self):
+        with self.assertRaises(ScoreParseError):
+            LlamaScoringService().get_score(['No', ' score'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from user_scoring.services.scoring_service.scoring_service import ScoringService
+
+
+class SlowScoringService(ScoringService):
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def get_cache(self):
+        return None
+
+    def get_score(self, response):
+        if response == 'boom':
+            raise ValueError('Unparsable output')
+        return len(response)
+
+    def _create_prompt(self, submission):
+        return submission.resume
+
+    def _run_model(self, prompt):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.05)
+        with self.lock:
+            self.in_flight -= 1
+        return prompt
+
+
+def make_submission(submission_id, resume):
+    submission = MagicMock()
+    submission.id = submission_id
+    submission.resume = resume
+    return submission
+
+
+class TestScoreMany(unittest.TestCase):
+
+    def test_calls_run_concurrently_up_to_limit(self):
+        service = SlowScoringService()
+        submissions = [make_submission(i, 'x' * i) for i in range(1, 9)]
+
+        results = service.score_many(submissions, max_concurrency=4)
+
+        self.assertEqual(results, {i: i for i in range(1, 9)})
+        self.assertEqual(service.max_in_flight, 4)
+
+    def test_errors_are_returned_per_submission(self):
+        service = SlowScoringService()
+
+        results = service.score_many([make_submission(1, 'ok'), make_submission(2, 'boom')], max_concurrency=2)
+
+        self.assertEqual(results[1], 2)
+        self.assertIsInstance(results[2], ValueError)
+
+    def test_empty_batch(self):
+        self.assertEqual(SlowScoringService().score_many([]), {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import threading
+import unittest
+from celery.signals import worker_process_init
+from django.test import SimpleTestCase, override_settings
+from user_scoring.services.scoring_service.llama_scoring import LlamaScoringService
+from user_scoring.services.scoring_service.openai_scoring import OpenAIScoringService
+from user_scoring.services.scoring_service.scoring_service_factory import ScoringServiceFactory
+
+
+@override_settings(OPENAI_API_KEY='test')
+class TestScoringServiceFactory(SimpleTestCase):
+
+    def setUp(self):
+        ScoringServiceFactory.reset()
+        self.addCleanup(ScoringServiceFactory.reset)
+
+    def test_instances_are_reused(self):
+        service = ScoringServiceFactory.get_scoring_service('openai')
+
+        self.assertIsInstance(service, OpenAIScoringService)
+        self.assertIs(ScoringServiceFactory.get_scoring_service('openai'), service)
+        self.assertIsInstance(ScoringServiceFactory.get_scoring_service('llama'), LlamaScoringService)
+
+    def test_concurrent_first_use_creates_one_instance(self):
+        barrier = threading.Barrier(8)
+        services = []
+
+        def get_service():
+            barrier.wait()
+            services.append(ScoringServiceFactory.get_scoring_service('llama'))
+
+        threads = [threading.Thread(target=get_service) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len({id(service) for service in services}), 1)
+
+    def test_invalid_service(self):
+        with self.assertRaises(ValueError):
+            ScoringServiceFactory.get_scoring_service('invalid')
+
+    @override_settings(SCORING_HTTP_MAX_CONNECTIONS=7, SCORING_HTTP_MAX_KEEPALIVE_CONNECTIONS=5)
+    def test_client_uses_configured_pool(self):
+        pool = ScoringServiceFactory.get_scoring_service('openai').client._client._transport._pool
+
+        self.assertEqual(pool._max_connections, 7)
+        self.assertEqual(pool._max_keepalive_connections, 5)
+
+    def test_reset_closes_clients(self):
+        service = ScoringServiceFactory.get_scoring_service('openai')
+
+        ScoringServiceFactory.reset()
+
+        self.assertTrue(service.client.is_closed())
+        self.assertIsNot(ScoringServiceFactory.get_scoring_service('openai'), service)
+
+    def test_worker_process_init_drops_inherited_clients(self):
+        service = ScoringServiceFactory.get_scoring_service('openai')
+
+        worker_process_init.send(sender=None)
+
+        self.assertFalse(service.client.is_closed())
+        self.assertIsNot(ScoringServiceFactory.get_scoring_service('openai'), service)
+
+if __name__ == '__main__':
+    unittest.main()
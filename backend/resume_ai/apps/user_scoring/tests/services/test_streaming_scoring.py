@@ -0,0 +1,107 @@
+import unittest
+from unittest.mock import MagicMock
+from user_scoring.services.scoring_service.errors import ScoreParseError
+from user_scoring.services.scoring_service.score_parser import StreamingScoreParser
+from user_scoring.services.scoring_service.scoring_service import ScoringService
+
+
+class StreamingScoringService(ScoringService):
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.consumed = []
+        self.closed = False
+
+    def get_cache(self):
+        return None
+
+    def get_rate_limiter(self):
+        return None
+
+    def get_score(self, response):
+        raise NotImplementedError
+
+    def _create_prompt(self, submission):
+        return submission.resume
+
+    def _run_model(self, prompt):
+        raise NotImplementedError
+
+    def _stream_model(self, prompt):
+        try:
+            for chunk in self.chunks:
+                self.consumed.append(chunk)
+                yield chunk
+        finally:
+            self.closed = True
+
+
+class TestStreamingScoreParser(unittest.TestCase):
+
+    def feed_all(self, chunks):
+        parser = StreamingScoreParser()
+        for chunk in chunks:
+            parser.feed(chunk)
+        parser.finish()
+        return parser
+
+    def test_marker_split_across_chunks(self):
+        parser = self.feed_all(['***SC', 'ORE', ':', ' ', '7', '2', '***', ' Good fit.'])
+
+        self.assertEqual(parser.score, 72)
+        self.assertEqual(parser.feedback, 'Good fit.')
+
+    def test_score_is_not_reported_before_number_is_complete(self):
+        parser = StreamingScoreParser()
+
+        self.assertIsNone(parser.feed('***SCORE: 8'))
+        self.assertEqual(parser.feed('5***'), 85)
+
+    def test_score_at_end_of_response(self):
+        parser = StreamingScoreParser()
+        parser.feed('SCORE: 90')
+
+        self.assertIsNone(parser.score)
+        self.assertEqual(parser.finish(), 90)
+
+    def test_response_without_score(self):
+        self.assertIsNone(self.feed_all(['The applicant ', 'looks good.']).score)
+
+
+class TestScoreSubmissionStreaming(unittest.TestCase):
+
+    CHUNKS = ['***', 'SCORE', ':', ' 64', '***', '\nSolid', ' Python', ' experience.']
+
+    def test_cutoff_stops_stream_after_score(self):
+        service = StreamingScoringService(self.CHUNKS)
+        on_score = MagicMock()
+
+        score, feedback = service.score_submission_streaming(MagicMock(), on_score=on_score, cutoff=True)
+
+        self.assertEqual(score, 64)
+        on_score.assert_called_once_with(64)
+        self.assertEqual(service.consumed, self.CHUNKS[:5])
+        self.assertTrue(service.closed)
+        self.assertEqual(feedback, '')
+
+    def test_continue_collects_feedback(self):
+        service = StreamingScoringService(self.CHUNKS)
+        scores_seen_at = []
+        on_score = lambda score: scores_seen_at.append(len(service.consumed))
+
+        score, feedback = service.score_submission_streaming(MagicMock(), on_score=on_score, cutoff=False)
+
+        self.assertEqual(score, 64)
+        self.assertEqual(scores_seen_at, [5])
+        self.assertEqual(service.consumed, self.CHUNKS)
+        self.assertEqual(feedback, 'Solid Python experience.')
+
+    def test_missing_score_raises(self):
+        service = StreamingScoringService(['No score', ' here.'])
+
+        with self.assertRaises(ScoreParseError):
+            service.score_submission_streaming(MagicMock(), cutoff=True)
+        self.assertTrue(service.closed)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from job_postings.models import JobPosting
+from user_scoring.models import UserSubmission
+from user_scoring.services.resume_extraction.resume_extraction import ResumeExtractionError
+from user_scoring.tasks import extract_resume
+
+
+@override_settings(RESUME_EXTRACTION_PROCESSES=0)
+class TestExtractResume(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = self.settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.job_posting = JobPosting.objects.create(title='Engineer', company='Acme', description='Python')
+
+    def create_submission(self, name, content):
+        submission = UserSubmission(
+            job_posting=self.job_posting, company='Acme', first_name='Jane', last_name='Doe',
+            email='jane@example.com', phone_number='+15555555555', service='openai',
+            scoring_status=UserSubmission.STATUS_EXTRACTING)
+        submission.resume_file.save(name, ContentFile(content))
+        return submission
+
+    def test_text_is_stored_for_scoring(self):
+        submission = self.create_submission('resume.txt', b'Senior   Python developer\n')
+
+        extract_resume(submission.id)
+
+        submission.refresh_from_db()
+        self.assertEqual(submission.resume, 'Senior Python developer')
+        self.assertEqual(submission.scoring_status, UserSubmission.STATUS_PENDING)
+
+    def test_unreadable_file_fails_submission(self):
+        submission = self.create_submission('resume.docx', b'not a zip file')
+
+        with self.assertRaises(ResumeExtractionError):
+            extract_resume(submission.id)
+
+        submission.refresh_from_db()
+        self.assertEqual(submission.scoring_status, UserSubmission.STATUS_FAILED)
+        self.assertIn('ResumeExtractionError', submission.last_scoring_error)
+
+    @patch('user_scoring.tasks.extract_resume_text', side_effect=RuntimeError('cannot schedule new futures'))
+    def test_unexpected_error_fails_submission(self, mock_extract):
+        submission = self.create_submission('resume.txt', b'Senior Python developer')
+
+        with self.assertRaises(RuntimeError):
+            extract_resume(submission.id)
+
+        submission.refresh_from_db()
+        self.assertEqual(submission.scoring_status, UserSubmission.STATUS_FAILED)
+        self.assertEqual(submission.last_scoring_error, 'RuntimeError: cannot schedule new futures')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,21 +1,25 @@
 import unittest
 from unittest.mock import patch, MagicMock
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from celery.exceptions import Retry
 from user_scoring.tasks import score_submission
+from user_scoring.services.rate_limiter.rate_limiter import RateLimited
+from user_scoring.services.scoring_service.errors import ScoreParseError
 from user_scoring.models import UserSubmission
+from job_postings.models import JobPosting
 from user_scoring.services.scoring_service.scoring_service_factory import ScoringServiceFactory
 
 class TestScoreSubmissionTask(TestCase):
 
-    @patch('user_scoring.models.UserSubmission.objects.get')
+    @patch('user_scoring.models.UserSubmission.objects.for_scoring')
     @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
-    def test_score_submission_success(self, mock_get_scoring_service, mock_get_submission):
+    def test_score_submission_success(self, mock_get_scoring_service, mock_for_scoring):
         # Arrange
         mock_submission = MagicMock(spec=UserSubmission)
         mock_submission.id = 1
         mock_submission.service = 'test_service'
-        mock_get_submission.return_value = mock_submission
+        mock_submission.scoring_attempts = 0
+        mock_for_scoring.return_value.get.return_value = mock_submission
 
         mock_scoring_service = MagicMock()
         mock_scoring_service.score_submission.return_value = 85.5
@@ -26,29 +30,33 @@ class TestScoreSubmissionTask(TestCase):
 
         # Assert
         self.assertEqual(result, 85.5)
-        mock_get_submission.assert_called_once_with(id=1)
+        mock_for_scoring.return_value.get.assert_called_once_with(id=1)
         mock_get_scoring_service.assert_called_once_with('test_service')
         mock_scoring_service.score_submission.assert_called_once_with(mock_submission)
-        mock_submission.save.assert_called_once()
-        self.assertEqual(mock_submission.score, 85.5)
+        mock_submission.save_scoring_result.assert_called_once_with(
+            ['score', 'score_variance', 'score_samples', 'scoring_attempts', 'scoring_status', 'last_scoring_error'], 0)
+        mock_submission.set_score.assert_called_once_with(85.5)
+        self.assertEqual(mock_submission.scoring_status, UserSubmission.STATUS_SCORED)
+        self.assertEqual(mock_submission.scoring_attempts, 1)
 
-    @patch('user_scoring.models.UserSubmission.objects.get')
-    def test_score_submission_not_found(self, mock_get_submission):
+    @patch('user_scoring.models.UserSubmission.objects.for_scoring')
+    def test_score_submission_not_found(self, mock_for_scoring):
         # Arrange
-        mock_get_submission.side_effect = UserSubmission.DoesNotExist
+        mock_for_scoring.return_value.get.side_effect = UserSubmission.DoesNotExist
 
         # Act & Assert
         with self.assertRaises(UserSubmission.DoesNotExist):
             score_submission(999)
 
-    @patch('user_scoring.models.UserSubmission.objects.get')
+    @patch('user_scoring.models.UserSubmission.objects.for_scoring')
     @patch('user_scoring.services.scoring_service.scoring_service_factory.ScoringServiceFactory.get_scoring_service')
-    def test_score_submission_scoring_error(self, mock_get_scoring_service, mock_get_submission):
+    def test_score_submission_scoring_error(self, mock_get_scoring_service, mock_for_scoring):
         # Arrange
         mock_submission = MagicMock(spec=UserSubmission)
         mock_submission.id = 1
         mock_submission.service = 'test_service'
-        mock_get_submission.return_value = mock_submission
+        mock_submission.scoring_attempts = 0
+        mock_for_scoring.return_value.get.return_value = mock_submission
 
         mock_scoring_service = MagicMock()
         mock_scoring_service.score_submission.side_effect = Exception("Scoring error")
@@ -58,14 +66,15 @@ class TestScoreSubmissionTask(TestCase):
         with self.assertRaises(Exception):
             score_submission(1)
 
-    @patch('user_scoring.models.UserSubmission.objects.get')
+    @patch('user_scoring.models.UserSubmission.objects.for_scoring')
     @patch('user_scoring.services.scoring_service.scoring_service_factory.ScoringServiceFactory.get_scoring_service')    
-    def test_score_submission_invalid_score(self, mock_get_scoring_service, mock_get_submission):
+    def test_score_submission_invalid_score(self, mock_get_scoring_service, mock_for_scoring):
         # Arrange
         mock_submission = MagicMock(spec=UserSubmission)
         mock_submission.id = 1
         mock_submission.service = 'test_service'
-        mock_get_submission.return_value = mock_submission
+        mock_submission.scoring_attempts = 0
+        mock_for_scoring.return_value.get.return_value = mock_submission
 
         mock_scoring_service = MagicMock()
         mock_scoring_service.score_submission.return_value = "Invalid Score"
@@ -75,15 +84,16 @@ class TestScoreSubmissionTask(TestCase):
         with self.assertRaises(ValueError):
             score_submission(1)
 
-    @patch('user_scoring.models.UserSubmission.objects.get')    
+    @patch('user_scoring.models.UserSubmission.objects.for_scoring')    
     @patch('user_scoring.services.scoring_service.scoring_service_factory.ScoringServiceFactory.get_scoring_service')    
-    def test_score_submission_save_error(self, mock_get_scoring_service, mock_get_submission):
+    def test_score_submission_save_error(self, mock_get_scoring_service, mock_for_scoring):
         # Arrange
         mock_submission = MagicMock(spec=UserSubmission)
         mock_submission.id = 1
         mock_submission.service = 'test_service'
-        mock_submission.save.side_effect = Exception("Database error")
-        mock_get_submission.return_value = mock_submission
+        mock_submission.scoring_attempts = 0
+        mock_submission.save_scoring_result.side_effect = Exception("Database error")
+        mock_for_scoring.return_value.get.return_value = mock_submission
 
         mock_scoring_service = MagicMock()
         mock_scoring_service.score_submission.return_value = 85.5
@@ -93,5 +103,202 @@ class TestScoreSubmissionTask(TestCase):
         with self.assertRaises(Exception):
             score_submission(1)
 
+    @patch('user_scoring.tasks.score_submission.retry')
+    @patch('user_scoring.models.UserSubmission.objects.for_scoring')
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_score_submission_rate_limited(self, mock_get_scoring_service, mock_for_scoring, mock_retry):
+        # Arrange
+        mock_submission = MagicMock(spec=UserSubmission)
+        mock_submission.id = 1
+        mock_submission.service = 'openai'
+        mock_for_scoring.return_value.get.return_value = mock_submission
+
+        rate_limited = RateLimited('openai', 20)
+        mock_scoring_service = MagicMock()
+        mock_scoring_service.score_submission.side_effect = rate_limited
+        mock_get_scoring_service.return_value = mock_scoring_service
+        mock_retry.return_value = Retry()
+
+        # Act & Assert
+        with self.assertRaises(Retry):
+            score_submission(1)
+        self.assertIs(mock_retry.call_args.kwargs['exc'], rate_limited)
+        self.assertGreaterEqual(mock_retry.call_args.kwargs['countdown'], 20)
+        mock_submission.save_scoring_result.assert_not_called()
+
+    @patch('user_scoring.tasks.score_submission.retry')
+    @patch('user_scoring.models.UserSubmission.objects.for_scoring')
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_score_submission_transient_error_is_retried(self, mock_get_scoring_service, mock_for_scoring, mock_retry):
+        # Arrange
+        mock_submission = MagicMock(spec=UserSubmission)
+        mock_submission.id = 1
+        mock_submission.service = 'openai'
+        mock_submission.scoring_attempts = 1
+        mock_for_scoring.return_value.get.return_value = mock_submission
+
+        mock_scoring_service = MagicMock()
+        mock_scoring_service.score_submission.side_effect = TimeoutError('Provider timed out')
+        mock_get_scoring_service.return_value = mock_scoring_service
+        mock_retry.return_value = Retry()
+
+        # Act & Assert
+        with self.assertRaises(Retry):
+            score_submission(1)
+        self.assertEqual(mock_submission.scoring_attempts, 2)
+        self.assertEqual(mock_submission.last_scoring_error, 'TimeoutError: Provider timed out')
+        mock_submission.save_scoring_result.assert_called_once_with(
+            ['scoring_attempts', 'last_scoring_error', 'scoring_status'], 1)
+        self.assertLessEqual(mock_retry.call_args.kwargs['countdown'], 4)
+
+    @patch('user_scoring.tasks.score_submission.retry')
+    @patch('user_scoring.models.UserSubmission.objects.for_scoring')
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_score_submission_gives_up_after_max_attempts(self, mock_get_scoring_service, mock_for_scoring, mock_retry):
+        # Arrange
+        mock_submission = MagicMock(spec=UserSubmission)
+        mock_submission.id = 1
+        mock_submission.service = 'openai'
+        mock_submission.scoring_attempts = 4
+        mock_for_scoring.return_value.get.return_value = mock_submission
+
+        mock_scoring_service = MagicMock()
+        mock_scoring_service.score_submission.side_effect = TimeoutError('Provider timed out')
+        mock_get_scoring_service.return_value = mock_scoring_service
+
+        # Act & Assert
+        with self.assertRaises(TimeoutError):
+            score_submission(1)
+        mock_retry.assert_not_called()
+        self.assertEqual(mock_submission.scoring_attempts, 5)
+        self.assertEqual(mock_submission.scoring_status, UserSubmission.STATUS_FAILED)
+
+    @patch('user_scoring.tasks.score_submission.retry')
+    @patch('user_scoring.models.UserSubmission.objects.for_scoring')
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_score_submission_parse_error_retried_once(self, mock_get_scoring_service, mock_for_scoring, mock_retry):
+        # Arrange
+        mock_submission = MagicMock(spec=UserSubmission)
+        mock_submission.id = 1
+        mock_submission.service = 'llama'
+        mock_submission.scoring_attempts = 0
+        mock_for_scoring.return_value.get.return_value = mock_submission
+
+        mock_scoring_service = MagicMock()
+        mock_scoring_service.score_submission.side_effect = ScoreParseError('No score')
+        mock_get_scoring_service.return_value = mock_scoring_service
+        mock_retry.return_value = Retry()
+
+        # Act & Assert
+        with self.assertRaises(Retry):
+            score_submission(1)
+        with self.assertRaises(ScoreParseError):
+            score_submission(1)
+        self.assertEqual(mock_retry.call_count, 1)
+        self.assertEqual(mock_submission.scoring_status, UserSubmission.STATUS_FAILED)
+
+    @override_settings(SCORING_STREAMING=True)
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_score_submission_streaming_stores_score_before_feedback(self, mock_get_scoring_service):
+        # Arrange
+        job_posting = JobPosting.objects.create(title='Engineer', company='Test', description='Python')
+        submission = UserSubmission.objects.create(
+            job_posting=job_posting, company='Test', first_name='Jane', last_name='Doe',
+            email='jane@example.com', phone_number='+15555555555', resume='Python', service='openai')
+        stored_before_feedback = []
+
+        def score_submission_streaming(submission, on_score):
+            on_score(77)
+            stored_before_feedback.append(UserSubmission.objects.get(id=submission.id).score)
+            return 77, 'Good fit.'
+
+        mock_scoring_service = MagicMock()
+        mock_scoring_service.score_submission_streaming.side_effect = score_submission_streaming
+        mock_get_scoring_service.return_value = mock_scoring_service
+
+        # Act
+        result = score_submission(submission.id)
+
+        # Assert
+        self.assertEqual(result, 77)
+        self.assertEqual(stored_before_feedback, [77])
+        mock_scoring_service.score_submission.assert_not_called()
+        submission.refresh_from_db()
+        self.assertEqual(submission.feedback, 'Good fit.')
+        self.assertEqual(submission.scoring_status, UserSubmission.STATUS_SCORED)
+
+    @override_settings(SCORING_STREAMING=True)
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_streamed_score_does_not_overwrite_a_finished_attempt(self, mock_get_scoring_service):
+        job_posting = JobPosting.objects.create(title='Engineer', company='Test', description='Python')
+        submission = UserSubmission.objects.create(
+            job_posting=job_posting, company='Test', first_name='Jane', last_name='Doe',
+            email='jane@example.com', phone_number='+15555555555', resume='Python', service='openai')
+
+        def score_submission_streaming(submission, on_score):
+            # A duplicate delivery of the task finishes first.
+            UserSubmission.objects.filter(pk=submission.pk).update(score=90, scoring_attempts=1)
+            on_score(40)
+            return 40, 'Weak fit.'
+
+        mock_scoring_service = MagicMock()
+        mock_scoring_service.score_submission_streaming.side_effect = score_submission_streaming
+        mock_get_scoring_service.return_value = mock_scoring_service
+
+        self.assertIsNone(score_submission(submission.id))
+
+        submission.refresh_from_db()
+        self.assertEqual((submission.score, submission.feedback), (90, ''))
+
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_score_submission_loads_and_writes_once(self, mock_get_scoring_service):
+        # Arrange
+        job_posting = JobPosting.objects.create(title='Engineer', company='Test', description='Python')
+        submission = UserSubmission.objects.create(
+            job_posting=job_posting, company='Test', first_name='Jane', last_name='Doe',
+            email='jane@example.com', phone_number='+15555555555', resume='Python', service='openai')
+
+        def score(submission):
+            # The prompt needs the description index, which must already be loaded.
+            return len(submission.job_posting.description_index.description) * 10
+
+        mock_scoring_service = MagicMock()
+        mock_scoring_service.score_submission.side_effect = score
+        mock_get_scoring_service.return_value = mock_scoring_service
+
+        # Act
+        with self.assertNumQueries(2):
+            result = score_submission(submission.id)
+
+        # Assert
+        self.assertEqual(result, 60)
+        submission.refresh_from_db()
+        self.assertEqual((submission.score, submission.scoring_attempts), (60, 1))
+
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_score_submission_duplicate_delivery_keeps_first_result(self, mock_get_scoring_service):
+        # Arrange
+        job_posting = JobPosting.objects.create(title='Engineer', company='Test', description='Python')
+        submission = UserSubmission.objects.create(
+            job_posting=job_posting, company='Test', first_name='Jane', last_name='Doe',
+            email='jane@example.com', phone_number='+15555555555', resume='Python', service='openai')
+
+        def score_while_other_delivery_finishes(submission):
+            UserSubmission.objects.filter(pk=submission.pk).update(
+                score=90, scoring_attempts=1, scoring_status=UserSubmission.STATUS_SCORED)
+            return 40
+
+        mock_scoring_service = MagicMock()
+        mock_scoring_service.score_submission.side_effect = score_while_other_delivery_finishes
+        mock_get_scoring_service.return_value = mock_scoring_service
+
+        # Act
+        result = score_submission(submission.id)
+
+        # Assert
+        self.assertIsNone(result)
+        submission.refresh_from_db()
+        self.assertEqual((submission.score, submission.scoring_attempts), (90, 1))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,160 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from django.test import TestCase, override_settings
+from user_scoring.tasks import score_submissions_batch
+from user_scoring.services.rate_limiter.rate_limiter import RateLimited
+from user_scoring.models import UserSubmission
+from job_postings.models import JobPosting, JobPostingIndex
+from user_scoring.services.scoring_service.scoring_service import require_loaded_description_index
+
+class TestScoreSubmissionsBatchTask(TestCase):
+
+    def setUp(self):
+        self.job_posting = JobPosting.objects.create(title='Engineer', company='Test', description='Python')
+        self.submissions = [
+            UserSubmission.objects.create(
+                job_posting=self.job_posting, company='Test', first_name='Jane', last_name='Doe',
+                email=f'jane{i}@example.com', phone_number='+15555555555', resume='Python', service='llama')
+            for i in range(3)
+        ]
+
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_scores_are_bulk_updated(self, mock_get_scoring_service):
+        # Arrange
+        mock_scoring_service = MagicMock()
+        mock_scoring_service.score_many.side_effect = lambda group: {s.id: 70 + i for i, s in enumerate(group)}
+        mock_get_scoring_service.return_value = mock_scoring_service
+
+        # Act: one query loads the batch; the rows are then checked and updated within a savepoint.
+        with self.assertNumQueries(5):
+            result = score_submissions_batch([str(s.id) for s in self.submissions])
+
+        # Assert
+        mock_get_scoring_service.assert_called_once_with('llama')
+        self.assertEqual(len(result['scored']), 3)
+        self.assertEqual(result['failed'], {})
+        self.assertEqual(
+            sorted(UserSubmission.objects.values_list('score', flat=True)), [70.0, 71.0, 72.0])
+
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_results_of_a_finished_attempt_are_not_overwritten(self, mock_get_scoring_service):
+        first, second, third = self.submissions
+
+        def score_many(group):
+            # Another task scores the first submission while this batch runs.
+            UserSubmission.objects.filter(pk=first.pk).update(score=99, scoring_attempts=1)
+            return {s.id: 50 for s in group}
+
+        mock_scoring_service = MagicMock()
+        mock_scoring_service.score_many.side_effect = score_many
+        mock_get_scoring_service.return_value = mock_scoring_service
+
+        result = score_submissions_batch([str(s.id) for s in self.submissions])
+
+        self.assertEqual(set(result['scored']), {str(second.id), str(third.id)})
+        first.refresh_from_db()
+        self.assertEqual(first.score, 99)
+
+    @override_settings(SCORING_BATCH_MODE='asyncio')
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_asyncio_mode_uses_ascore_many(self, mock_get_scoring_service):
+        # Arrange
+        async def ascore_many(group):
+            return {s.id: 80 for s in group}
+
+        mock_scoring_service = MagicMock()
+        mock_scoring_service.ascore_many.side_effect = ascore_many
+        mock_get_scoring_service.return_value = mock_scoring_service
+
+        # Act
+        result = score_submissions_batch([str(s.id) for s in self.submissions])
+
+        # Assert
+        mock_scoring_service.score_many.assert_not_called()
+        self.assertEqual(len(result['scored']), 3)
+
+    @override_settings(SCORING_BATCH_MODE='asyncio')
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_asyncio_mode_builds_missing_indexes_first(self, mock_get_scoring_service):
+        JobPostingIndex.objects.all().delete()
+
+        async def ascore_many(group):
+            for submission in group:
+                require_loaded_description_index(submission)
+            return {s.id: 80 for s in group}
+
+        mock_scoring_service = MagicMock()
+        mock_scoring_service.ascore_many.side_effect = ascore_many
+        mock_get_scoring_service.return_value = mock_scoring_service
+
+        result = score_submissions_batch([str(s.id) for s in self.submissions])
+
+        self.assertEqual(len(result['scored']), 3)
+        self.assertEqual(JobPostingIndex.objects.filter(job_posting=self.job_posting).count(), 1)
+
+    @patch('user_scoring.tasks.score_submissions_batch.apply_async')
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_failures_do_not_block_other_submissions(self, mock_get_scoring_service, mock_apply_async):
+        # Arrange
+        failing, invalid, ok = self.submissions
+        mock_scoring_service = MagicMock()
+        mock_scoring_service.score_many.return_value = {
+            failing.id: Exception('Scoring error'),
+            invalid.id: 'Invalid Score',
+            ok.id: 90,
+        }
+        mock_get_scoring_service.return_value = mock_scoring_service
+
+        # Act
+        result = score_submissions_batch([str(s.id) for s in self.submissions])
+
+        # Assert
+        self.assertEqual(result['scored'], {str(ok.id): 90})
+        self.assertEqual(set(result['failed']), {str(failing.id)})
+        self.assertEqual(result['deferred'], [str(invalid.id)])
+        mock_apply_async.assert_called_once()
+        ok.refresh_from_db()
+        failing.refresh_from_db()
+        invalid.refresh_from_db()
+        self.assertEqual(ok.score, 90)
+        self.assertEqual(ok.scoring_status, UserSubmission.STATUS_SCORED)
+        self.assertIsNone(failing.score)
+        self.assertEqual(failing.scoring_status, UserSubmission.STATUS_FAILED)
+        self.assertEqual(failing.last_scoring_error, 'Exception: Scoring error')
+        self.assertEqual(invalid.scoring_status, UserSubmission.STATUS_PENDING)
+        self.assertEqual(invalid.scoring_attempts, 1)
+
+    @patch('user_scoring.tasks.score_submissions_batch.apply_async')
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_rate_limited_submissions_are_requeued(self, mock_get_scoring_service, mock_apply_async):
+        # Arrange
+        limited, ok, _ = self.submissions
+        mock_scoring_service = MagicMock()
+        mock_scoring_service.score_many.side_effect = lambda group: {
+            s.id: RateLimited('llama', 15) if s.id != ok.id else 60 for s in group}
+        mock_get_scoring_service.return_value = mock_scoring_service
+
+        # Act
+        result = score_submissions_batch([str(limited.id), str(ok.id)])
+
+        # Assert
+        self.assertEqual(result['deferred'], [str(limited.id)])
+        self.assertEqual(result['failed'], {})
+        mock_apply_async.assert_called_once()
+        self.assertEqual(mock_apply_async.call_args.args[0], ([str(limited.id)],))
+        self.assertGreaterEqual(mock_apply_async.call_args.kwargs['countdown'], 15)
+
+    @patch('user_scoring.tasks.ScoringServiceFactory.get_scoring_service')
+    def test_invalid_service_marks_group_failed(self, mock_get_scoring_service):
+        # Arrange
+        mock_get_scoring_service.side_effect = ValueError('Invalid service type specified.')
+
+        # Act
+        result = score_submissions_batch([str(s.id) for s in self.submissions])
+
+        # Assert
+        self.assertEqual(result['scored'], {})
+        self.assertEqual(len(result['failed']), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,7 +9,15 @@ from job_postings.models import JobPosting
 from user_scoring.serializers import UserSubmissionSerializer, UserSubmissionReadSerializer
 from user_scoring.tasks import score_submission
 from django.http import QueryDict
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
+import base64
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
 
 
 class TestUserSubmissionViewSet(APITestCase):
@@ -81,18 +89,17 @@ class TestUserSubmissionViewSet(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertEqual(response.data, {'error': 'Job posting not found'})
 
-    @patch('user_scoring.views.user_submission.UserSubmissionReadSerializer')
-    def test_list_submissions(self, mock_serializer):
-        # Mock the serializer
-        mock_serializer_instance = mock_serializer.return_value
-        mock_serializer_instance.data = [{'id': 1, 'job_posting': 1, 'other_field': 'value'}]
+    @patch('user_scoring.views.user_submission.read_data')
+    def test_list_submissions(self, mock_read_data):
+        # Mock the row serialization
+        mock_read_data.return_value = [{'id': 1, 'job_posting': 1, 'other_field': 'value'}]
 
         # Make the GET request
         response = self.client.get(self.list_url)
 
         # Assertions
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, [{'id': 1, 'job_posting': 1, 'other_field': 'value'}])
+        self.assertEqual(response.data, {'next': None, 'results': [{'id': 1, 'job_posting': 1, 'other_field': 'value'}]})
 
     @patch('user_scoring.views.user_submission.UserSubmissionReadSerializer')
     @patch('user_scoring.views.user_submission.UserSubmissionViewSet.get_object')
@@ -132,5 +139,202 @@ class TestUserSubmissionViewSet(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertEqual(response.data, {'error': 'Submission not found'})
 
+class TestUserSubmissionListing(APITestCase):
+
+    def setUp(self):
+        self.list_url = reverse('user-submission-list')
+        self.job_posting = JobPosting.objects.create(title='Engineer', company='Acme', description='Python')
+        other_posting = JobPosting.objects.create(title='Designer', company='Other', description='Figma')
+        scores = [70, None, 90, 70, 55, None, 90]
+        self.submissions = [
+            UserSubmission.objects.create(
+                job_posting=self.job_posting, company='Acme', first_name='Jane', last_name='Doe',
+                email=f'jane{i}@example.com', phone_number='+15555555555', resume='Python', service='openai', score=score)
+            for i, score in enumerate(scores)
+        ]
+        UserSubmission.objects.create(
+            job_posting=other_posting, company='Other', first_name='John', last_name='Roe',
+            email='john@example.com', phone_number='+15555555555', resume='Figma', service='openai', score=99)
+
+    def collect_pages(self, params):
+        ids = []
+        response = self.client.get(self.list_url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            data = response.json()
+            ids.extend(row['id'] for row in data['results'])
+            if data['next'] is None:
+                return ids
+            response = self.client.get(data['next'])
+
+    def test_newest_first_by_default(self):
+        ids = self.collect_pages({'job_posting': self.job_posting.id, 'page_size': 3})
+
+        self.assertEqual(ids, [str(s.id) for s in reversed(self.submissions)])
+
+    def test_score_order_pages_through_ties_and_unscored(self):
+        ids = self.collect_pages({'company': 'Acme', 'ordering': '-score', 'page_size': 2})
+
+        expected = sorted(self.submissions, key=lambda s: (s.score is None, -(s.score or 0), -s.id.int))
+        self.assertEqual(ids, [str(s.id) for s in expected])
+
+    def test_score_filters(self):
+        ids = self.collect_pages({'job_posting': self.job_posting.id, 'min_score': 60, 'max_score': 80})
+        self.assertEqual(set(ids), {str(self.submissions[0].id), str(self.submissions[3].id)})
+
+        ids = self.collect_pages({'job_posting': self.job_posting.id, 'scored': 'false'})
+        self.assertEqual(set(ids), {str(self.submissions[1].id), str(self.submissions[5].id)})
+
+    def test_page_query_count_is_constant(self):
+        response = self.client.get(self.list_url, {'page_size': 2})
+        with self.assertNumQueries(1):
+            self.client.get(response.data['next'])
+
+    def test_rows_match_read_serializer(self):
+        # One submission on a whole second, which both renderers write without microseconds.
+        submitted_at = timezone.now().replace(microsecond=0) - timedelta(days=3)
+        UserSubmission.objects.filter(pk=self.submissions[0].pk).update(submitted_at=submitted_at)
+
+        response = self.client.get(self.list_url, {'job_posting': self.job_posting.id})
+
+        expected = UserSubmissionReadSerializer(
+            UserSubmission.objects.filter(job_posting=self.job_posting).order_by('-id'), many=True).data
+        self.assertEqual(response.content, JSONRenderer().render({'next': None, 'results': expected}))
+        self.assertEqual(response.json()['results'][-1]['days_since_submission'], 3)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.list_url, {'ordering': 'email'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.list_url, {'min_score': 'high'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.list_url, {'cursor': 'garbage'}).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_with_wrong_typed_values(self):
+        def get(values, ordering):
+            cursor = base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+            return self.client.get(self.list_url, {'cursor': cursor, 'ordering': ordering})
+
+        submission_id = str(self.submissions[3].id)
+        for values, ordering in [
+            (['not-a-uuid'], '-submitted_at'),
+            ([{'id': 1}], 'submitted_at'),
+            ([True], '-submitted_at'),
+            (['high', submission_id], '-score'),
+            ([[70], submission_id], '-score'),
+            ([70, None], '-score'),
+            ([70, 12.5], '-score'),
+        ]:
+            with self.subTest(values=values):
+                self.assertEqual(get(values, ordering).status_code, status.HTTP_404_NOT_FOUND)
+
+        # Values of the right type are accepted, including a score sent as a string.
+        self.assertEqual(get(['70', submission_id], '-score').status_code, status.HTTP_200_OK)
+        self.assertEqual(get([None, submission_id], '-score').status_code, status.HTTP_200_OK)
+
+
+class TestUserSubmissionUpload(APITestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = self.settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.list_url = reverse('user-submission-list')
+        self.job_posting = JobPosting.objects.create(title='Engineer', company='Acme', description='Python')
+
+    def submit(self, **fields):
+        data = {
+            'job_posting': self.job_posting.id, 'first_name': 'Jane', 'last_name': 'Doe',
+            'email': 'jane@example.com', 'phone_number': '+15555555555', 'service': 'openai', **fields,
+        }
+        return self.client.post(self.list_url, data, format='multipart')
+
+    @patch('user_scoring.views.user_submission.score_submission')
+    @patch('user_scoring.views.user_submission.extract_resume')
+    def test_upload_chains_extraction_and_scoring(self, mock_extract_resume, mock_score_submission):
+        mock_extract_resume.si.return_value.__or__.return_value.delay.return_value.id = 'mock-task-id'
+
+        response = self.submit(resume_file=SimpleUploadedFile('resume.pdf', b'%PDF-1.4'))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['task_id'], 'mock-task-id')
+        submission = UserSubmission.objects.get()
+        self.assertEqual(submission.scoring_status, UserSubmission.STATUS_EXTRACTING)
+        self.assertTrue(submission.resume_file.name.endswith('.pdf'))
+        mock_extract_resume.si.assert_called_once_with(submission.id)
+        mock_score_submission.si.assert_called_once_with(submission.id)
+        mock_score_submission.delay.assert_not_called()
+
+    @patch('user_scoring.views.user_submission.score_submission.delay')
+    def test_long_pasted_resume(self, mock_score_submission):
+        mock_score_submission.return_value.id = 'mock-task-id'
+        with self.settings(RESUME_MAX_LENGTH=100):
+            self.assertEqual(self.submit(resume='Python ' * 20).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.submit(resume='Python ' * 20).status_code, status.HTTP_201_CREATED)
+
+    def test_invalid_uploads(self):
+        self.assertEqual(self.submit().status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.submit(resume_file=SimpleUploadedFile('resume.exe', b'MZ')).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        with self.settings(RESUME_UPLOAD_MAX_SIZE=10):
+            self.assertEqual(self.submit(resume_file=SimpleUploadedFile('resume.txt', b'Python ' * 10)).status_code,
+                             status.HTTP_400_BAD_REQUEST)
+
+
+@patch('user_scoring.views.user_submission.score_submission.delay')
+class TestUserSubmissionDedup(APITestCase):
+
+    def setUp(self):
+        self.list_url = reverse('user-submission-list')
+        self.job_posting = JobPosting.objects.create(title='Engineer', company='Acme', description='Python')
+
+    def submit(self, headers=None, **fields):
+        data = {
+            'job_posting': self.job_posting.id, 'first_name': 'Jane', 'last_name': 'Doe',
+            'email': 'jane@example.com', 'phone_number': '+15555555555', 'service': 'openai',
+            'resume': 'Python developer', **fields,
+        }
+        return self.client.post(self.list_url, data, **(headers or {}))
+
+    def test_repeated_resume_returns_existing_submission(self, mock_score_submission):
+        mock_score_submission.return_value.id = 'first-task'
+        first = self.submit()
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(UserSubmission.objects.get().scoring_task_id, 'first-task')
+
+        mock_score_submission.return_value.id = 'second-task'
+        second = self.submit(email='Jane@Example.com', resume='Python   developer\n')
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.json()['task_id'], 'first-task')
+        self.assertEqual(second.json()['submission']['id'], first.json()['submission']['id'])
+        mock_score_submission.assert_called_once()
+
+        self.assertEqual(self.submit(resume='Django developer').status_code, status.HTTP_201_CREATED)
+        self.assertEqual(UserSubmission.objects.count(), 2)
+
+    def test_duplicates_outside_the_window_or_after_failures_are_scored(self, mock_score_submission):
+        mock_score_submission.return_value.id = 'task'
+        self.submit()
+        UserSubmission.objects.update(scoring_status=UserSubmission.STATUS_FAILED)
+        self.assertEqual(self.submit().status_code, status.HTTP_201_CREATED)
+
+        with self.settings(SUBMISSION_DEDUP_WINDOW=0):
+            self.assertEqual(self.submit().status_code, status.HTTP_201_CREATED)
+        self.assertEqual(mock_score_submission.call_count, 3)
+
+    def test_idempotency_key(self, mock_score_submission):
+        mock_score_submission.return_value.id = 'task'
+        headers = {'HTTP_IDEMPOTENCY_KEY': 'request-1'}
+
+        with self.settings(SUBMISSION_DEDUP_WINDOW=0):
+            self.assertEqual(self.submit(headers).status_code, status.HTTP_201_CREATED)
+            retry = self.submit(headers)
+            reused = self.submit(headers, resume='Django developer')
+
+        self.assertEqual(retry.status_code, status.HTTP_200_OK)
+        self.assertEqual(retry.json()['task_id'], 'task')
+        self.assertEqual(reused.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        mock_score_submission.assert_called_once()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
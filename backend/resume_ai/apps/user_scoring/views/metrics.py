@@ -0,0 +1,11 @@
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from user_scoring.services.metrics.metrics import export_metrics
+
+@require_GET
+def metrics(request):
+    """
+    Serve the scoring pipeline's metrics in the Prometheus text format.
+    """
+    output, content_type = export_metrics()
+    return HttpResponse(output, content_type=content_type)
@@ -1,17 +1,135 @@
+import uuid
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.renderers import BrowsableAPIRenderer
 from user_scoring.models import UserSubmission
+from user_scoring.pagination import KeysetPagination
+from user_scoring.renderers import FirstRendererNegotiation, ORJSONRenderer
+from user_scoring.services.export.export import FORMATS, export_queryset, iter_export, iter_rows, parse_iso_datetime
 from job_postings.models import JobPosting 
-from user_scoring.tasks import score_submission
-from user_scoring.serializers import UserSubmissionSerializer, UserSubmissionReadSerializer
+from user_scoring.tasks import extract_resume, score_submission
+from user_scoring.serializers import UserSubmissionSerializer, UserSubmissionReadSerializer, read_data, read_values
+
+class IdempotencyKeyReused(Exception):
+    """
+    Raised when an Idempotency-Key is sent again with a different submission.
+    """
 
 class UserSubmissionViewSet(viewsets.ModelViewSet):
     """
     ViewSet to handle user submissions for job postings.
+
+    The list is paginated by keyset (see ``KeysetPagination``) and can be
+    filtered with the ``job_posting``, ``company``, ``min_score``,
+    ``max_score`` and ``scored`` query parameters. ``ordering`` is one of
+    ``-submitted_at`` (the default), ``submitted_at`` or ``-score``. List
+    pages are built from plain rows rather than serializer instances (see
+    ``read_data``).
     """
     queryset = UserSubmission.objects.all()
     serializer_class = UserSubmissionSerializer
+    pagination_class = KeysetPagination
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
+
+    max_idempotency_key_length = 255
+
+    # Submission time is ordered by the time-ordered UUIDv6 primary key, which
+    # makes the sort key unique and matches the listing indexes.
+    orderings = {
+        '-submitted_at': ('-id',),
+        'submitted_at': ('id',),
+        '-score': ('-score', '-id'),
+    }
+
+    def get_queryset(self):
+        """
+        Apply the list filters.
+        """
+        queryset = super().get_queryset()
+        if self.action != 'list':
+            return queryset
+        params = self.request.query_params
+        if params.get('job_posting'):
+            queryset = queryset.filter(job_posting_id=self._number_param('job_posting', int))
+        if params.get('company'):
+            queryset = queryset.filter(company=params['company'])
+        if params.get('min_score'):
+            queryset = queryset.filter(score__gte=self._number_param('min_score', float))
+        if params.get('max_score'):
+            queryset = queryset.filter(score__lte=self._number_param('max_score', float))
+        if params.get('scored'):
+            queryset = queryset.filter(score__isnull=params['scored'].lower() not in ('1', 'true', 'yes'))
+        return queryset
+
+    @property
+    def keyset_ordering(self):
+        ordering = self.request.query_params.get('ordering', '-submitted_at')
+        if ordering not in self.orderings:
+            raise ValidationError({'ordering': f"Must be one of {', '.join(self.orderings)}."})
+        return self.orderings[ordering]
+
+    def _number_param(self, name, parse):
+        try:
+            return parse(self.request.query_params[name])
+        except ValueError:
+            raise ValidationError({name: 'Must be a number.'})
+
+    def list(self, request, *args, **kwargs):
+        """
+        List submissions, reading only the columns the list shows.
+        """
+        page = self.paginate_queryset(read_values(self.filter_queryset(self.get_queryset())))
+        return self.get_paginated_response(read_data(page))
+
+    @action(detail=False, methods=['get'], renderer_classes=[ORJSONRenderer],
+            content_negotiation_class=FirstRendererNegotiation, permission_classes=[IsAdminUser])
+    def export(self, request):
+        """
+        Stream all scored submissions, oldest first, as CSV or NDJSON, to staff users.
+
+        ``export_format`` is 'csv' (the default) or 'ndjson'. The export can
+        be narrowed with ``company``, ``job_posting`` and an ISO 8601
+        ``submitted_after``/``submitted_before`` window, and resumed with
+        ``after``, the id of the last submission received.
+        """
+        params = request.query_params
+        export_format = params.get('export_format', 'csv')
+        if export_format not in FORMATS:
+            raise ValidationError({'export_format': f"Must be one of {', '.join(FORMATS)}."})
+        queryset = export_queryset(
+            company=params.get('company'),
+            job_posting_id=self._number_param('job_posting', int) if params.get('job_posting') else None,
+            submitted_after=self._datetime_param('submitted_after'),
+            submitted_before=self._datetime_param('submitted_before'),
+            after=self._uuid_param('after'),
+        )
+        response = StreamingHttpResponse(iter_export(export_format, iter_rows(queryset)), content_type=FORMATS[export_format])
+        response['Content-Disposition'] = f'attachment; filename="submissions.{export_format}"'
+        return response
+
+    def _datetime_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return parse_iso_datetime(value)
+        except ValueError:
+            raise ValidationError({name: 'Must be an ISO 8601 date and time.'})
+
+    def _uuid_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return uuid.UUID(value)
+        except ValueError:
+            raise ValidationError({name: 'Must be a submission id.'})
 
     def get_serializer_class(self):
         """
@@ -24,22 +142,55 @@ class UserSubmissionViewSet(viewsets.ModelViewSet):
     def create(self, request, *args, **kwargs):
         """
         Create a new user submission and initiate the scoring task.
+
+        A resume uploaded as a file is stored as is; its text is extracted by
+        the ``extract_resume`` task, which the scoring task follows.
+
+        Repeated submissions are not scored again. A request with the
+        ``Idempotency-Key`` header of an earlier one, or one repeating the
+        resume the applicant (by email) sent to the posting within
+        ``SUBMISSION_DEDUP_WINDOW`` seconds, returns the existing submission
+        and its task id with a 200. Reusing a key for a different submission
+        is rejected with a 422.
         """
+        idempotency_key = request.headers.get('Idempotency-Key') or None
+        if idempotency_key is not None and len(idempotency_key) > self.max_idempotency_key_length:
+            return Response({'error': f'Idempotency-Key must be at most {self.max_idempotency_key_length} characters'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
             try:
                 # Retrieve the associated job posting
                 job_posting = JobPosting.objects.get(id=serializer.validated_data['job_posting'].id)
-                
+
+                duplicate = self._find_duplicate(serializer.validated_data, idempotency_key)
+                if duplicate is not None:
+                    return self._duplicate_response(duplicate)
+
                 # Create the submission
-                submission = serializer.save(company=job_posting.company)
+                try:
+                    with transaction.atomic():
+                        submission = serializer.save(company=job_posting.company, idempotency_key=idempotency_key)
+                except IntegrityError:
+                    if idempotency_key is None:
+                        raise
+                    # A concurrent request with the same key created it first.
+                    return self._duplicate_response(UserSubmission.objects.get(idempotency_key=idempotency_key))
 
                 # Initiate the scoring task asynchronously
-                task = score_submission.delay(submission.id)
-                
+                if submission.scoring_status == UserSubmission.STATUS_EXTRACTING:
+                    task = (extract_resume.si(submission.id) | score_submission.si(submission.id)).delay()
+                    message = 'Submission received and resume extraction and scoring tasks started'
+                else:
+                    task = score_submission.delay(submission.id)
+                    message = 'Submission received and scoring task started'
+                submission.scoring_task_id = task.id
+                submission.save(update_fields=['scoring_task_id'])
+
                 # Prepare the response data
                 response_data = {
-                    'message': 'Submission received and scoring task started',
+                    'message': message,
                     'task_id': task.id,
                     'submission': UserSubmissionSerializer(submission).data
                 }
@@ -47,11 +198,42 @@ class UserSubmissionViewSet(viewsets.ModelViewSet):
                 return Response(response_data, status=status.HTTP_201_CREATED)
             except JobPosting.DoesNotExist:
                 return Response({'error': 'Job posting not found'}, status=status.HTTP_404_NOT_FOUND)
+            except IdempotencyKeyReused:
+                return Response({'error': 'Idempotency-Key was already used for a different submission'},
+                                status=status.HTTP_422_UNPROCESSABLE_ENTITY)
             except Exception as e:
                 return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def _find_duplicate(self, data, idempotency_key):
+        """
+        Return the existing submission a new one repeats, or None.
+
+        Raises:
+        -------
+        IdempotencyKeyReused
+            If ``idempotency_key`` belongs to a submission with other content.
+        """
+        job_posting_id, email, resume_hash = data['job_posting'].id, data.get('email'), data.get('resume_hash')
+        if idempotency_key is not None:
+            submission = UserSubmission.objects.filter(idempotency_key=idempotency_key).first()
+            if submission is not None:
+                if (submission.job_posting_id, submission.email.lower(), submission.resume_hash) != (
+                        job_posting_id, (email or '').lower(), resume_hash):
+                    raise IdempotencyKeyReused()
+                return submission
+        if settings.SUBMISSION_DEDUP_WINDOW > 0 and resume_hash:
+            return UserSubmission.objects.duplicate_of(job_posting_id, email, resume_hash, settings.SUBMISSION_DEDUP_WINDOW)
+        return None
+
+    def _duplicate_response(self, submission):
+        return Response({
+            'message': 'Submission already received',
+            'task_id': submission.scoring_task_id or None,
+            'submission': UserSubmissionSerializer(submission).data,
+        }, status=status.HTTP_200_OK)
+
     def retrieve(self, request, *args, **kwargs):
         """
         Retrieve a specific user submission.
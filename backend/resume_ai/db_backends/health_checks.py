@@ -0,0 +1,38 @@
+class HealthCheckMixin:
+    """
+    Check persistent database connections before reusing them.
+
+    With ``CONN_MAX_AGE`` a connection outlives the request or Celery task
+    that opened it, and the server or a pooler may drop it in the meantime.
+    With ``CONN_HEALTH_CHECKS`` set in the database settings, the first query
+    of every request or task first pings a reused connection and reconnects
+    if it is no longer usable, instead of failing that query.
+    """
+
+    health_check_done = False
+
+    @property
+    def health_check_enabled(self):
+        return bool(self.settings_dict.get('CONN_HEALTH_CHECKS'))
+
+    def connect(self):
+        super().connect()
+        # A new connection needs no check.
+        self.health_check_done = True
+
+    def close_if_unusable_or_obsolete(self):
+        # Called when a request or task starts and ends.
+        super().close_if_unusable_or_obsolete()
+        self.health_check_done = False
+
+    def _cursor(self, name=None):
+        self.close_if_health_check_failed()
+        return super()._cursor(name)
+
+    def close_if_health_check_failed(self):
+        if (self.connection is None or not self.health_check_enabled
+                or self.health_check_done or self.in_atomic_block):
+            return
+        if not self.is_usable():
+            self.close()
+        self.health_check_done = True
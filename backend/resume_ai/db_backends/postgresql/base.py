@@ -0,0 +1,7 @@
+from django.db.backends.postgresql import base
+from ..health_checks import HealthCheckMixin
+
+class DatabaseWrapper(HealthCheckMixin, base.DatabaseWrapper):
+    """
+    The PostgreSQL backend, with health checks of persistent connections.
+    """
@@ -0,0 +1,20 @@
+from django.db.backends.sqlite3 import base
+from ..health_checks import HealthCheckMixin
+
+class DatabaseWrapper(HealthCheckMixin, base.DatabaseWrapper):
+    """
+    The SQLite backend, tuned for a web server and Celery workers sharing one database file.
+
+    With ``SQLITE_WAL`` set in the database settings, every connection uses
+    write-ahead logging, so readers no longer block the writer and the other
+    way round, with ``synchronous=NORMAL``, which is safe in WAL mode. How long
+    a writer waits for the lock held by another one before failing with
+    "database is locked" is set by the ``timeout`` option, in seconds.
+    """
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        if self.settings_dict.get('SQLITE_WAL'):
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
@@ -14,11 +14,15 @@ from pathlib import Path
 import os
 import json
 from dotenv import load_dotenv
+from django.core.exceptions import ImproperlyConfigured
 import sys
 load_dotenv()
 REPLICATE_API_TOKEN = os.getenv('REPLICATE_API_TOKEN')
 os.environ["REPLICATE_API_TOKEN"] = REPLICATE_API_TOKEN
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+# Override the provider endpoints, e.g. to point at a proxy or a local stub server.
+OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL')
+REPLICATE_BASE_URL = os.getenv('REPLICATE_BASE_URL')
 
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -38,6 +42,133 @@ ALLOWED_HOSTS = json.loads(os.getenv('ALLOWED_HOSTS'))
 
 CELERY_BROKER_URL = os.getenv('REDIS_URL')
 CELERY_RESULT_BACKEND = os.getenv('REDIS_URL')
+
+# Score cache: 'locmem' (per process), 'redis' (shared) or 'none'.
+SCORE_CACHE_BACKEND = os.getenv('SCORE_CACHE_BACKEND', 'locmem')
+SCORE_CACHE_TTL = int(os.getenv('SCORE_CACHE_TTL', 60 * 60 * 24 * 7))
+SCORE_CACHE_MAX_ENTRIES = int(os.getenv('SCORE_CACHE_MAX_ENTRIES', 10000))
+SCORE_CACHE_REDIS_URL = os.getenv('SCORE_CACHE_REDIS_URL', os.getenv('REDIS_URL'))
+
+# Top applicants: the LEADERBOARD_SIZE best submissions of each job posting can be kept
+# in a 'redis' leaderboard, shared by the web processes and the Celery workers; 'none'
+# reads them from the database on every request. 'locmem' (per process) is only
+# accepted with CELERY_TASK_ALWAYS_EAGER, where scores are written in the web process.
+LEADERBOARD_BACKEND = os.getenv('LEADERBOARD_BACKEND', 'none')
+LEADERBOARD_SIZE = int(os.getenv('LEADERBOARD_SIZE', 100))
+LEADERBOARD_TTL = int(os.getenv('LEADERBOARD_TTL', 60 * 60 * 24))
+LEADERBOARD_REDIS_URL = os.getenv('LEADERBOARD_REDIS_URL', os.getenv('REDIS_URL'))
+
+# Rendered job posting API responses: 'locmem' (per process), 'redis' (shared) or 'none'.
+JOB_POSTING_CACHE_BACKEND = os.getenv('JOB_POSTING_CACHE_BACKEND', 'locmem')
+JOB_POSTING_CACHE_TTL = int(os.getenv('JOB_POSTING_CACHE_TTL', 60))
+JOB_POSTING_CACHE_MAX_ENTRIES = int(os.getenv('JOB_POSTING_CACHE_MAX_ENTRIES', 1000))
+JOB_POSTING_CACHE_REDIS_URL = os.getenv('JOB_POSTING_CACHE_REDIS_URL', os.getenv('REDIS_URL'))
+
+# A submission repeating the resume an applicant (by email) already sent to the same job
+# posting within SUBMISSION_DEDUP_WINDOW seconds is not scored again; 0 turns this off.
+# Clients can also send an Idempotency-Key header to make retries of a submission safe.
+SUBMISSION_DEDUP_WINDOW = float(os.getenv('SUBMISSION_DEDUP_WINDOW', 24 * 60 * 60))
+
+# Resume uploads (PDF, DOCX or plain text) are stored under MEDIA_ROOT. Their text is
+# extracted by the extract_resume task, in a pool of RESUME_EXTRACTION_PROCESSES
+# processes per worker (0 extracts in the worker process itself), each limited to
+# RESUME_EXTRACTION_MEMORY_LIMIT bytes of memory and RESUME_EXTRACTION_CPU_SECONDS
+# of CPU time per file. The pool is replaced after RESUME_EXTRACTION_TASKS_PER_PROCESS
+# files per process. Set RESUME_EXTRACTION_QUEUE to route extraction to its own workers.
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', BASE_DIR / 'media')
+MEDIA_URL = '/media/'
+RESUME_UPLOAD_MAX_SIZE = int(os.getenv('RESUME_UPLOAD_MAX_SIZE', 10 * 1024 * 1024))
+RESUME_MAX_LENGTH = int(os.getenv('RESUME_MAX_LENGTH', 20000))
+RESUME_EXTRACTION_MAX_PAGES = int(os.getenv('RESUME_EXTRACTION_MAX_PAGES', 20))
+RESUME_EXTRACTION_PROCESSES = int(os.getenv('RESUME_EXTRACTION_PROCESSES', 2))
+RESUME_EXTRACTION_TASKS_PER_PROCESS = int(os.getenv('RESUME_EXTRACTION_TASKS_PER_PROCESS', 100))
+RESUME_EXTRACTION_MEMORY_LIMIT = int(os.getenv('RESUME_EXTRACTION_MEMORY_LIMIT', 1024 * 1024 * 1024))
+RESUME_EXTRACTION_CPU_SECONDS = int(os.getenv('RESUME_EXTRACTION_CPU_SECONDS', 30))
+RESUME_EXTRACTION_QUEUE = os.getenv('RESUME_EXTRACTION_QUEUE')
+if RESUME_EXTRACTION_QUEUE:
+    CELERY_TASK_ROUTES = {'user_scoring.tasks.extract_resume': {'queue': RESUME_EXTRACTION_QUEUE}}
+
+# Rows read per database round trip by the submission export.
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 2000))
+
+# Batch scoring: provider calls in flight per batch task, and submissions per batch.
+SCORING_BATCH_CONCURRENCY = int(os.getenv('SCORING_BATCH_CONCURRENCY', 8))
+SCORING_BATCH_SIZE = int(os.getenv('SCORING_BATCH_SIZE', 100))
+# 'threads' runs provider calls on a thread pool, 'asyncio' on an event loop with the async clients.
+SCORING_BATCH_MODE = os.getenv('SCORING_BATCH_MODE', 'threads')
+
+# Connection pools of the provider HTTP clients, kept per worker process.
+SCORING_HTTP_MAX_CONNECTIONS = int(os.getenv('SCORING_HTTP_MAX_CONNECTIONS', 100))
+SCORING_HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('SCORING_HTTP_MAX_KEEPALIVE_CONNECTIONS', 20))
+SCORING_HTTP_KEEPALIVE_EXPIRY = float(os.getenv('SCORING_HTTP_KEEPALIVE_EXPIRY', 30))
+
+# The 'auto' scoring service routes each request to the fastest healthy backend of
+# SCORING_ROUTING_BACKENDS. A backend is taken out of rotation for SCORING_ROUTING_COOLDOWN
+# seconds after SCORING_ROUTING_FAILURE_THRESHOLD consecutive failures; statistics cover
+# its last SCORING_ROUTING_WINDOW requests. SCORING_ROUTING_HEDGE sends a second request
+# to the next backend when the first is slower than its backend's p95 latency.
+SCORING_ROUTING_BACKENDS = json.loads(os.getenv('SCORING_ROUTING_BACKENDS', '["openai", "llama"]'))
+SCORING_ROUTING_WINDOW = int(os.getenv('SCORING_ROUTING_WINDOW', 100))
+SCORING_ROUTING_FAILURE_THRESHOLD = int(os.getenv('SCORING_ROUTING_FAILURE_THRESHOLD', 5))
+SCORING_ROUTING_COOLDOWN = float(os.getenv('SCORING_ROUTING_COOLDOWN', 30))
+SCORING_ROUTING_MAX_ERROR_RATE = float(os.getenv('SCORING_ROUTING_MAX_ERROR_RATE', 0.5))
+SCORING_ROUTING_HEDGE = os.getenv('SCORING_ROUTING_HEDGE', '').lower() in ('1', 'true', 'yes')
+
+# The 'ensemble' scoring service averages samples drawn in turn from SCORING_ENSEMBLE_BACKENDS
+# (e.g. '["llama"]' for repeated samples of one model). SCORING_ENSEMBLE_MIN_SAMPLES are taken
+# in parallel; only if their scores differ by more than SCORING_ENSEMBLE_TOLERANCE points are
+# the rest, up to SCORING_ENSEMBLE_MAX_SAMPLES, taken in a second parallel round.
+SCORING_ENSEMBLE_BACKENDS = json.loads(os.getenv('SCORING_ENSEMBLE_BACKENDS', '["openai", "llama"]'))
+SCORING_ENSEMBLE_MIN_SAMPLES = int(os.getenv('SCORING_ENSEMBLE_MIN_SAMPLES', 2))
+SCORING_ENSEMBLE_MAX_SAMPLES = int(os.getenv('SCORING_ENSEMBLE_MAX_SAMPLES', 4))
+SCORING_ENSEMBLE_TOLERANCE = float(os.getenv('SCORING_ENSEMBLE_TOLERANCE', 10))
+
+# Provider rate limits, shared by all workers through Redis ('redis'), per process ('locmem') or off ('none').
+SCORING_RATE_LIMIT_BACKEND = os.getenv('SCORING_RATE_LIMIT_BACKEND', 'redis' if os.getenv('REDIS_URL') else 'locmem')
+SCORING_RATE_LIMIT_REDIS_URL = os.getenv('SCORING_RATE_LIMIT_REDIS_URL', os.getenv('REDIS_URL'))
+SCORING_RATE_LIMITS = json.loads(os.getenv('SCORING_RATE_LIMITS', json.dumps({
+    'openai': {'requests_per_minute': 3500, 'tokens_per_minute': 90000},
+    'llama': {'requests_per_minute': 600, 'tokens_per_minute': 300000},
+})))
+# Longest wait spent in-process; longer waits re-schedule the task instead.
+SCORING_RATE_LIMIT_MAX_WAIT = float(os.getenv('SCORING_RATE_LIMIT_MAX_WAIT', 10))
+
+# Streaming mode: store the score as soon as it is generated, then either keep
+# streaming the feedback ('continue') or stop generation ('cutoff').
+SCORING_STREAMING = os.getenv('SCORING_STREAMING', '').lower() in ('1', 'true', 'yes')
+SCORING_STREAM_FEEDBACK = os.getenv('SCORING_STREAM_FEEDBACK', 'cutoff')
+
+# Retries of failed scoring attempts: capped exponential backoff with full jitter.
+SCORING_RETRY_MAX_ATTEMPTS = int(os.getenv('SCORING_RETRY_MAX_ATTEMPTS', 5))
+SCORING_PARSE_MAX_ATTEMPTS = int(os.getenv('SCORING_PARSE_MAX_ATTEMPTS', 2))
+SCORING_RETRY_BACKOFF_BASE = float(os.getenv('SCORING_RETRY_BACKOFF_BASE', 2))
+SCORING_RETRY_BACKOFF_MAX = float(os.getenv('SCORING_RETRY_BACKOFF_MAX', 300))
+
+# Prometheus metrics are served on /metrics. Celery worker processes push theirs to the
+# Pushgateway at METRICS_PUSHGATEWAY_URL (e.g. 'pushgateway:9091') every METRICS_PUSH_INTERVAL seconds.
+METRICS_PUSHGATEWAY_URL = os.getenv('METRICS_PUSHGATEWAY_URL', '')
+METRICS_PUSH_INTERVAL = float(os.getenv('METRICS_PUSH_INTERVAL', 15))
+
+# Bulk re-scoring through the provider's batch API: seconds between status checks.
+RESCORE_POLL_INTERVAL = float(os.getenv('RESCORE_POLL_INTERVAL', 60))
+
+# Job descriptions are normalized and capped at this many characters before they are put into prompts.
+JOB_DESCRIPTION_MAX_LENGTH = int(os.getenv('JOB_DESCRIPTION_MAX_LENGTH', 8000))
+
+# Prompt compaction: contact details and repeated lines are removed from job descriptions
+# and resumes, which are then trimmed to these estimated token budgets (0 for no limit),
+# keeping the resume sections that overlap most with the posting.
+JOB_DESCRIPTION_TOKEN_BUDGET = int(os.getenv('JOB_DESCRIPTION_TOKEN_BUDGET', 1500))
+RESUME_TOKEN_BUDGET = int(os.getenv('RESUME_TOKEN_BUDGET', 2000))
+
+# Pre-screening: a local BM25-style match of resume and job description, computed
+# before the LLM call. Submissions below their posting's prescreen_threshold are
+# either 'defer'red (scored later, on request) or 'skip'ped (never sent to the LLM).
+PRESCREEN_ENABLED = os.getenv('PRESCREEN_ENABLED', '').lower() in ('1', 'true', 'yes')
+PRESCREEN_ACTION = os.getenv('PRESCREEN_ACTION', 'defer')
+PRESCREEN_K1 = float(os.getenv('PRESCREEN_K1', 1.2))
+PRESCREEN_B = float(os.getenv('PRESCREEN_B', 0.75))
+PRESCREEN_AVERAGE_RESUME_LENGTH = float(os.getenv('PRESCREEN_AVERAGE_RESUME_LENGTH', 400))
 PROJECT_ROOT = os.path.dirname(__file__)
 sys.path.insert(0, os.path.join(PROJECT_ROOT, 'apps'))
 
@@ -90,12 +221,49 @@ WSGI_APPLICATION = 'resume_ai.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DATABASE_ENGINE selects 'postgres' (recommended whenever Celery workers write
+# concurrently) or 'sqlite' (small deployments). Connections are kept open for
+# DATABASE_CONN_MAX_AGE seconds and, with DATABASE_HEALTH_CHECKS, pinged before reuse.
+DATABASE_ENGINE = os.getenv('DATABASE_ENGINE', 'sqlite')
+DATABASE_CONN_MAX_AGE = int(os.getenv('DATABASE_CONN_MAX_AGE', 60))
+DATABASE_HEALTH_CHECKS = os.getenv('DATABASE_HEALTH_CHECKS', 'true').lower() in ('1', 'true', 'yes')
+
+if DATABASE_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'resume_ai.db_backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB', 'resume_ai'),
+            'USER': os.getenv('POSTGRES_USER', 'resume_ai'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+            'PORT': os.getenv('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DATABASE_HEALTH_CHECKS,
+            # Behind a transaction-pooling PgBouncer a server-side cursor cannot
+            # outlive its transaction, so querysets are fetched client-side.
+            'DISABLE_SERVER_SIDE_CURSORS': os.getenv('DATABASE_POOLER', '').lower() == 'pgbouncer',
+            'OPTIONS': {
+                'connect_timeout': int(os.getenv('POSTGRES_CONNECT_TIMEOUT', 5)),
+            },
+        }
     }
-}
+elif DATABASE_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'resume_ai.db_backends.sqlite3',
+            'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DATABASE_HEALTH_CHECKS,
+            # Write-ahead logging lets the web server read while a worker writes.
+            'SQLITE_WAL': os.getenv('SQLITE_WAL', 'true').lower() in ('1', 'true', 'yes'),
+            'OPTIONS': {
+                # Seconds a writer waits for another writer's lock before "database is locked".
+                'timeout': float(os.getenv('SQLITE_BUSY_TIMEOUT', 20)),
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"Unsupported DATABASE_ENGINE: {DATABASE_ENGINE}")
 
 
 # Password validation
@@ -0,0 +1,211 @@
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import NamedTuple
+
+# Lower-cased words and numbers. Inner '.', '+' and '#' are kept so that
+# terms like "node.js", "c++" and "c#" survive as single tokens.
+TOKEN_PATTERN = re.compile(r'[a-z0-9](?:[a-z0-9.+#]*[a-z0-9+#])?')
+
+# Rough number of characters per model token for English text.
+CHARS_PER_TOKEN = 4
+
+WHITESPACE_RUN = re.compile(r'[^\S\n]+')
+BLANK_LINES = re.compile(r'\n\s*\n\s*')
+LINE_BREAK = re.compile(r' ?\n ?')
+
+# Contact details, which do not matter for scoring and are kept out of prompts.
+EMAIL = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+URL = re.compile(r'\b(?:https?://|www\.)\S+|\b(?:linkedin|github)\.com/\S*', re.IGNORECASE)
+# Phone numbers in international form ("+44 20 7946 0958"), with a bracketed area
+# code ("(555) 123-4567") or grouped 3-3-4 ("555-123-4567"), with 8 to 15 digits.
+# Plain runs of numbers, such as the years in "2015 - 2019 2019 - 2023", are left alone.
+PHONE = re.compile(
+    r'(?<![\w+])(?:'
+    r'\+\d{1,3}(?:[ .-]?(?:\(\d{1,4}\)|\d{1,4})){2,5}'
+    r'|\(\d{3}\)[ .-]?\d{3}[ .-]?\d{4}'
+    r'|\d{3}([.-])\d{3}\1\d{4}'
+    r'|\d{3} \d{3} \d{4}'
+    r')(?!\w)'
+)
+
+STOP_WORDS = frozenset('''
+a about above after again against all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just me more most
+my myself no nor not now of off on once only or other our ours ourselves out over own same she
+should so some such than that the their theirs them themselves then there these they this those
+through to too under until up very was we were what when where which while who whom why will with
+would you your yours yourself yourselves also etc e.g i.e will able must well using use used within
+'''.split())
+
+def tokenize(text):
+    """
+    Split text into lower-cased terms, dropping common English stop words.
+
+    Parameters:
+    -----------
+    text : str
+        The text to tokenize.
+
+    Returns:
+    --------
+    list of str
+        The terms in the order they appear.
+    """
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+def term_weights(text):
+    """
+    Weight the terms of a text by how often they occur.
+
+    Parameters:
+    -----------
+    text : str
+        The text to weight, typically a job description.
+
+    Returns:
+    --------
+    dict
+        Maps each term to ``1 + log(tf)``, so repeated requirements count
+        more without dominating.
+    """
+    return {term: 1.0 + math.log(count) for term, count in Counter(tokenize(text)).items()}
+
+def normalize_text(text, max_length=None):
+    """
+    Normalize text before it is put into a prompt.
+
+    Unicode is NFKC-normalized, runs of spaces and tabs become a single
+    space and blank lines are collapsed, keeping paragraph breaks. Text
+    longer than ``max_length`` is cut at the last whitespace before the limit.
+
+    Parameters:
+    -----------
+    text : str
+        The text to normalize.
+    max_length : int, optional
+        The maximum length of the result, in characters.
+
+    Returns:
+    --------
+    str
+        The normalized text.
+    """
+    text = unicodedata.normalize('NFKC', text)
+    text = WHITESPACE_RUN.sub(' ', text)
+    text = BLANK_LINES.sub('\n\n', text)
+    text = LINE_BREAK.sub('\n', text).strip()
+    if max_length is not None and len(text) > max_length:
+        cut = max(text.rfind(' ', 0, max_length + 1), text.rfind('\n', 0, max_length + 1))
+        text = text[:cut if cut > 0 else max_length].rstrip()
+    return text
+
+def estimate_token_count(text):
+    """
+    Estimate the number of model tokens in a text, at about four characters per token.
+    """
+    return len(text) // CHARS_PER_TOKEN + 1
+
+class CompactedText(NamedTuple):
+    """
+    The result of ``compact_text``.
+    """
+    text: str
+    # Estimated tokens of the text before and after compaction.
+    tokens_before: int
+    tokens_after: int
+
+
+def strip_contact_details(text):
+    """
+    Remove email addresses, URLs and phone numbers from a text.
+    """
+    text = EMAIL.sub('', text)
+    text = URL.sub('', text)
+    return PHONE.sub(lambda match: '' if 8 <= sum(c.isdigit() for c in match[0]) <= 15 else match[0], text)
+
+def dedupe_lines(text):
+    """
+    Drop repeated lines, keeping the first occurrence of each.
+
+    Lines are compared case-insensitively; blank lines are kept so paragraph
+    breaks survive, as are lines left without any letter or digit.
+    """
+    seen = set()
+    lines = []
+    for line in text.split('\n'):
+        key = line.strip().casefold()
+        if key:
+            if key in seen:
+                continue
+            seen.add(key)
+        lines.append(line)
+    return '\n'.join(lines)
+
+def compact_text(text, token_budget=None, weights=None):
+    """
+    Compact text before it is put into a prompt.
+
+    The text is stripped of contact details, normalized and de-duplicated
+    line by line. If it is still estimated to need more than
+    ``token_budget`` tokens, only the most relevant sections are kept:
+    paragraphs (or, for paragraphs above the budget on their own, lines)
+    are ranked by the summed ``weights`` of the distinct terms they contain
+    and added best first while they fit, then put back in their original
+    order. Without weights, sections are kept from the start.
+
+    Tokens are counted with ``estimate_token_count``.
+
+    Parameters:
+    -----------
+    text : str
+        The text to compact, typically a resume or job description.
+    token_budget : int, optional
+        The maximum estimated number of tokens of the result; None or 0 for no limit.
+    weights : dict, optional
+        Maps terms to their relevance, e.g. the ``term_weights`` of a job description.
+
+    Returns:
+    --------
+    CompactedText
+        The compacted text and its estimated token counts before and after.
+    """
+    tokens_before = estimate_token_count(text)
+    text = normalize_text(dedupe_lines(normalize_text(strip_contact_details(text))))
+    if token_budget and estimate_token_count(text) > token_budget:
+        text = _most_relevant_sections(text, token_budget, weights or {})
+    return CompactedText(text, tokens_before, estimate_token_count(text))
+
+def _most_relevant_sections(text, token_budget, weights):
+    sections = []
+    for number, paragraph in enumerate(text.split('\n\n')):
+        if estimate_token_count(paragraph) > token_budget:
+            sections.extend((number, line) for line in paragraph.split('\n'))
+        else:
+            sections.append((number, paragraph))
+
+    def relevance(index):
+        return sum(weights.get(term, 0.0) for term in set(tokenize(sections[index][1])))
+
+    # Every section but the first costs its separator too.
+    remaining = token_budget * CHARS_PER_TOKEN
+    kept = []
+    for index in sorted(range(len(sections)), key=lambda index: (-relevance(index), index)):
+        length = len(sections[index][1]) + 2
+        if length <= remaining:
+            kept.append(index)
+            remaining -= length
+
+    if not kept:
+        return normalize_text(text, token_budget * CHARS_PER_TOKEN - 1)
+    parts = []
+    previous = None
+    for index in sorted(kept):
+        number, section = sections[index]
+        if previous is not None:
+            parts.append('\n' if number == previous else '\n\n')
+        parts.append(section)
+        previous = number
+    return ''.join(parts)
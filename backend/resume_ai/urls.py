@@ -1,10 +1,12 @@
 from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import TemplateView
+from user_scoring.views.metrics import metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', TemplateView.as_view(template_name='index.html')),
     path('api/job-postings/', include('job_postings.urls')),
     path('api/user-scoring/', include('user_scoring.urls')),
+    path('metrics', metrics, name='metrics'),
 ]
\ No newline at end of file